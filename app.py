@@ -21,7 +21,17 @@ files_table_name = "lexora-files"
 user_sessions_table_name = "lexora-sessions"
 query_sessions_table_name = "lexora-query-sessions"
 opensearch_endpoint = "vpc-lexora-embed-index-mlbu2ea3gkp7l3fbphhabxpuje.ap-northeast-2.es.amazonaws.com"
-opensearch_index = "lexora-doc-embed-v1"
+# 임베딩 인덱스 alias (실제 인덱스 lexora-doc-embed-v{n}, 모델 변경은 lambdas/lexora_doc_embed/migrate_index.py로 alias 전환)
+opensearch_index = "lexora-doc-embed"
+# 임베딩 모델/차원 기본값 (alias가 가리키는 인덱스의 _meta가 우선)
+embed_model_id = "amazon.titan-embed-text-v2:0"
+embed_dimensions = 512
+# 2단계 검색: HNSW용 coarse 벡터 차원 (0이면 단일 벡터, 예: embed_dimensions=1024 + 256)
+embed_coarse_dimensions = 0
+# 새 인덱스의 벡터 저장 형식 (float / byte / fp16) - 기존 인덱스는 _meta에 기록된 형식을 따름
+vector_data_type = "float"
+# userId shard routing (색인/질의 공통) - 기존 인덱스는 routing 이전 후 켬
+opensearch_routing = False
 
 # ① 사용자 관리 스택
 LexoraUsersStack(app, "LexoraUsersStack", env=env)
@@ -39,7 +49,12 @@ LexoraDocEmbedStack(
     env=env,
     files_table_name=files_table_name,
     opensearch_endpoint=opensearch_endpoint,
-    opensearch_index=opensearch_index
+    opensearch_index=opensearch_index,
+    embed_model_id=embed_model_id,
+    embed_dimensions=embed_dimensions,
+    embed_coarse_dimensions=embed_coarse_dimensions,
+    vector_data_type=vector_data_type,
+    opensearch_routing=opensearch_routing
 )
 
 # ⑤ 질의 응답 세션 처리 스택
@@ -50,7 +65,11 @@ LexoraQueryHandlerStack(
     files_table_name=files_table_name,
     query_sessions_table_name=query_sessions_table_name,
     opensearch_endpoint=opensearch_endpoint,
-    opensearch_index=opensearch_index
+    opensearch_index=opensearch_index,
+    embed_model_id=embed_model_id,
+    embed_dimensions=embed_dimensions,
+    vector_data_type=vector_data_type,
+    opensearch_routing=opensearch_routing
 )
 
 # ⑥ 쿼리 세션 관리 (생성, 목록, 수정, 삭제 등)
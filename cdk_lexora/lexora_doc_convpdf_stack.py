@@ -18,6 +18,8 @@ class LexoraDocConvpdfStack(Stack):
                  converted_bucket_name: str = "lexora-converted-files-bucket",
                  files_table_name: str = "lexora-files",
                  versions_table_name: str = "lexora-file-versions",
+                 batch_size: int = 10,
+                 max_batching_window_seconds: int = 5,
                  **kwargs) -> None:
         super().__init__(scope, construct_id, **kwargs)
 
@@ -59,6 +61,7 @@ class LexoraDocConvpdfStack(Stack):
 
         # 4. 권한 부여
         raw_bucket.grant_read(conv_fn)
+        converted_bucket.grant_read(conv_fn)  # 변환 캐시 조회/복사
         converted_bucket.grant_put(conv_fn)
         extract_queue.grant_send_messages(conv_fn)
 
@@ -72,11 +75,13 @@ class LexoraDocConvpdfStack(Stack):
             )
         )
 
-        # 5. Lambda에 conv_queue 이벤트 소스 연결
+        # 5. Lambda에 conv_queue 이벤트 소스 연결 (배치 변환 + 실패 건만 재시도)
         conv_fn.add_event_source(
             lambda_event_sources.SqsEventSource(
                 conv_queue,
-                batch_size=1
+                batch_size=batch_size,
+                max_batching_window=Duration.seconds(max_batching_window_seconds),
+                report_batch_item_failures=True
             )
         )
 
@@ -4,11 +4,13 @@ from aws_cdk import (
     aws_lambda as _lambda,
     aws_lambda_event_sources as lambda_event_sources,
     aws_sqs as sqs,
+    aws_s3 as s3,
     aws_iam as iam,
     aws_dynamodb as dynamodb,
     aws_ec2 as ec2,
     aws_ecr_assets as ecr_assets,
     CfnOutput,
+    RemovalPolicy,
 )
 from aws_cdk.aws_lambda import DockerImageFunction, DockerImageCode
 from constructs import Construct
@@ -20,10 +22,25 @@ class LexoraDocEmbedStack(Stack):
         scope: Construct,
         construct_id: str,
         files_table_name: str = "lexora-files",
+        embed_cache_table_name: str = "lexora-embedding-cache",
+        chunks_bucket_name: str = "lexora-converted-files-bucket",
         account: str = "571600839644",
         region: str = "ap-northeast-2",
         opensearch_endpoint: str = "vpc-lexora-embed-index-mlbu2ea3gkp7l3fbphhabxpuje.ap-northeast-2.es.amazonaws.com",
-        opensearch_index: str = "lexora-doc-embed-v1",
+        opensearch_index: str = "lexora-doc-embed",
+        embed_model_id: str = "amazon.titan-embed-text-v2:0",
+        embed_dimensions: int = 512,
+        embed_coarse_dimensions: int = 0,
+        embed_concurrency: int = 8,
+        knn_engine: str = "nmslib",
+        hnsw_m: int = 16,
+        hnsw_ef_construction: int = 256,
+        hnsw_ef_search: int = 100,
+        refresh_interval: str = "1s",
+        vector_data_type: str = "float",
+        opensearch_routing: bool = False,
+        batch_size: int = 10,
+        max_batching_window_seconds: int = 2,
         **kwargs,
     ):
         super().__init__(scope, construct_id, **kwargs)
@@ -50,12 +67,25 @@ class LexoraDocEmbedStack(Stack):
             queue_url=f"https://sqs.{region}.amazonaws.com/{account}/LexoraDocEmbedQueue",
         )
 
+        # 임베딩 캐시 테이블 (파티션 키 cacheKey, TTL expiresAt) - 다시 만들 수 있는 캐시라 스택과 함께 삭제
+        embed_cache_table = dynamodb.Table(
+            self,
+            "EmbedCacheTable",
+            table_name=embed_cache_table_name,
+            partition_key=dynamodb.Attribute(name="cacheKey", type=dynamodb.AttributeType.STRING),
+            billing_mode=dynamodb.BillingMode.PAY_PER_REQUEST,
+            time_to_live_attribute="expiresAt",
+            removal_policy=RemovalPolicy.DESTROY,
+        )
+
         # 2. Lambda 함수 생성 (Docker 이미지 기반, VPC 연결 포함, 프라이빗 서브넷으로 변경)
         embed_fn = DockerImageFunction(
             self,
             "LexoraDocEmbedFunction",
+            # 빌드 컨텍스트는 lambdas/ (공용 모듈 lambdas/common 포함)
             code=DockerImageCode.from_image_asset(
-                "lambdas/lexora_doc_embed",
+                "lambdas",
+                file="lexora_doc_embed/Dockerfile",
                 platform=ecr_assets.Platform.LINUX_AMD64,
             ),
             timeout=Duration.minutes(3),
@@ -65,6 +95,24 @@ class LexoraDocEmbedStack(Stack):
                 "BEDROCK_REGION": region,
                 "OPENSEARCH_ENDPOINT": opensearch_endpoint.replace("https://", ""),
                 "OPENSEARCH_INDEX": opensearch_index,
+                # 인덱스 _meta에 모델/차원이 없을 때의 기본값 (새 인덱스 생성 시 _meta로 기록)
+                "EMBED_MODEL_ID": embed_model_id,
+                "EMBED_DIMENSIONS": str(embed_dimensions),
+                # 2단계 검색용 coarse 벡터 차원 (0이면 사용 안 함, 새 인덱스 생성 시에만 적용)
+                "EMBED_COARSE_DIMENSIONS": str(embed_coarse_dimensions),
+                "EMBED_CONCURRENCY": str(embed_concurrency),
+                "EMBED_CACHE_TABLE": embed_cache_table.table_name,
+                # 인덱스 생성/검증 (index_admin)
+                "KNN_ENGINE": knn_engine,
+                "HNSW_M": str(hnsw_m),
+                "HNSW_EF_CONSTRUCTION": str(hnsw_ef_construction),
+                "HNSW_EF_SEARCH": str(hnsw_ef_search),
+                # 인덱스 refresh 주기 (인덱스 설정으로 한 번 적용, 색인 중 바꾸지 않음)
+                "SEARCH_REFRESH_INTERVAL": refresh_interval,
+                # 새 인덱스의 벡터 저장 형식 float / byte(int8) / fp16 (_meta에 기록) - 바꿀 때는 migrate_index.py --vector-data-type
+                "VECTOR_DATA_TYPE": vector_data_type,
+                # userId shard routing - 기존 인덱스는 migrate_index.py --routing으로 이전한 뒤 켬
+                "OPENSEARCH_ROUTING": "true" if opensearch_routing else "false",
             },
             vpc=vpc,
             vpc_subnets=ec2.SubnetSelection(
@@ -74,8 +122,11 @@ class LexoraDocEmbedStack(Stack):
             allow_public_subnet=True
         )
 
-        # 3. SQS 메시지 소비 권한
+        # 3. SQS 메시지 소비 권한 + extract 단계가 저장한 chunk part 읽기 권한 (+ 승격된 이전 manifest 삭제)
         embed_queue.grant_consume_messages(embed_fn)
+        chunks_bucket = s3.Bucket.from_bucket_name(self, "ChunksBucket", chunks_bucket_name)
+        chunks_bucket.grant_read(embed_fn, "chunks/*")
+        chunks_bucket.grant_delete(embed_fn, "chunks/*")
 
         # 4. DynamoDB 업데이트 권한
         embed_fn.add_to_role_policy(
@@ -85,25 +136,36 @@ class LexoraDocEmbedStack(Stack):
             )
         )
 
-        # 5. Bedrock 호출 권한
+        # 임베딩 캐시 읽기/쓰기
+        embed_cache_table.grant_read_write_data(embed_fn)
+
+        # 5. Bedrock 호출 권한 (alias 전환 시 재배포 없이 새 임베딩 모델을 쓰므로 Titan 임베딩 모델 전체)
         embed_fn.add_to_role_policy(
             iam.PolicyStatement(
                 actions=["bedrock:InvokeModel"],
-                resources=[f"arn:aws:bedrock:{region}::foundation-model/amazon.titan-embed-text-v2:0"],
+                resources=[
+                    f"arn:aws:bedrock:{region}::foundation-model/{embed_model_id}",
+                    f"arn:aws:bedrock:{region}::foundation-model/amazon.titan-embed-*",
+                ],
             )
         )
 
-        # 6. OpenSearch 호출 권한
+        # 6. OpenSearch 호출 권한 (HEAD: 인덱스 존재 확인)
         embed_fn.add_to_role_policy(
             iam.PolicyStatement(
-                actions=["es:ESHttpPost", "es:ESHttpPut", "es:ESHttpGet"],
+                actions=["es:ESHttpPost", "es:ESHttpPut", "es:ESHttpGet", "es:ESHttpHead"],
                 resources=[f"arn:aws:es:{region}:{account}:domain/lexora-embed-index/*"],
             )
         )
 
-        # 7. SQS 이벤트 소스 등록
+        # 7. SQS 이벤트 소스 등록 (배치 처리 + 실패 건만 재시도)
         embed_fn.add_event_source(
-            lambda_event_sources.SqsEventSource(embed_queue, batch_size=1)
+            lambda_event_sources.SqsEventSource(
+                embed_queue,
+                batch_size=batch_size,
+                max_batching_window=Duration.seconds(max_batching_window_seconds),
+                report_batch_item_failures=True,
+            )
         )
 
         # 8. 출력
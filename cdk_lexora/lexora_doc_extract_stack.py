@@ -18,14 +18,20 @@ from botocore.exceptions import ClientError
 
 class LexoraDocExtractStack(Stack):
     def __init__(self, scope: Construct, construct_id: str,
+                 raw_bucket_name: str = "lexora-raw-files-bucket",
                  converted_bucket_name: str = "lexora-converted-files-bucket",
                  files_table_name: str = "lexora-files",
                  account: str = "571600839644",
                  region: str = "ap-northeast-2",
+                 pdf_text_backend: str = "pdfium",
+                 chunk_max_tokens: int = 0,
+                 batch_size: int = 5,
+                 max_batching_window_seconds: int = 5,
                  **kwargs):
         super().__init__(scope, construct_id, **kwargs)
 
-        # 버킷 참조
+        # 버킷 참조 (txt/md/csv/html은 원본 버킷에서 직접 추출)
+        raw_bucket = s3.Bucket.from_bucket_name(self, "RawBucket", raw_bucket_name)
         converted_bucket = s3.Bucket.from_bucket_name(self, "ConvertedBucket", converted_bucket_name)
 
         extract_queue = sqs.Queue.from_queue_attributes(
@@ -43,8 +49,10 @@ class LexoraDocExtractStack(Stack):
         # Lambda 정의
         extract_fn = _lambda.DockerImageFunction(
             self, "LexoraDocExtractFunction",
+            # 빌드 컨텍스트는 lambdas/ (공용 모듈 lambdas/common 포함)
             code=_lambda.DockerImageCode.from_image_asset(
-                "lambdas/lexora_doc_extract",
+                "lambdas",
+                file="lexora_doc_extract/Dockerfile",
                 platform=ecr_assets.Platform.LINUX_AMD64
             ),
             timeout=Duration.minutes(5),
@@ -52,12 +60,19 @@ class LexoraDocExtractStack(Stack):
             environment={
                 "CONVERTED_BUCKET": converted_bucket.bucket_name,
                 "EMBEDDING_QUEUE_URL": embed_queue.queue_url,
-                "FILES_TABLE": files_table_name
+                "FILES_TABLE": files_table_name,
+                "PDF_TEXT_BACKEND": pdf_text_backend,
+                "CHUNK_MAX_TOKENS": str(chunk_max_tokens),
+                "CHUNKS_BUCKET": converted_bucket.bucket_name,
+                "CHUNKS_PREFIX": "chunks"
             }
         )
 
         # 권한 부여
+        raw_bucket.grant_read(extract_fn)
         converted_bucket.grant_read(extract_fn)
+        converted_bucket.grant_put(extract_fn, "chunks/*")  # chunk part (claim-check)
+        converted_bucket.grant_delete(extract_fn, "chunks/*")  # 이전 실행의 manifest / 남은 part 정리
         embed_queue.grant_send_messages(extract_fn)
 
         extract_fn.add_to_role_policy(
@@ -69,11 +84,13 @@ class LexoraDocExtractStack(Stack):
             )
         )
 
-        # 이벤트 소스 연결
+        # 이벤트 소스 연결 (배치 처리 + 실패 건만 재시도)
         extract_fn.add_event_source(
             lambda_event_sources.SqsEventSource(
                 extract_queue,
-                batch_size=1
+                batch_size=batch_size,
+                max_batching_window=Duration.seconds(max_batching_window_seconds),
+                report_batch_item_failures=True
             )
         )
 
@@ -24,7 +24,11 @@ class LexoraQueryHandlerStack(Stack):
         account: str = "571600839644",
         region: str = "ap-northeast-2",
         opensearch_endpoint: str = "vpc-lexora-embed-index-mlbu2ea3gkp7l3fbphhabxpuje.ap-northeast-2.es.amazonaws.com",
-        opensearch_index: str = "lexora-doc-embed-v1",
+        opensearch_index: str = "lexora-doc-embed",
+        embed_model_id: str = "amazon.titan-embed-text-v2:0",
+        embed_dimensions: int = 512,
+        vector_data_type: str = "float",
+        opensearch_routing: bool = False,
         **kwargs,
     ):
         super().__init__(scope, construct_id, **kwargs)
@@ -45,8 +49,10 @@ class LexoraQueryHandlerStack(Stack):
         query_fn = DockerImageFunction(
             self,
             "LexoraQueryHandlerFunction",
+            # 빌드 컨텍스트는 lambdas/ (공용 모듈 lambdas/common 포함)
             code=DockerImageCode.from_image_asset(
-                "lambdas/lexora_query_handler",
+                "lambdas",
+                file="lexora_query_handler/Dockerfile",
                 platform=ecr_assets.Platform.LINUX_AMD64,
             ),
             timeout=Duration.seconds(30),
@@ -57,6 +63,14 @@ class LexoraQueryHandlerStack(Stack):
                 "BEDROCK_REGION": region,
                 "OPENSEARCH_ENDPOINT": opensearch_endpoint,
                 "OPENSEARCH_INDEX": opensearch_index,
+                # 인덱스 _meta에 모델/차원이 없을 때의 기본값
+                "EMBED_MODEL_ID": embed_model_id,
+                "EMBED_DIMENSIONS": str(embed_dimensions),
+                # 인덱스 _meta에 저장 형식이 없을 때의 질의 벡터 양자화 형식 (embed 스택과 같은 값)
+                "VECTOR_DATA_TYPE": vector_data_type,
+                "OPENSEARCH_ROUTING": "true" if opensearch_routing else "false",
+                # API 응답 시간(30초) 안에서만 스로틀링 재시도
+                "BEDROCK_MAX_ATTEMPTS": "4",
             },
             vpc=vpc,
             vpc_subnets=ec2.SubnetSelection(subnets=private_subnets),
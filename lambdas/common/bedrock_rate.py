@@ -0,0 +1,149 @@
+import json
+import os
+import random
+import threading
+import time
+
+from botocore.config import Config
+from botocore.exceptions import ClientError, ConnectionError as BotocoreConnectionError, ReadTimeoutError
+
+# Bedrock 호출 속도 제어 (AIMD) + 지터 백오프
+# - 성공할 때마다 초당 호출 수를 조금씩 올리고(additive increase), 스로틀링이면 절반으로 줄임(multiplicative decrease)
+# - 모델별로 따로 제어 (임베딩/Claude 쿼터가 다름), 같은 프로세스의 스레드끼리 공유
+# - 현재 속도/스로틀 횟수를 CloudWatch EMF 로그로 남김 (Lexora/Bedrock 네임스페이스)
+# lambdas/common 공용 모듈 - lexora_doc_embed / lexora_query_handler 이미지에 함께 복사
+
+BEDROCK_INITIAL_RATE = float(os.environ.get("BEDROCK_INITIAL_RATE", "5"))
+BEDROCK_MIN_RATE = float(os.environ.get("BEDROCK_MIN_RATE", "0.5"))
+BEDROCK_MAX_RATE = float(os.environ.get("BEDROCK_MAX_RATE", "50"))
+BEDROCK_MAX_ATTEMPTS = int(os.environ.get("BEDROCK_MAX_ATTEMPTS", "8"))
+BACKOFF_BASE_SECONDS = 0.5
+BACKOFF_MAX_SECONDS = 20
+DECREASE_FACTOR = 0.5
+DECREASE_COOLDOWN_SECONDS = 1.0   # 동시에 들어온 스로틀링 응답은 한 번만 감속
+METRIC_INTERVAL_SECONDS = 60
+METRIC_NAMESPACE = "Lexora/Bedrock"
+
+THROTTLE_ERROR_CODES = {
+    "ThrottlingException",
+    "TooManyRequestsException",
+}
+# 일시적 서버/네트워크 오류: 속도는 줄이지 않고 백오프 후 재시도 (5xx 응답 포함)
+TRANSIENT_ERROR_CODES = {
+    "ServiceUnavailableException",
+    "InternalServerException",
+}
+
+# 재시도는 이 모듈이 직접 처리 (botocore 자체 재시도는 끔 → 스로틀링을 속도 제어에 반영)
+# botocore가 하던 연결 오류/읽기 타임아웃/5xx 재시도도 call_bedrock이 대신함
+BEDROCK_CLIENT_CONFIG = Config(retries={"mode": "standard", "total_max_attempts": 1})
+
+
+class AdaptiveRateLimiter:
+    def __init__(self, name: str, rate: float = BEDROCK_INITIAL_RATE):
+        self.name = name
+        self.rate = rate
+        self._lock = threading.Lock()
+        self._next_at = 0.0
+        self._last_decrease = 0.0
+        self._last_metric = time.time()
+        self._calls = 0
+        self._throttles = 0
+
+    def acquire(self):
+        # 현재 속도에 맞춰 호출 간격을 벌림
+        with self._lock:
+            now = time.monotonic()
+            wait = self._next_at - now
+            self._next_at = max(now, self._next_at) + 1.0 / self.rate
+        if wait > 0:
+            time.sleep(wait)
+
+    def on_success(self):
+        with self._lock:
+            self._calls += 1
+            # 약 1초(현재 속도만큼의 성공)마다 1 req/s 증가
+            self.rate = min(BEDROCK_MAX_RATE, self.rate + 1.0 / self.rate)
+        self._maybe_emit_metric()
+
+    def on_throttle(self):
+        with self._lock:
+            self._calls += 1
+            self._throttles += 1
+            now = time.monotonic()
+            if now - self._last_decrease >= DECREASE_COOLDOWN_SECONDS:
+                self.rate = max(BEDROCK_MIN_RATE, self.rate * DECREASE_FACTOR)
+                self._last_decrease = now
+        print(f"[WARN] Bedrock 스로틀링 - {self.name}, 속도 {self.rate:.2f} req/s로 감속")
+        self._maybe_emit_metric(force=True)
+
+    def _maybe_emit_metric(self, force: bool = False):
+        with self._lock:
+            now = time.time()
+            if not force and now - self._last_metric < METRIC_INTERVAL_SECONDS:
+                return
+            calls, throttles, rate = self._calls, self._throttles, self.rate
+            self._calls = self._throttles = 0
+            self._last_metric = now
+        print(json.dumps({
+            "_aws": {
+                "Timestamp": int(now * 1000),
+                "CloudWatchMetrics": [{
+                    "Namespace": METRIC_NAMESPACE,
+                    "Dimensions": [["ModelId"]],
+                    "Metrics": [
+                        {"Name": "AllowedRate", "Unit": "Count/Second"},
+                        {"Name": "Calls", "Unit": "Count"},
+                        {"Name": "Throttles", "Unit": "Count"},
+                    ],
+                }],
+            },
+            "ModelId": self.name,
+            "AllowedRate": round(rate, 3),
+            "Calls": calls,
+            "Throttles": throttles,
+        }))
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def limiter_for(model_id: str) -> AdaptiveRateLimiter:
+    with _limiters_lock:
+        if model_id not in _limiters:
+            _limiters[model_id] = AdaptiveRateLimiter(model_id)
+        return _limiters[model_id]
+
+
+def _is_transient(e: Exception) -> bool:
+    if isinstance(e, (BotocoreConnectionError, ReadTimeoutError)):
+        return True
+    if isinstance(e, ClientError):
+        status = e.response.get("ResponseMetadata", {}).get("HTTPStatusCode") or 0
+        return e.response.get("Error", {}).get("Code") in TRANSIENT_ERROR_CODES or status >= 500
+    return False
+
+
+def call_bedrock(model_id: str, fn, *args, **kwargs):
+    # fn(*args, **kwargs)를 모델별 속도 제어 하에 호출, 스로틀링/일시적 오류면 full jitter 백오프 후 재시도
+    # (스로틀링만 감속, 연결 오류/5xx는 속도 유지)
+    limiter = limiter_for(model_id)
+    for attempt in range(BEDROCK_MAX_ATTEMPTS):
+        limiter.acquire()
+        try:
+            result = fn(*args, **kwargs)
+        except Exception as e:
+            throttled = isinstance(e, ClientError) and e.response.get("Error", {}).get("Code") in THROTTLE_ERROR_CODES
+            if throttled:
+                limiter.on_throttle()
+            elif _is_transient(e):
+                print(f"[WARN] Bedrock 일시적 오류 - {model_id}, 재시도 ({attempt + 1}/{BEDROCK_MAX_ATTEMPTS}): {e}")
+            else:
+                raise
+            if attempt == BEDROCK_MAX_ATTEMPTS - 1:
+                raise
+            time.sleep(random.uniform(0, min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * 2 ** attempt)))
+            continue
+        limiter.on_success()
+        return result
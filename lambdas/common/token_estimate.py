@@ -0,0 +1,37 @@
+# Titan 임베딩 / Claude 토큰 수 근사치 (토크나이저 없이 글자 종류별 가중치로 계산)
+# - 한글/한자 등 UTF-8 3바이트 글자: 글자당 1토큰 (실제보다 약간 크게 잡아 모델 입력 한도를 넘지 않도록)
+# - 영문/숫자/기호(ASCII): 4글자당 1토큰
+# - 공백: 0
+# 글자 단위 Python 루프 없이 encode/count만 사용 (긴 문서에서도 빠름)
+# lambdas/common 공용 모듈 - chunk 분할(lexora_doc_extract)과 프롬프트 토큰 예산(lexora_query_handler)에서 사용
+
+ASCII_CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str, start: int = 0, end: int = None) -> int:
+    if start or end is not None:
+        text = text[start:end]
+    multibyte = (len(text.encode("utf-8")) - len(text)) // 2
+    spaces = text.count(" ") + text.count("\n") + text.count("\t")
+    ascii_chars = len(text) - multibyte - spaces
+    return multibyte + (ascii_chars + ASCII_CHARS_PER_TOKEN - 1) // ASCII_CHARS_PER_TOKEN
+
+
+def token_limit_offset(text: str, start: int, max_tokens: int):
+    # start부터 추정 토큰 수가 max_tokens 이하인 가장 먼 위치 / 끝까지 한도 안이면 None
+    # 앞부분 토큰 수는 끝 위치에 대해 단조 증가 → 탐색 범위를 넓힌 뒤 이분 탐색
+    hi = start + max_tokens * ASCII_CHARS_PER_TOKEN
+    while estimate_tokens(text, start, min(hi, len(text))) <= max_tokens:
+        if hi >= len(text):
+            return None
+        hi = start + (hi - start) * 2
+    hi = min(hi, len(text))
+
+    lo = start
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if estimate_tokens(text, start, mid) <= max_tokens:
+            lo = mid
+        else:
+            hi = mid - 1
+    return lo
@@ -0,0 +1,69 @@
+import base64
+import math
+import os
+import struct
+
+# 벡터 저장 형식 (VECTOR_DATA_TYPE)
+# - float: float32 그대로 (기본값)
+# - byte : int8 (lucene 엔진, cosinesimil) - 벡터별 최대 절댓값을 127로 맞춰 반올림, 코사인은 배율과 무관
+# - fp16 : faiss 엔진 sq fp16 인코더 (innerproduct, 정규화 벡터라 코사인과 같음) - 클라이언트도 fp16 정밀도로 맞춤
+# 색인(lexora_doc_embed)과 질의(lexora_query_handler)가 같은 방식으로 양자화해야 하므로 lambdas/common에 하나만 두고 두 이미지에 복사
+# 2단계 검색(Matryoshka): 전체 차원 벡터의 앞부분을 잘라 다시 정규화한 coarse 벡터로 HNSW 검색,
+# 전체 벡터(fp16 base64, _source의 embeddingFull)로 상위 후보 재정렬
+
+VECTOR_DATA_TYPE = os.environ.get("VECTOR_DATA_TYPE", "float")
+VECTOR_DATA_TYPES = ("float", "byte", "fp16")
+# 벡터 한 개당 저장 바이트 (차원당)
+BYTES_PER_DIMENSION = {"float": 4, "byte": 1, "fp16": 2}
+
+
+def to_int8(embedding: list) -> list:
+    peak = max((abs(v) for v in embedding), default=0.0)
+    if peak == 0:
+        return [0] * len(embedding)
+    scale = 127.0 / peak
+    return [max(-128, min(127, round(v * scale))) for v in embedding]
+
+
+def to_fp16(embedding: list) -> list:
+    packed = struct.pack(f"<{len(embedding)}e", *embedding)
+    return list(struct.unpack(f"<{len(embedding)}e", packed))
+
+
+def quantize(embedding: list, data_type: str = VECTOR_DATA_TYPE) -> list:
+    # 이미 양자화된 벡터(기존 색인에서 재사용)에 다시 적용해도 값이 바뀌지 않음
+    if data_type == "byte":
+        return to_int8(embedding)
+    if data_type == "fp16":
+        return to_fp16(embedding)
+    return embedding
+
+
+def similarity_score(score: float, data_type: str = VECTOR_DATA_TYPE) -> float:
+    # fp16(faiss innerproduct) 점수를 lucene cosinesimil(byte)과 같은 (1 + cos) / 2 범위로 환산
+    if data_type != "fp16":
+        return score
+    cos = score - 1 if score >= 1 else 1 - 1 / score
+    return (1 + cos) / 2
+
+
+def coarse(embedding: list, dimensions: int) -> list:
+    # Titan v2는 Matryoshka 방식으로 학습되어 앞쪽 차원만으로도 낮은 차원 임베딩 역할을 함
+    head = embedding[:dimensions]
+    norm = math.sqrt(sum(v * v for v in head)) or 1.0
+    return [v / norm for v in head]
+
+
+def encode_full(embedding: list) -> str:
+    return base64.b64encode(struct.pack(f"<{len(embedding)}e", *embedding)).decode("ascii")
+
+
+def decode_full(encoded: str) -> list:
+    raw = base64.b64decode(encoded)
+    return list(struct.unpack(f"<{len(raw) // 2}e", raw))
+
+
+def cosine(a: list, b: list) -> float:
+    dot = sum(x * y for x, y in zip(a, b))
+    norm = math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b))
+    return dot / norm if norm else 0.0
@@ -1,17 +1,30 @@
 import os
 import json
+import hashlib
 import tempfile
 import time
-import glob
 import boto3
 from botocore.exceptions import ClientError
 
+import lo_daemon
+
 # 환경 변수
 RAW_BUCKET = os.getenv("RAW_BUCKET", "lexora-raw-files-bucket")
 CONVERTED_BUCKET = os.getenv("CONVERTED_BUCKET", "lexora-converted-files-bucket")
 FILES_TABLE = os.getenv("FILES_TABLE", "lexora-files")
 VERSIONS_TABLE = os.getenv("VERSIONS_TABLE", "lexora-file-versions")
 EXTRACT_QUEUE_URL = os.getenv("EXTRACT_QUEUE_URL")
+CONVERT_CACHE_PREFIX = os.getenv("CONVERT_CACHE_PREFIX", "_cache/pdf")
+CONVERTER_VERSION = os.getenv("CONVERTER_VERSION", "libreoffice")
+# 배치로 받은 메시지 중 남은 실행 시간이 이보다 적으면 시작하지 않고 재시도로 넘김
+CONVERT_TIME_SAFETY_MS = int(os.getenv("CONVERT_TIME_SAFETY_MS", "120000"))
+# 변환 후 업로드/캐시 저장/큐 전송에 남겨 둘 시간 (LibreOffice 변환 제한 시간은 남은 시간에서 이만큼 뺀 값)
+CONVERT_FINISH_MARGIN_MS = int(os.getenv("CONVERT_FINISH_MARGIN_MS", "30000"))
+
+# LibreOffice 변환 없이 추출 단계에서 바로 파싱하는 형식
+TEXT_NATIVE_FORMATS = {"txt", "md", "markdown", "csv", "html", "htm"}
+# 텍스트는 원본에서 직접 추출하고, PDF는 미리보기용으로만 생성하는 형식
+OFFICE_NATIVE_FORMATS = {"docx", "xlsx", "pptx"}
 
 
 # AWS 클라이언트
@@ -23,21 +36,51 @@ sqs = boto3.client("sqs")
 
 def lambda_handler(event, context):
     print("[INFO] Lexora ConvPDF Lambda triggered")
-    for record in event.get("Records", []):
+    records = event.get("Records", [])
+    failures = []
+
+    # 원본은 변환 직전에 하나씩 받아 변환 후 바로 지움 (/tmp에 배치 전체를 올리지 않음)
+    # 변환은 상주 LibreOffice 세션 하나에서 순차 처리
+    for record in records:
         try:
             body = json.loads(record["body"])
             print(f"[INFO] Message body: {body}")
-            _convert_or_copy(body)
+        except Exception as e:
+            # 파싱 불가 메시지는 재시도해도 실패하므로 실패 목록에 넣지 않음
+            print(f"[ERROR] 메시지 파싱 실패: {e}")
+            continue
+
+        if context is not None and context.get_remaining_time_in_millis() < CONVERT_TIME_SAFETY_MS:
+            print(f"[WARN] 남은 실행 시간 부족 - fileId={body.get('fileId')} 재시도로 넘김")
+            failures.append(record["messageId"])
+            continue
+
+        # 변환이 길어져도 Lambda 제한 시간 전에 끝나도록 마감 시각 전달 (배치 전체 타임아웃 → 전체 재전달 방지)
+        deadline = None
+        if context is not None:
+            deadline = time.time() + (context.get_remaining_time_in_millis() - CONVERT_FINISH_MARGIN_MS) / 1000
+
+        try:
+            _convert_or_copy(body, deadline)
         except Exception as e:
             print(f"[ERROR] 처리 실패: {e}")
+            failures.append(record["messageId"])
             if "fileId" in body:
                 _update_status(body["fileId"], "failed", str(e))
 
+    print(f"[INFO] 배치 처리 완료 - 성공 {len(records) - len(failures)}건, 실패 {len(failures)}건")
+    return {"batchItemFailures": [{"itemIdentifier": message_id} for message_id in failures]}
+
+
+def _source_format(message: dict) -> str:
+    if message.get("mimeType", "") == "application/pdf":
+        return "pdf"
+    return os.path.splitext(message["key"])[1].lstrip(".").lower()
+
 
-def _convert_or_copy(message: dict):
+def _convert_or_copy(message: dict, deadline: float = None):
     file_id = message["fileId"]
     key = message["key"]
-    mime_type = message.get("mimeType", "")
     owner_id = message.get("ownerId", "unknown")
 
     # 업로드 날짜 추출
@@ -47,13 +90,39 @@ def _convert_or_copy(message: dict):
     except Exception as e:
         raise Exception(f"key에서 날짜 경로 추출 실패: {e}")
 
-    if mime_type == "application/pdf" or key.lower().endswith(".pdf"):
+    source_format = _source_format(message)
+    raw_s3_path = f"s3://{RAW_BUCKET}/{key}"
+
+    if source_format in TEXT_NATIVE_FORMATS:
+        # 텍스트 기반 형식은 PDF 변환 없이 원본을 추출 단계에서 직접 파싱
+        print(f"[INFO] 텍스트 형식({source_format}) → 변환 생략, 원본 그대로 추출 단계로 전달")
+        _dispatch_to_extract(file_id, owner_id, raw_s3_path, source_format)
+        return
+
+    if source_format in OFFICE_NATIVE_FORMATS:
+        # OOXML은 추출 단계에서 원본을 직접 파싱 → 추출을 먼저 보내고 PDF(미리보기용)는 이후 생성
+        print(f"[INFO] OOXML({source_format}) → 추출 단계 선전달 후 PDF 변환")
+        _dispatch_to_extract(file_id, owner_id, raw_s3_path, source_format)
+        try:
+            _convert_and_store_pdf(key, converted_key, deadline)
+            _update_pdf_status(file_id, "converted")
+        except Exception as e:
+            # 텍스트 처리는 이미 진행 중이므로 파일 전체를 실패 처리하지 않음
+            print(f"[ERROR] 미리보기 PDF 변환 실패: {e}")
+            _update_pdf_status(file_id, "failed", str(e))
+        return
+
+    if source_format == "pdf":
         print("[INFO] PDF → 그대로 복사")
         _copy_pdf_to_converted(key, converted_key)
     else:
         print("[INFO] 비PDF → LibreOffice 변환")
-        _convert_and_store_pdf(key, converted_key)
+        _convert_and_store_pdf(key, converted_key, deadline)
+
+    _dispatch_to_extract(file_id, owner_id, f"s3://{CONVERTED_BUCKET}/{converted_key}", "pdf")
 
+
+def _dispatch_to_extract(file_id: str, owner_id: str, s3_path: str, source_format: str):
     print("[INFO] 변환 완료 → status 업데이트")
     _update_status(file_id, "converted")
 
@@ -61,11 +130,11 @@ def _convert_or_copy(message: dict):
     _send_to_extract_queue({
         "fileId": file_id,
         "userId": owner_id,
-        "s3Path": f"s3://{CONVERTED_BUCKET}/{converted_key}"
+        "s3Path": s3_path,
+        "sourceFormat": source_format
     })
 
 
-
 def _copy_pdf_to_converted(src_key: str, dest_key: str):
     try:
         # S3 객체 존재 확인 (존재하지 않으면 ClientError)
@@ -81,29 +150,60 @@ def _copy_pdf_to_converted(src_key: str, dest_key: str):
     print(f"[INFO] ✅ PDF 복사 완료: s3://{CONVERTED_BUCKET}/{dest_key}")
 
 
-def _convert_and_store_pdf(src_key: str, dest_key: str):
+def _convert_and_store_pdf(src_key: str, dest_key: str, deadline: float = None):
     with tempfile.TemporaryDirectory() as tmpdir:
         local_input = os.path.join(tmpdir, os.path.basename(src_key))
         s3.download_file(RAW_BUCKET, src_key, local_input)
         print(f"[INFO] 원본 다운로드 완료: {local_input}")
 
-        # LibreOffice 사용자 프로필 디렉토리 설정
-        user_install_path = os.path.join(tmpdir, "lo_profile")
-        os.makedirs(user_install_path, exist_ok=True)
-        os.environ["HOME"] = user_install_path
-        os.environ["USER_INSTALLATION"] = f"file://{user_install_path}"
-
-        result = os.system(f"libreoffice --headless --nologo --convert-to pdf --outdir {tmpdir} {local_input}")
-        print(f"[INFO] LibreOffice 실행 결과: {result}")
+        # 동일 원본이 이미 변환된 적 있으면 캐시된 PDF를 서버측 복사
+        cache_key = _conversion_cache_key(local_input)
+        if _copy_from_conversion_cache(cache_key, dest_key):
+            return
 
-        pdf_files = [f for f in glob.glob(os.path.join(tmpdir, "*.pdf")) if os.path.isfile(f)]
-        if not pdf_files:
-            raise Exception("PDF 변환 실패: 생성된 PDF 없음")
+        # 상주 LibreOffice listener로 변환 (warm 호출 시 soffice 기동 생략)
+        local_output = os.path.join(tmpdir, f"{os.path.splitext(os.path.basename(src_key))[0]}.pdf")
+        lo_daemon.convert_to_pdf(local_input, local_output, deadline)
 
-        with open(pdf_files[0], "rb") as f:
+        with open(local_output, "rb") as f:
             s3.upload_fileobj(f, CONVERTED_BUCKET, dest_key)
         print(f"[INFO] PDF 변환 및 업로드 완료: s3://{CONVERTED_BUCKET}/{dest_key}")
 
+        _store_in_conversion_cache(dest_key, cache_key)
+
+
+def _conversion_cache_key(local_path: str) -> str:
+    # 원본 바이트의 SHA-256 + 변환기 버전 기준 content-addressed 경로
+    digest = hashlib.sha256()
+    with open(local_path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return f"{CONVERT_CACHE_PREFIX}/{CONVERTER_VERSION}/{digest.hexdigest()}.pdf"
+
+
+def _copy_from_conversion_cache(cache_key: str, dest_key: str) -> bool:
+    try:
+        s3.head_object(Bucket=CONVERTED_BUCKET, Key=cache_key)
+    except ClientError as e:
+        if e.response["Error"]["Code"] not in ("404", "NoSuchKey"):
+            print(f"[WARN] 변환 캐시 조회 실패: {e}")
+        return False
+
+    copy_source = {"Bucket": CONVERTED_BUCKET, "Key": cache_key}
+    s3.copy_object(Bucket=CONVERTED_BUCKET, CopySource=copy_source, Key=dest_key)
+    print(f"[INFO] 변환 캐시 적중 → 복사 완료: s3://{CONVERTED_BUCKET}/{cache_key} → {dest_key}")
+    return True
+
+
+def _store_in_conversion_cache(dest_key: str, cache_key: str):
+    # 캐시 저장 실패는 변환 결과에 영향 없음
+    try:
+        copy_source = {"Bucket": CONVERTED_BUCKET, "Key": dest_key}
+        s3.copy_object(Bucket=CONVERTED_BUCKET, CopySource=copy_source, Key=cache_key)
+        print(f"[INFO] 변환 캐시 저장 완료: s3://{CONVERTED_BUCKET}/{cache_key}")
+    except Exception as e:
+        print(f"[WARN] 변환 캐시 저장 실패: {e}")
+
 
 
 def _update_status(file_id: str, status: str, error_msg: str = None):
@@ -124,6 +224,24 @@ def _update_status(file_id: str, status: str, error_msg: str = None):
         print(f"[ERROR] DynamoDB 상태 업데이트 실패: {e}")
 
 
+def _update_pdf_status(file_id: str, pdf_status: str, error_msg: str = None):
+    # 추출과 병행하는 미리보기 PDF 변환 결과 (처리 단계 status와 별도)
+    update_expr = "SET pdfStatus = :p, updatedAt = :u"
+    expr_values = {":p": pdf_status, ":u": int(time.time())}
+    if error_msg:
+        update_expr += ", pdfErrorMsg = :e"
+        expr_values[":e"] = error_msg
+    try:
+        files_table.update_item(
+            Key={"fileId": file_id},
+            UpdateExpression=update_expr,
+            ExpressionAttributeValues=expr_values
+        )
+        print(f"[INFO] fileId={file_id} PDF 상태 → {pdf_status}")
+    except Exception as e:
+        print(f"[ERROR] DynamoDB PDF 상태 업데이트 실패: {e}")
+
+
 def _send_to_extract_queue(message: dict):
     try:
         sqs.send_message(
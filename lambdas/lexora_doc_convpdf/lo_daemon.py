@@ -0,0 +1,166 @@
+import os
+import shutil
+import signal
+import socket
+import subprocess
+import time
+
+# LibreOffice 상주 프로세스(UNO socket listener) 관리
+# - warm Lambda 호출 간 soffice 프로세스를 재사용해서 기동/프로필 생성/폰트 스캔 비용 제거
+# - 문서 변환은 LibreOffice 내장 python으로 uno_convert.py를 실행해서 socket으로 전달
+
+LO_BIN = os.getenv("LO_BIN", "libreoffice")
+LO_PYTHON = os.getenv("LO_PYTHON")  # 미지정 시 LibreOffice 내장 python (<program>/python)
+LO_PORT = int(os.getenv("LO_PORT", "2002"))
+LO_PROFILE_SEED = os.getenv("LO_PROFILE_SEED", "/opt/lo_profile_seed")
+LO_PROFILE_DIR = os.getenv("LO_PROFILE_DIR", "/tmp/lo_profile")
+LO_STARTUP_TIMEOUT = float(os.getenv("LO_STARTUP_TIMEOUT", "30"))
+LO_CONVERT_TIMEOUT = float(os.getenv("LO_CONVERT_TIMEOUT", "300"))
+# 남은 시간이 이보다 적으면 one-shot 재시도를 하지 않음 (soffice 기동만으로도 수 초 걸림)
+LO_MIN_CONVERT_SECONDS = float(os.getenv("LO_MIN_CONVERT_SECONDS", "30"))
+
+UNO_CONVERT_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "uno_convert.py")
+
+_process = None
+
+
+def _program_dir() -> str:
+    # /usr/bin/libreoffice → /opt/libreoffice7.5/program/soffice 심볼릭 링크
+    return os.path.dirname(os.path.realpath(shutil.which(LO_BIN) or LO_BIN))
+
+
+def _lo_env() -> dict:
+    env = dict(os.environ)
+    env["HOME"] = "/tmp"  # Lambda에서 쓰기 가능한 경로는 /tmp 뿐
+    return env
+
+
+def _prepare_profile(profile_dir: str):
+    # 이미지 빌드 시 미리 생성해 둔 프로필을 /tmp로 복사 (cold start 1회)
+    if os.path.isdir(profile_dir):
+        return
+    if os.path.isdir(LO_PROFILE_SEED):
+        shutil.copytree(LO_PROFILE_SEED, profile_dir)
+        print(f"[INFO] LibreOffice 프로필 복사 완료: {LO_PROFILE_SEED} → {profile_dir}")
+    else:
+        os.makedirs(profile_dir, exist_ok=True)
+        print(f"[WARN] 사전 생성 프로필 없음 - 빈 프로필 사용: {profile_dir}")
+
+
+def _is_listening() -> bool:
+    try:
+        with socket.create_connection(("127.0.0.1", LO_PORT), timeout=0.5):
+            return True
+    except OSError:
+        return False
+
+
+def ensure_running():
+    global _process
+
+    if _process is not None and _process.poll() is None and _is_listening():
+        return
+
+    shutdown()
+    _prepare_profile(LO_PROFILE_DIR)
+
+    started = time.time()
+    _process = subprocess.Popen(
+        [
+            LO_BIN,
+            "--headless", "--invisible", "--nologo", "--nodefault",
+            "--norestore", "--nofirststartwizard", "--nolockcheck",
+            f"-env:UserInstallation=file://{LO_PROFILE_DIR}",
+            f"--accept=socket,host=127.0.0.1,port={LO_PORT};urp;StarOffice.ComponentContext",
+        ],
+        env=_lo_env(),
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True,  # soffice → oosplash → soffice.bin 전체를 process group으로 종료
+    )
+
+    while time.time() - started < LO_STARTUP_TIMEOUT:
+        if _process.poll() is not None:
+            raise Exception(f"LibreOffice listener 기동 실패 (exit={_process.returncode})")
+        if _is_listening():
+            print(f"[INFO] LibreOffice listener 기동 완료 ({time.time() - started:.2f}s, port={LO_PORT})")
+            return
+        time.sleep(0.1)
+
+    shutdown()
+    raise Exception(f"LibreOffice listener 기동 시간 초과 ({LO_STARTUP_TIMEOUT}s)")
+
+
+def listener_pid():
+    return _process.pid if _process is not None and _process.poll() is None else None
+
+
+def shutdown():
+    global _process
+
+    if _process is None:
+        return
+    try:
+        os.killpg(_process.pid, signal.SIGKILL)
+    except ProcessLookupError:
+        pass
+    _process.wait()
+    _process = None
+
+
+def _time_left(deadline: float = None) -> float:
+    # 변환 subprocess 제한 시간: LO_CONVERT_TIMEOUT과 호출자가 준 마감 시각(time.time() 기준)까지 남은 시간 중 작은 값
+    if deadline is None:
+        return LO_CONVERT_TIMEOUT
+    return min(LO_CONVERT_TIMEOUT, deadline - time.time())
+
+
+def _convert_via_listener(input_path: str, output_path: str, deadline: float = None):
+    ensure_running()
+    result = subprocess.run(
+        [LO_PYTHON or os.path.join(_program_dir(), "python"), UNO_CONVERT_SCRIPT,
+         str(LO_PORT), input_path, output_path],
+        env=_lo_env(),
+        capture_output=True,
+        text=True,
+        timeout=max(_time_left(deadline), 1),
+    )
+    if result.returncode != 0 or not os.path.isfile(output_path):
+        raise Exception(f"UNO 변환 실패 (exit={result.returncode}): {result.stderr.strip()[-500:]}")
+
+
+def _convert_one_shot(input_path: str, output_path: str, deadline: float = None):
+    # listener 사용이 불가능할 때의 기존 방식 (매 호출 soffice 기동)
+    outdir = os.path.dirname(output_path)
+    profile_dir = os.path.join(outdir, "lo_profile_oneshot")
+    _prepare_profile(profile_dir)
+    result = subprocess.run(
+        [LO_BIN, "--headless", "--nologo", "--norestore",
+         f"-env:UserInstallation=file://{profile_dir}",
+         "--convert-to", "pdf", "--outdir", outdir, input_path],
+        env=_lo_env(),
+        capture_output=True,
+        text=True,
+        timeout=_time_left(deadline),
+    )
+    print(f"[INFO] LibreOffice 실행 결과: {result.returncode}")
+
+    produced = os.path.join(outdir, os.path.splitext(os.path.basename(input_path))[0] + ".pdf")
+    if not os.path.isfile(produced):
+        raise Exception(f"PDF 변환 실패: 생성된 PDF 없음 ({result.stderr.strip()[-500:]})")
+    if produced != output_path:
+        os.replace(produced, output_path)
+
+
+def convert_to_pdf(input_path: str, output_path: str, deadline: float = None):
+    # deadline: 변환을 끝내야 하는 시각 (time.time() 기준, Lambda 남은 실행 시간에서 계산)
+    started = time.time()
+    try:
+        _convert_via_listener(input_path, output_path, deadline)
+    except Exception as e:
+        shutdown()
+        if _time_left(deadline) < LO_MIN_CONVERT_SECONDS:
+            raise Exception(f"listener 변환 실패, 남은 시간 부족으로 one-shot 변환 생략: {e}")
+        print(f"[WARN] listener 변환 실패 → listener 재기동 후 one-shot 변환: {e}")
+        _convert_one_shot(input_path, output_path, deadline)
+    print(f"[INFO] PDF 변환 소요 시간: {time.time() - started:.2f}s")
@@ -0,0 +1,61 @@
+# LibreOffice 내장 python으로 실행되는 변환 클라이언트
+# 사용법: <program>/python uno_convert.py <port> <input_path> <output_pdf_path>
+import sys
+
+import uno
+from com.sun.star.beans import PropertyValue
+
+# 문서 종류별 PDF export 필터 (WebDocument는 TextDocument보다 먼저 검사)
+PDF_FILTERS = (
+    ("com.sun.star.sheet.SpreadsheetDocument", "calc_pdf_Export"),
+    ("com.sun.star.presentation.PresentationDocument", "impress_pdf_Export"),
+    ("com.sun.star.drawing.DrawingDocument", "draw_pdf_Export"),
+    ("com.sun.star.text.WebDocument", "writer_web_pdf_Export"),
+    ("com.sun.star.text.TextDocument", "writer_pdf_Export"),
+)
+
+
+def _props(**kwargs):
+    props = []
+    for name, value in kwargs.items():
+        prop = PropertyValue()
+        prop.Name = name
+        prop.Value = value
+        props.append(prop)
+    return tuple(props)
+
+
+def _pdf_filter(doc):
+    for service, filter_name in PDF_FILTERS:
+        if doc.supportsService(service):
+            return filter_name
+    return "writer_pdf_Export"
+
+
+def main(argv):
+    port, input_path, output_path = argv[1], argv[2], argv[3]
+
+    local_ctx = uno.getComponentContext()
+    resolver = local_ctx.ServiceManager.createInstanceWithContext(
+        "com.sun.star.bridge.UnoUrlResolver", local_ctx
+    )
+    ctx = resolver.resolve(
+        "uno:socket,host=127.0.0.1,port=%s;urp;StarOffice.ComponentContext" % port
+    )
+    desktop = ctx.ServiceManager.createInstanceWithContext("com.sun.star.frame.Desktop", ctx)
+
+    doc = desktop.loadComponentFromURL(
+        uno.systemPathToFileUrl(input_path), "_blank", 0,
+        _props(Hidden=True, ReadOnly=True, UpdateDocMode=0),
+    )
+    if doc is None:
+        raise RuntimeError("문서 로드 실패: %s" % input_path)
+
+    try:
+        doc.storeToURL(uno.systemPathToFileUrl(output_path), _props(FilterName=_pdf_filter(doc)))
+    finally:
+        doc.close(True)
+
+
+if __name__ == "__main__":
+    main(sys.argv)
@@ -0,0 +1,91 @@
+import hashlib
+import os
+import re
+import time
+import unicodedata
+from array import array
+from collections import OrderedDict
+
+import boto3
+
+# 임베딩 캐시: hash(모델 ID, 차원, 정규화한 텍스트) → 벡터
+# - 프로세스 내 LRU (warm Lambda 재사용) → DynamoDB 순으로 조회, 둘 다 없을 때만 Bedrock 호출
+# - DynamoDB 테이블: 파티션 키 cacheKey(S), 벡터는 float32 바이너리(embedding), TTL 속성 expiresAt
+# - EMBED_CACHE_TABLE 미지정 시 LRU만 사용
+
+EMBED_CACHE_TABLE = os.environ.get("EMBED_CACHE_TABLE")
+EMBED_CACHE_LRU_SIZE = int(os.environ.get("EMBED_CACHE_LRU_SIZE", "4096"))
+EMBED_CACHE_TTL_DAYS = int(os.environ.get("EMBED_CACHE_TTL_DAYS", "90"))
+BATCH_GET_LIMIT = 100  # BatchGetItem 최대 key 수
+
+_lru = OrderedDict()
+_dynamodb = boto3.resource("dynamodb") if EMBED_CACHE_TABLE else None
+_WHITESPACE = re.compile(r"\s+")
+
+
+def cache_key(model_id: str, dimensions: int, text: str) -> str:
+    normalized = _WHITESPACE.sub(" ", unicodedata.normalize("NFC", text)).strip()
+    return hashlib.sha256(f"{model_id}\n{dimensions}\n{normalized}".encode("utf-8")).hexdigest()
+
+
+def _remember(key: str, embedding: list):
+    _lru[key] = embedding
+    _lru.move_to_end(key)
+    while len(_lru) > EMBED_CACHE_LRU_SIZE:
+        _lru.popitem(last=False)
+
+
+def _fetch(keys: list) -> dict:
+    found = {}
+    for i in range(0, len(keys), BATCH_GET_LIMIT):
+        request = {EMBED_CACHE_TABLE: {"Keys": [{"cacheKey": k} for k in keys[i:i + BATCH_GET_LIMIT]]}}
+        for _ in range(3):  # UnprocessedKeys 재조회
+            response = _dynamodb.batch_get_item(RequestItems=request)
+            for item in response["Responses"].get(EMBED_CACHE_TABLE, []):
+                found[item["cacheKey"]] = array("f", item["embedding"].value).tolist()
+            request = response.get("UnprocessedKeys")
+            if not request:
+                break
+    return found
+
+
+def get_many(keys: list) -> dict:
+    # {key: embedding} (캐시에 있는 것만)
+    found = {}
+    missing = []
+    for key in dict.fromkeys(keys):
+        if key in _lru:
+            _lru.move_to_end(key)
+            found[key] = _lru[key]
+        else:
+            missing.append(key)
+
+    if missing and _dynamodb is not None:
+        try:
+            stored = _fetch(missing)
+        except Exception as e:
+            print(f"[WARN] 임베딩 캐시 조회 실패 - Bedrock 호출로 대체: {e}")
+            stored = {}
+        for key, embedding in stored.items():
+            _remember(key, embedding)
+        found.update(stored)
+    return found
+
+
+def put_many(entries: dict):
+    for key, embedding in entries.items():
+        _remember(key, embedding)
+    if not entries or _dynamodb is None:
+        return
+    expires_at = int(time.time()) + EMBED_CACHE_TTL_DAYS * 86400
+    try:
+        with _dynamodb.Table(EMBED_CACHE_TABLE).batch_writer(overwrite_by_pkeys=["cacheKey"]) as writer:
+            for key, embedding in entries.items():
+                writer.put_item(Item={
+                    "cacheKey": key,
+                    "embedding": array("f", embedding).tobytes(),
+                    "expiresAt": expires_at
+                })
+    except Exception as e:
+        # 캐시 저장 실패는 임베딩 결과에 영향 없음
+        print(f"[WARN] 임베딩 캐시 저장 실패: {e}")
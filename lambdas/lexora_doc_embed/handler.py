@@ -1,17 +1,52 @@
 import os
+import gzip
 import json
+import random
 import boto3
 import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+from botocore.config import Config
 from botocore.exceptions import ClientError
 from opensearchpy import OpenSearch, RequestsHttpConnection, AWSV4SignerAuth
 
+import embedding_cache
+import index_admin
+from vector_quant import VECTOR_DATA_TYPE, coarse, decode_full, encode_full, quantize
+from bedrock_rate import BEDROCK_CLIENT_CONFIG, call_bedrock
+
 # 환경 변수
 OPENSEARCH_ENDPOINT = os.environ["OPENSEARCH_ENDPOINT"]
-OPENSEARCH_INDEX = os.environ.get("OPENSEARCH_INDEX", "lexora-embeddings")
+# alias 이름 (실제 인덱스는 {alias}-v{n}, index_admin 참고)
+OPENSEARCH_INDEX = os.environ.get("OPENSEARCH_INDEX", "lexora-doc-embed")
+# userId로 shard routing (질의가 한 사용자 문서만 보므로 한 shard만 검색), 켜기 전 기존 문서는 migrate_index.py --routing으로 이전
+OPENSEARCH_ROUTING = os.environ.get("OPENSEARCH_ROUTING", "false").lower() == "true"
 REGION = os.environ.get("AWS_REGION", "ap-northeast-2")
+# 기본값: alias가 가리키는 인덱스의 _meta에 모델/차원이 있으면 그 값을 사용 (use_index_embedding_config)
+EMBED_MODEL_ID = os.environ.get("EMBED_MODEL_ID", "amazon.titan-embed-text-v2:0")
+EMBED_DIMENSIONS = int(os.environ.get("EMBED_DIMENSIONS", "512"))
+# 2단계 검색: 0보다 크면 HNSW에는 이 차원으로 자른 coarse 벡터, 재정렬용 전체 벡터는 embeddingFull에 저장
+EMBED_COARSE_DIMENSIONS = int(os.environ.get("EMBED_COARSE_DIMENSIONS", "0"))
+# Bedrock 임베딩 동시 호출 수
+EMBED_CONCURRENCY = int(os.environ.get("EMBED_CONCURRENCY", "8"))
+# _bulk 요청 1건당 최대 문서 수/바이트, 실패 항목 재시도 횟수
+BULK_MAX_DOCS = int(os.environ.get("BULK_MAX_DOCS", "200"))
+BULK_MAX_BYTES = int(os.environ.get("BULK_MAX_BYTES", str(5 * 1024 * 1024)))
+BULK_MAX_RETRIES = int(os.environ.get("BULK_MAX_RETRIES", "3"))
+BULK_RETRYABLE_STATUS = {429, 502, 503, 504}
+# 한 번에 임베딩/색인하는 chunk 수 (체크포인트 단위), 이보다 남은 실행 시간이 적으면 중단 후 재시도
+EMBED_STEP_CHUNKS = int(os.environ.get("EMBED_STEP_CHUNKS", "16"))
+EMBED_TIME_SAFETY_MS = int(os.environ.get("EMBED_TIME_SAFETY_MS", "20000"))
+
+s3 = boto3.client("s3")
 
 # Bedrock
-bedrock = boto3.client("bedrock-runtime", region_name=REGION)
+bedrock = boto3.client(
+    "bedrock-runtime",
+    region_name=REGION,
+    # 동시 호출 수만큼 연결 풀 확보, 재시도는 bedrock_rate에서 처리
+    config=BEDROCK_CLIENT_CONFIG.merge(Config(max_pool_connections=max(EMBED_CONCURRENCY, 10)))
+)
 
 # OpenSearch 설정
 credentials = boto3.Session().get_credentials()
@@ -25,16 +60,27 @@ opensearch = OpenSearch(
     connection_class=RequestsHttpConnection
 )
 
+class RemainingTimeExceeded(Exception):
+    pass
+
+
+def _routing(user_id: str) -> dict:
+    # OpenSearch 요청 인자에 넣을 routing (꺼져 있으면 빈 dict)
+    return {"routing": user_id} if OPENSEARCH_ROUTING else {}
+
+
 def embed_text(text: str):
     payload = {
         "inputText": text,
-        "dimensions": 512,         # 원하는 차원 수
+        "dimensions": EMBED_DIMENSIONS,   # 원하는 차원 수
         "normalize": True          # 단위 벡터 정규화
     }
 
     try:
-        response = bedrock.invoke_model(
-            modelId="amazon.titan-embed-text-v2:0",   # 정확한 모델 ID
+        response = call_bedrock(
+            EMBED_MODEL_ID,
+            bedrock.invoke_model,
+            modelId=EMBED_MODEL_ID,   # 정확한 모델 ID
             body=json.dumps(payload),
             accept="application/json",
             contentType="application/json"
@@ -51,79 +97,379 @@ def embed_text(text: str):
         raise Exception(f"[ERROR] 임베딩 실패: {e}")
 
 
-def index_to_opensearch(doc: dict):
+def embed_texts(texts: list) -> list:
+    # 스레드 풀로 동시에 호출하고 입력 순서대로 결과 반환 (하나라도 실패하면 예외)
+    if len(texts) <= 1 or EMBED_CONCURRENCY <= 1:
+        return [embed_text(t) for t in texts]
+    with ThreadPoolExecutor(max_workers=min(EMBED_CONCURRENCY, len(texts))) as executor:
+        return list(executor.map(embed_text, texts))
+
+
+def embed_texts_cached(texts: list) -> list:
+    # 같은 모델/차원/텍스트는 캐시(LRU → DynamoDB)에서 가져오고 나머지만 Bedrock 호출
+    keys = [embedding_cache.cache_key(EMBED_MODEL_ID, EMBED_DIMENSIONS, t) for t in texts]
+    cached = embedding_cache.get_many(keys)
+
+    missing = {}
+    for key, text in zip(keys, texts):
+        if key not in cached:
+            missing.setdefault(key, text)
+    fresh = dict(zip(missing, embed_texts(list(missing.values()))))
+    embedding_cache.put_many(fresh)
+
+    print(f"[INFO] 임베딩 캐시 적중 {len(texts) - len(missing)}/{len(texts)}개")
+    return [cached.get(key) or fresh[key] for key in keys]
+
+
+def load_chunks(body: dict) -> list:
+    # extract 단계가 S3에 저장한 chunk part(gzip JSONL)를 읽음, 이전 형식(chunks 인라인)도 지원
+    if "chunksPath" not in body:
+        return body.get("chunks", [])
+
+    parsed = urlparse(body["chunksPath"])
     try:
-        response = opensearch.index(
-            index=OPENSEARCH_INDEX,
-            id=f"{doc['userId']}_{doc['fileId']}_{doc['chunkIndex']}",
-            body=doc,
+        obj = s3.get_object(Bucket=parsed.netloc, Key=parsed.path.lstrip("/"))
+    except ClientError as e:
+        raise Exception(f"[ERROR] chunk part 읽기 실패 - {e}")
+    lines = gzip.decompress(obj["Body"].read()).decode("utf-8").splitlines()
+    return [json.loads(line) for line in lines if line.strip()]
+
+
+def lookup_existing_embeddings(file_id: str, user_id: str, content_hashes: list) -> dict:
+    # 새 버전에서 위치만 바뀐 chunk는 이전 버전 색인의 벡터를 그대로 사용 {contentHash: embedding}
+    content_hashes = sorted(set(content_hashes))
+    if not content_hashes:
+        return {}
+    # 2단계 검색 인덱스는 전체 벡터(embeddingFull)를 재사용
+    field = "embeddingFull" if EMBED_COARSE_DIMENSIONS else "embedding"
+    query = {
+        "size": len(content_hashes),
+        "_source": ["contentHash", field],
+        "query": {
+            "bool": {
+                "filter": [
+                    {"term": {"fileId": file_id}},
+                    {"terms": {"contentHash": content_hashes}}
+                ]
+            }
+        },
+        # 같은 내용의 chunk가 여러 개 색인돼 있어도 hash당 1건만 (반복 chunk가 다른 hash의 자리를 차지하지 않도록)
+        "collapse": {"field": "contentHash"}
+    }
+    try:
+        hits = opensearch.search(index=OPENSEARCH_INDEX, body=query, **_routing(user_id))["hits"]["hits"]
+    except Exception as e:
+        print(f"[WARN] 기존 벡터 조회 실패 - 새로 임베딩: {e}")
+        return {}
+    if EMBED_COARSE_DIMENSIONS:
+        return {h["_source"]["contentHash"]: decode_full(h["_source"][field]) for h in hits if field in h["_source"]}
+    return {h["_source"]["contentHash"]: h["_source"]["embedding"] for h in hits}
+
+
+def prune_stale_chunks(file_id: str, user_id: str, chunk_count: int):
+    # 새 버전의 chunk 수 이후 번호로 남아 있는 이전 버전 chunk 색인 삭제
+    query = {
+        "query": {
+            "bool": {
+                "filter": [
+                    {"term": {"fileId": file_id}},
+                    {"term": {"userId": user_id}},
+                    {"range": {"chunkIndex": {"gte": chunk_count}}}
+                ]
+            }
+        }
+    }
+    try:
+        response = opensearch.delete_by_query(
+            index=OPENSEARCH_INDEX, body=query, conflicts="proceed", **_routing(user_id)
         )
-        return response
+        print(f"[INFO] 이전 버전 chunk 삭제 - fileId={file_id}, chunkIndex>={chunk_count}, 삭제 {response.get('deleted', 0)}개")
+    except Exception as e:
+        raise Exception(f"[ERROR] 이전 버전 chunk 삭제 실패 - {e}")
+
+def _doc_id(doc: dict) -> str:
+    return f"{doc['userId']}_{doc['fileId']}_{doc['chunkIndex']}"
+
+
+def _iter_bulk_requests(docs: list):
+    # (문서 목록, NDJSON 본문)을 문서 수/바이트 한도 안에서 나눠 반환
+    batch, lines, size = [], [], 0
+    for doc in docs:
+        action = json.dumps({"index": {"_index": OPENSEARCH_INDEX, "_id": _doc_id(doc), **_routing(doc["userId"])}})
+        source = json.dumps(doc, ensure_ascii=False)
+        doc_bytes = len(action) + len(source.encode("utf-8")) + 2
+        if batch and (len(batch) >= BULK_MAX_DOCS or size + doc_bytes > BULK_MAX_BYTES):
+            yield batch, "\n".join(lines) + "\n"
+            batch, lines, size = [], [], 0
+        batch.append(doc)
+        lines.extend((action, source))
+        size += doc_bytes
+    if batch:
+        yield batch, "\n".join(lines) + "\n"
+
+
+def _bulk_failures(docs: list, body: str) -> list:
+    # 실패한 항목만 [(doc, status, error)]로 반환, 요청 자체가 실패하면 전체를 재시도 대상으로
+    try:
+        response = opensearch.bulk(body=body)
     except Exception as e:
-        raise Exception(f"[ERROR] OpenSearch 저장 실패 - {e}")
+        return [(doc, None, str(e)) for doc in docs]
+    if not response.get("errors"):
+        return []
+    failures = []
+    for doc, item in zip(docs, response["items"]):
+        result = item.get("index", {})
+        if result.get("status", 500) >= 300:
+            failures.append((doc, result.get("status"), result.get("error")))
+    return failures
+
+
+def bulk_index_to_opensearch(docs: list):
+    pending = docs
+    for attempt in range(BULK_MAX_RETRIES + 1):
+        failures = []
+        for batch, body in _iter_bulk_requests(pending):
+            failures.extend(_bulk_failures(batch, body))
+        if not failures:
+            return
+
+        # 매핑 오류 등 재시도해도 실패하는 항목이 있으면 즉시 실패 처리
+        fatal = [f for f in failures if f[1] is not None and f[1] not in BULK_RETRYABLE_STATUS]
+        if fatal:
+            doc, status, error = fatal[0]
+            raise Exception(f"[ERROR] OpenSearch bulk 저장 실패 - {len(fatal)}건, id={_doc_id(doc)}, status={status}, {error}")
+
+        pending = [f[0] for f in failures]
+        if attempt < BULK_MAX_RETRIES:
+            delay = min(0.5 * 2 ** attempt, 8) * random.uniform(0.5, 1.0)
+            print(f"[WARN] bulk 실패 항목 {len(pending)}건 재시도 ({attempt + 1}/{BULK_MAX_RETRIES}, {delay:.2f}s 후) - {failures[0][2]}")
+            time.sleep(delay)
 
-def update_file_status(file_id: str, status: str, error_msg: str = None):
+    raise Exception(f"[ERROR] OpenSearch bulk 저장 실패 - 재시도 후 {len(pending)}건 남음")
+
+def mark_batch_embedded(file_id: str, batch_index: int):
+    # 완료한 batch 번호를 집합에 추가 (재전송돼도 중복 집계 없음)
+    # extract 단계가 batchCount를 기록한 뒤 모든 batch가 모이면 embedded로 전환
+    table = boto3.resource("dynamodb").Table(os.environ["FILES_TABLE"])
+    try:
+        item = table.update_item(
+            Key={"fileId": file_id},
+            UpdateExpression="ADD embeddedBatches :b SET updatedAt = :u",
+            ExpressionAttributeValues={":b": {batch_index}, ":u": int(time.time())},
+            ReturnValues="ALL_NEW",
+        )["Attributes"]
+    except Exception as e:
+        # 실패로 보고해서 SQS 재전송 → 색인은 건너뛰고(체크포인트) 같은 batch 번호로 다시 ADD (중복 집계 없음)
+        raise Exception(f"DynamoDB batch 진행 상황 업데이트 실패: {e}")
+
+    batch_count = item.get("batchCount")
+    done = len(item.get("embeddedBatches", ()))
+    print(f"[INFO] batch 완료 - fileId={file_id}, batch={batch_index}, 진행 {done}/{batch_count or '?'}")
+    if batch_count is not None and done >= batch_count:
+        mark_file_embedded(file_id, item.get("pendingManifest"))
+
+def mark_file_embedded(file_id: str, manifest_path: str = None):
+    # 이번 버전의 chunk manifest를 색인 완료 기준(indexedManifest)으로 승격 → 다음 버전은 이 기준으로 변경분만 임베딩
+    index_admin.refresh(opensearch, OPENSEARCH_INDEX)
     table = boto3.resource("dynamodb").Table(os.environ["FILES_TABLE"])
     update_expr = "SET #s = :s, updatedAt = :u"
-    expr_attr = {":s": status, ":u": int(time.time())}
-    attr_names = {"#s": "status"}
-    if error_msg:
-        update_expr += ", errorMsg = :e"
-        expr_attr[":e"] = error_msg
+    expr_attr = {":s": "embedded", ":u": int(time.time())}
+    if manifest_path:
+        update_expr += ", indexedManifest = :m"
+        expr_attr[":m"] = manifest_path
     try:
-        table.update_item(
+        old = table.update_item(
             Key={"fileId": file_id},
             UpdateExpression=update_expr,
             ExpressionAttributeValues=expr_attr,
-            ExpressionAttributeNames=attr_names,
+            ExpressionAttributeNames={"#s": "status"},
+            ReturnValues="UPDATED_OLD",
+        ).get("Attributes", {})
+        print(f"[INFO] 상태 업데이트 완료 - fileId={file_id}, status=embedded")
+    except Exception as e:
+        # 삼키면 메시지가 삭제되고 파일은 extracted로 남음 → 실패로 보고해서 재시도 (같은 값 SET이라 재실행 안전)
+        raise Exception(f"DynamoDB 상태 업데이트 실패: {e}")
+
+    # 승격으로 더 이상 비교 기준이 아닌 이전 manifest 삭제 (재추출마다 새 key로 저장되므로)
+    if manifest_path and old.get("indexedManifest") not in (None, manifest_path):
+        delete_superseded_manifest(old["indexedManifest"])
+
+def delete_superseded_manifest(manifest_path: str):
+    # 삭제 실패는 상태에 영향 없음
+    parsed = urlparse(manifest_path)
+    try:
+        s3.delete_object(Bucket=parsed.netloc, Key=parsed.path.lstrip("/"))
+        print(f"[INFO] 이전 chunk manifest 삭제 - {manifest_path}")
+    except Exception as e:
+        print(f"[WARN] 이전 chunk manifest 삭제 실패: {e}")
+
+def build_doc(file_id: str, user_id: str, chunk: dict, embedding: list) -> dict:
+    chunk_index = chunk["chunkIndex"]
+    page_number = chunk.get("page")
+    token_count = chunk.get("tokenCount")
+    content_hash = chunk.get("contentHash")
+
+    doc = {
+        "fileId": file_id,
+        "userId": user_id,
+        "chunkIndex": chunk_index,
+        "content": chunk["content"],
+        "timestamp": int(time.time())
+    }
+
+    # 인덱스 저장 형식(byte/fp16)에 맞춰 양자화해서 저장
+    if EMBED_COARSE_DIMENSIONS:
+        doc["embedding"] = quantize(coarse(embedding, EMBED_COARSE_DIMENSIONS), VECTOR_DATA_TYPE)
+        doc["embeddingFull"] = encode_full(embedding)
+    else:
+        doc["embedding"] = quantize(embedding, VECTOR_DATA_TYPE)
+
+    # page 정보가 있다면 추가
+    if page_number is not None:
+        doc["page"] = page_number
+    else:
+        print(f"[INFO] chunk={chunk_index}에는 page 정보가 없습니다.")
+
+    # 질의 시 프롬프트 토큰 예산 계산용
+    if token_count is not None:
+        doc["tokenCount"] = token_count
+    # 새 버전 재수집 시 기존 벡터 재사용 조회용
+    if content_hash:
+        doc["contentHash"] = content_hash
+    return doc
+
+
+def find_indexed_chunks(file_id: str, user_id: str, chunks: list) -> set:
+    # 재전송된 메시지: 이전 실행에서 이미 같은 내용/페이지로 색인된 chunkIndex (mget은 refresh 없이도 조회됨)
+    candidates = [c for c in chunks if c.get("contentHash")]
+    if not candidates:
+        return set()
+    try:
+        response = opensearch.mget(
+            index=OPENSEARCH_INDEX,
+            body={"ids": [f"{user_id}_{file_id}_{c['chunkIndex']}" for c in candidates]},
+            _source_includes=["contentHash", "page"],
+            **_routing(user_id),
         )
-        print(f"[INFO] 상태 업데이트 완료 - fileId={file_id}, status={status}")
     except Exception as e:
-        print(f"[ERROR] DynamoDB 상태 업데이트 실패: {e}")
+        print(f"[WARN] 기존 색인 조회 실패 - 처음부터 처리: {e}")
+        return set()
+
+    done = set()
+    for chunk, doc in zip(candidates, response.get("docs", [])):
+        source = doc.get("_source", {}) if doc.get("found") else {}
+        if source.get("contentHash") == chunk["contentHash"] and source.get("page") == chunk.get("page"):
+            done.add(chunk["chunkIndex"])
+    return done
 
-def lambda_handler(event, context):
-    print("[INFO] Lexora Embed Lambda triggered")
-    for record in event.get("Records", []):
-        try:
-            body = json.loads(record["body"])
-            print(f"[INFO] Message body: {body}")
 
-            file_id = body["fileId"]
-            user_id = body["userId"]
-            chunks = body.get("chunks", [])
+def embed_and_index_chunks(file_id: str, user_id: str, chunks: list, context):
+    done = find_indexed_chunks(file_id, user_id, chunks)
+    pending = [c for c in chunks if c["chunkIndex"] not in done]
+    if done:
+        print(f"[INFO] 이전 실행 진행분 건너뜀 - fileId={file_id}, 완료 {len(done)}개, 남은 {len(pending)}개")
 
-            if not chunks:
-                print(f"[WARNING] chunks가 없음 - fileId={file_id}")
-                continue
+    reused = lookup_existing_embeddings(
+        file_id, user_id, list({c["contentHash"] for c in pending if c.get("reuse")})
+    )
+    if reused:
+        print(f"[INFO] 기존 벡터 재사용 - fileId={file_id}, {len(reused)}개")
 
-            for chunk in chunks:
-                chunk_index = chunk["chunkIndex"]
-                content = chunk["content"]
-                page_number = chunk.get("page")
+    # EMBED_STEP_CHUNKS개씩 임베딩 → 색인 (색인된 chunk가 체크포인트가 되어 재시도 시 이어서 처리)
+    for i in range(0, len(pending), EMBED_STEP_CHUNKS):
+        if context is not None and context.get_remaining_time_in_millis() < EMBED_TIME_SAFETY_MS:
+            raise RemainingTimeExceeded(f"남은 실행 시간 부족 - 완료 {len(done) + i}/{len(chunks)}개, 재시도 시 이어서 처리")
 
-                embedding = embed_text(content)
+        step = pending[i:i + EMBED_STEP_CHUNKS]
+        # 재사용 벡터가 없는 chunk만 Bedrock 동시 호출
+        started = time.time()
+        to_embed = [c["content"] for c in step if not reused.get(c.get("contentHash"))]
+        embeddings = iter(embed_texts_cached(to_embed))
+        print(f"[INFO] 임베딩 완료 - {len(to_embed)}개, 동시 {EMBED_CONCURRENCY}, {time.time() - started:.2f}s")
 
-                doc = {
-                    "fileId": file_id,
-                    "userId": user_id,
-                    "chunkIndex": chunk_index,
-                    "content": content,
-                    "embedding": embedding,
-                    "timestamp": int(time.time())
-                }
+        docs = [
+            build_doc(file_id, user_id, c, reused.get(c.get("contentHash")) or next(embeddings))
+            for c in step
+        ]
+        started = time.time()
+        bulk_index_to_opensearch(docs)
+        print(f"[INFO] 임베딩 저장 완료 - fileId={file_id}, chunk {len(done) + i + len(step)}/{len(chunks)}개, {time.time() - started:.2f}s")
 
-                # page 정보가 있다면 추가
-                if page_number is not None:
-                    doc["page"] = page_number
-                else:
-                    print(f"[INFO] chunk={chunk_index}에는 page 정보가 없습니다.")
 
+def use_index_embedding_config():
+    # 마이그레이션으로 alias가 새 버전 인덱스로 바뀌면 재배포 없이 그 인덱스의 모델/차원/저장 형식으로 임베딩
+    global EMBED_MODEL_ID, EMBED_DIMENSIONS, EMBED_COARSE_DIMENSIONS, VECTOR_DATA_TYPE
+    meta = index_admin.embedding_meta(opensearch, OPENSEARCH_INDEX)
+    if not meta:
+        return
+    data_type = meta.get("vectorDataType", VECTOR_DATA_TYPE)
+    if data_type != VECTOR_DATA_TYPE:
+        print(f"[INFO] 인덱스 저장 형식에 맞춰 양자화 - {data_type} (환경 변수 {VECTOR_DATA_TYPE})")
+        VECTOR_DATA_TYPE = data_type
+    model_id = meta.get("embedModelId", EMBED_MODEL_ID)
+    dimensions = int(meta.get("embedDimensions", EMBED_DIMENSIONS))
+    coarse_dimensions = int(meta.get("embedCoarseDimensions", 0))
+    if (model_id, dimensions, coarse_dimensions) != (EMBED_MODEL_ID, EMBED_DIMENSIONS, EMBED_COARSE_DIMENSIONS):
+        print(f"[INFO] 인덱스 설정에 맞춰 임베딩 모델 변경 - {model_id}, {dimensions}차원 (coarse {coarse_dimensions})")
+        EMBED_MODEL_ID, EMBED_DIMENSIONS, EMBED_COARSE_DIMENSIONS = model_id, dimensions, coarse_dimensions
 
-                index_to_opensearch(doc)
-                print(f"[INFO] 임베딩 저장 완료 - fileId={file_id}, chunk={chunk_index}, page={page_number}")
 
-            update_file_status(file_id, "embedded")
+def process_record(record, context, failures: list):
+    try:
+        body = json.loads(record["body"])
+        print(f"[INFO] Message body: {body}")
+
+        file_id = body["fileId"]
+        user_id = body["userId"]
+    except Exception as e:
+        # 파싱 불가 메시지는 재시도해도 실패하므로 실패 목록에 넣지 않음
+        print(f"[ERROR] 메시지 파싱 실패: {e}")
+        return
+
+    try:
+        if body.get("action") == "prune":
+            prune_stale_chunks(file_id, user_id, body["chunkCount"])
+            return
+
+        chunks = load_chunks(body)
+
+        if not chunks:
+            print(f"[WARNING] chunks가 없음 - fileId={file_id}")
+            return
+
+        embed_and_index_chunks(file_id, user_id, chunks, context)
+
+        # extract 단계가 batch로 나눠 보낸 경우 모든 batch가 끝나야 embedded
+        if "batchIndex" in body:
+            mark_batch_embedded(file_id, body["batchIndex"])
+        else:
+            mark_file_embedded(file_id)
+
+    except RemainingTimeExceeded as e:
+        # 실패로 보고해서 SQS 재전송 → 색인된 chunk 이후부터 이어서 처리
+        print(f"[WARN] {e} - fileId={file_id}")
+        failures.append(record["messageId"])
+    except Exception as e:
+        print(f"[ERROR] 처리 실패 - fileId={file_id}, error={e}")
+        failures.append(record["messageId"])
+
+
+def lambda_handler(event, context):
+    print("[INFO] Lexora Embed Lambda triggered")
+    records = event.get("Records", [])
+    failures = []
+
+    try:
+        index_admin.ensure_alias(
+            opensearch, OPENSEARCH_INDEX, EMBED_DIMENSIONS, routing=OPENSEARCH_ROUTING, model_id=EMBED_MODEL_ID,
+            coarse_dimensions=EMBED_COARSE_DIMENSIONS,
+        )
+        use_index_embedding_config()
+    except Exception as e:
+        print(f"[WARN] 인덱스 확인 실패 - 기존 설정으로 색인: {e}")
 
-        except Exception as e:
-            print(f"[ERROR] 처리 실패 - fileId={body.get('fileId', 'N/A')}, error={e}")
+    for record in records:
+        process_record(record, context, failures)
 
+    print(f"[INFO] 배치 처리 완료 - 성공 {len(records) - len(failures)}건, 실패 {len(failures)}건")
+    return {"batchItemFailures": [{"itemIdentifier": message_id} for message_id in failures]}
@@ -0,0 +1,261 @@
+import os
+
+from vector_quant import VECTOR_DATA_TYPE
+
+# 임베딩 인덱스 관리: 명시적 kNN 매핑 생성/검증
+# - 인덱스가 없으면 아래 매핑/설정으로 생성, 있으면 embedding/keyword 필드 매핑을 검증
+# - ef_search / refresh_interval은 동적 설정이라 값이 다르면 바로 갱신 (컨테이너당 한 번, Lambda 실행마다 바꾸지 않음)
+#   대량 적재 중 refresh 끄기는 migrate_index.py가 새 인덱스에만 적용
+# - 벡터 저장 형식(VECTOR_DATA_TYPE)에 따라 엔진이 정해짐: byte → lucene, fp16 → faiss sq 인코더
+#   (저장 형식은 인덱스 생성 후 바꿀 수 없으므로 형식을 바꿀 때는 새 인덱스 이름 사용)
+#   저장 형식도 _meta(vectorDataType)에 기록 → embed/query Lambda는 환경 변수가 아니라 인덱스 형식에 맞춰 양자화
+# - userId routing을 쓰는 인덱스는 _routing을 필수로 지정 (routing 없는 색인 요청은 거부됨)
+#   기존 인덱스 이전: python migrate_index.py --alias <alias> --dimensions <차원> --routing (새 버전 인덱스로 이전 후 alias 전환)
+# - Lambda는 alias({alias})로 접근하고 실제 인덱스는 {alias}-v{n} (모델/차원 변경은 migrate_index.py로 새 버전 생성 후 alias 전환)
+#   인덱스 _meta에 임베딩 모델/차원을 기록 → embed/query Lambda는 alias가 가리키는 인덱스의 모델/차원을 따름
+# - coarse 차원을 지정하면 kNN 필드(embedding)는 coarse 차원, 전체 벡터는 색인하지 않는 embeddingFull(binary)에 저장
+
+KNN_ENGINE = os.environ.get("KNN_ENGINE", "nmslib")
+KNN_SPACE_TYPE = os.environ.get("KNN_SPACE_TYPE", "cosinesimil")
+HNSW_M = int(os.environ.get("HNSW_M", "16"))
+HNSW_EF_CONSTRUCTION = int(os.environ.get("HNSW_EF_CONSTRUCTION", "256"))
+HNSW_EF_SEARCH = int(os.environ.get("HNSW_EF_SEARCH", "100"))
+INDEX_SHARDS = int(os.environ.get("INDEX_SHARDS", "2"))
+INDEX_REPLICAS = int(os.environ.get("INDEX_REPLICAS", "1"))
+SEARCH_REFRESH_INTERVAL = os.environ.get("SEARCH_REFRESH_INTERVAL", "1s")
+
+KEYWORD_FIELDS = ("fileId", "userId", "contentHash")
+
+_ensured = set()
+
+
+def knn_field(dimensions: int, data_type: str = VECTOR_DATA_TYPE) -> dict:
+    parameters = {"m": HNSW_M, "ef_construction": HNSW_EF_CONSTRUCTION}
+    field = {"type": "knn_vector", "dimension": dimensions}
+    if data_type == "byte":
+        engine, space_type = "lucene", "cosinesimil"
+        field["data_type"] = "byte"
+    elif data_type == "fp16":
+        engine, space_type = "faiss", "innerproduct"
+        parameters["encoder"] = {"name": "sq", "parameters": {"type": "fp16"}}
+    else:
+        engine, space_type = KNN_ENGINE, KNN_SPACE_TYPE
+    field["method"] = {"name": "hnsw", "engine": engine, "space_type": space_type, "parameters": parameters}
+    return field
+
+
+def stored_data_type(field: dict) -> str:
+    # kNN 필드 매핑에서 실제 저장 형식 판별 (byte: data_type, fp16: faiss sq 인코더)
+    if field.get("data_type") == "byte":
+        return "byte"
+    encoder = field.get("method", {}).get("parameters", {}).get("encoder", {})
+    if encoder.get("name") == "sq" and encoder.get("parameters", {}).get("type", "fp16") == "fp16":
+        return "fp16"
+    return "float"
+
+
+def index_body(dimensions: int, routing: bool = False, model_id: str = None, coarse_dimensions: int = 0,
+               data_type: str = VECTOR_DATA_TYPE) -> dict:
+    body = {
+        "settings": {
+            "index": {
+                "knn": True,
+                "knn.algo_param.ef_search": HNSW_EF_SEARCH,
+                "number_of_shards": INDEX_SHARDS,
+                "number_of_replicas": INDEX_REPLICAS,
+                "refresh_interval": SEARCH_REFRESH_INTERVAL,
+            }
+        },
+        "mappings": {
+            "properties": {
+                "fileId": {"type": "keyword"},
+                "userId": {"type": "keyword"},
+                "contentHash": {"type": "keyword"},
+                "chunkIndex": {"type": "integer"},
+                "page": {"type": "integer"},
+                "tokenCount": {"type": "integer"},
+                "timestamp": {"type": "date", "format": "epoch_second"},
+                "content": {"type": "text"},
+                "embedding": knn_field(coarse_dimensions or dimensions, data_type),
+            }
+        },
+    }
+    if routing:
+        body["mappings"]["_routing"] = {"required": True}
+    if coarse_dimensions:
+        # 재정렬용 전체 차원 벡터 (fp16 base64, _source에만 저장)
+        body["mappings"]["properties"]["embeddingFull"] = {"type": "binary"}
+    if model_id:
+        body["mappings"]["_meta"] = embedding_meta_body(model_id, dimensions, coarse_dimensions, data_type)
+    return body
+
+
+def embedding_meta_body(model_id: str, dimensions: int, coarse_dimensions: int = 0,
+                        data_type: str = VECTOR_DATA_TYPE) -> dict:
+    meta = {"embedModelId": model_id, "embedDimensions": dimensions, "vectorDataType": data_type}
+    if coarse_dimensions:
+        meta["embedCoarseDimensions"] = coarse_dimensions
+    return meta
+
+
+def validate_index(opensearch, index: str, dimensions: int, routing: bool = False) -> list:
+    # 매핑 불일치 목록 반환 (기존 인덱스는 재생성하지 않고 경고만)
+    problems = []
+    for name, mapping in opensearch.indices.get_mapping(index=index).items():
+        if routing and not mapping["mappings"].get("_routing", {}).get("required"):
+            problems.append(f"{name}: _routing 필수 아님 (routing 없이 색인된 기존 문서는 검색되지 않을 수 있음, migrate_index.py --routing으로 이전 필요)")
+        properties = mapping["mappings"].get("properties", {})
+        embedding = properties.get("embedding", {})
+        # _meta에 기록된 차원이 있으면 그 값이 기준 (환경 변수보다 우선), 2단계 검색 인덱스는 coarse 차원
+        meta = mapping["mappings"].get("_meta", {})
+        expected = int(meta.get("embedCoarseDimensions") or meta.get("embedDimensions", dimensions))
+        data_type = stored_data_type(embedding)
+        if meta and "vectorDataType" not in meta and embedding.get("type") == "knn_vector":
+            # 저장 형식 기록 전에 만들어진 인덱스: 매핑의 형식을 _meta에 추가 (_meta는 통째로 교체됨)
+            meta = {**meta, "vectorDataType": data_type}
+            opensearch.indices.put_mapping(index=name, body={"_meta": meta})
+            print(f"[INFO] {name} _meta에 저장 형식 기록 - {data_type}")
+        if embedding.get("type") != "knn_vector":
+            problems.append(f"{name}: embedding 타입 {embedding.get('type')} (knn_vector 아님)")
+        elif embedding.get("dimension") != expected:
+            problems.append(f"{name}: embedding 차원 {embedding.get('dimension')} (기대값 {expected})")
+        elif data_type != meta.get("vectorDataType", VECTOR_DATA_TYPE):
+            # byte는 data_type, fp16은 faiss sq 인코더로 판별
+            problems.append(f"{name}: embedding 저장 형식 {data_type} (기대값 {meta.get('vectorDataType', VECTOR_DATA_TYPE)})")
+        for field in KEYWORD_FIELDS:
+            field_type = properties.get(field, {}).get("type")
+            if field_type not in (None, "keyword"):
+                problems.append(f"{name}: {field} 타입 {field_type} (keyword 아님)")
+
+    settings = opensearch.indices.get_settings(
+        index=index, name="index.knn.algo_param.ef_search,index.refresh_interval"
+    )
+    for name, value in settings.items():
+        current = value["settings"].get("index", {})
+        ef_search = current.get("knn", {}).get("algo_param", {}).get("ef_search")
+        if ef_search is not None and int(ef_search) != HNSW_EF_SEARCH:
+            opensearch.indices.put_settings(index=name, body={"index": {"knn.algo_param.ef_search": HNSW_EF_SEARCH}})
+            print(f"[INFO] {name} ef_search {ef_search} → {HNSW_EF_SEARCH}")
+        refresh_interval = current.get("refresh_interval")
+        if refresh_interval is not None and refresh_interval != SEARCH_REFRESH_INTERVAL:
+            opensearch.indices.put_settings(index=name, body={"index": {"refresh_interval": SEARCH_REFRESH_INTERVAL}})
+            print(f"[INFO] {name} refresh_interval {refresh_interval} → {SEARCH_REFRESH_INTERVAL}")
+    return problems
+
+
+def ensure_index(opensearch, index: str, dimensions: int, routing: bool = False, model_id: str = None,
+                 coarse_dimensions: int = 0):
+    # 컨테이너당 한 번만 확인
+    if index in _ensured:
+        return
+    if not opensearch.indices.exists(index=index):
+        opensearch.indices.create(index=index, body=index_body(dimensions, routing, model_id, coarse_dimensions))
+        method = knn_field(coarse_dimensions or dimensions)["method"]
+        print(f"[INFO] 인덱스 생성 - {index} (engine={method['engine']}, space={method['space_type']}, "
+              f"data_type={VECTOR_DATA_TYPE}, m={HNSW_M}, ef_construction={HNSW_EF_CONSTRUCTION}, "
+              f"ef_search={HNSW_EF_SEARCH}, dim={dimensions}, coarse={coarse_dimensions}, routing={routing})")
+    else:
+        for problem in validate_index(opensearch, index, dimensions, routing):
+            print(f"[WARN] 인덱스 매핑 불일치 - {problem}")
+    _ensured.add(index)
+
+
+def versioned_index(alias: str, version: int) -> str:
+    return f"{alias}-v{version}"
+
+
+def alias_indices(opensearch, alias: str) -> list:
+    # alias가 가리키는 실제 인덱스 이름 (alias가 없으면 빈 목록)
+    if not opensearch.indices.exists_alias(name=alias):
+        return []
+    return sorted(opensearch.indices.get_alias(name=alias))
+
+
+def next_versioned_index(opensearch, alias: str) -> str:
+    versions = []
+    for name in opensearch.indices.get(index=f"{alias}-v*", ignore_unavailable=True, allow_no_indices=True):
+        suffix = name[len(alias) + 2:]
+        if suffix.isdigit():
+            versions.append(int(suffix))
+    return versioned_index(alias, max(versions, default=0) + 1)
+
+
+def embedding_meta(opensearch, index: str) -> dict:
+    # 인덱스(또는 alias가 가리키는 인덱스) _meta의 {embedModelId, embedDimensions, vectorDataType}, 없으면 {}
+    for mapping in opensearch.indices.get_mapping(index=index).values():
+        return mapping["mappings"].get("_meta", {})
+    return {}
+
+
+def _embedding_field(opensearch, index: str) -> dict:
+    for mapping in opensearch.indices.get_mapping(index=index).values():
+        return mapping["mappings"].get("properties", {}).get("embedding", {})
+    return {}
+
+
+def ensure_alias(opensearch, alias: str, dimensions: int, routing: bool = False, model_id: str = None,
+                 coarse_dimensions: int = 0):
+    # alias가 없으면 {alias}-v1 (기존 인덱스가 있으면 그대로, 없으면 생성)에 alias를 붙임
+    if alias in _ensured:
+        return
+    if opensearch.indices.exists_alias(name=alias):
+        for index in alias_indices(opensearch, alias):
+            ensure_index(opensearch, index, dimensions, routing, model_id, coarse_dimensions)
+    elif opensearch.indices.exists(index=alias):
+        print(f"[WARN] {alias}는 alias가 아닌 인덱스 - 버전 전환 불가 (migrate_index.py로 새 버전 인덱스로 이전 필요)")
+        ensure_index(opensearch, alias, dimensions, routing, model_id, coarse_dimensions)
+    else:
+        index = versioned_index(alias, 1)
+        ensure_index(opensearch, index, dimensions, routing, model_id, coarse_dimensions)
+        if model_id and not embedding_meta(opensearch, index):
+            # 모델 정보 없이 만들어진 기존 인덱스 (단일 벡터): 현재 모델/차원과 매핑의 저장 형식을 _meta로 기록
+            opensearch.indices.put_mapping(index=index, body={"_meta": embedding_meta_body(
+                model_id, dimensions, data_type=stored_data_type(_embedding_field(opensearch, index))
+            )})
+        opensearch.indices.put_alias(index=index, name=alias)
+        print(f"[INFO] alias 생성 - {alias} → {index}")
+    _ensured.add(alias)
+
+
+def refresh(opensearch, index: str):
+    # 파일 색인 완료 직후 검색에 바로 보이도록
+    try:
+        opensearch.indices.refresh(index=index)
+    except Exception as e:
+        print(f"[WARN] 인덱스 refresh 실패 - {SEARCH_REFRESH_INTERVAL} 이내 반영: {e}")
+
+
+def _client():
+    import boto3
+    from opensearchpy import OpenSearch, RequestsHttpConnection, AWSV4SignerAuth
+
+    region = os.environ.get("AWS_REGION", "ap-northeast-2")
+    return OpenSearch(
+        hosts=[{"host": os.environ["OPENSEARCH_ENDPOINT"], "port": 443}],
+        http_auth=AWSV4SignerAuth(boto3.Session().get_credentials(), region, "es"),
+        use_ssl=True,
+        verify_certs=True,
+        connection_class=RequestsHttpConnection,
+        timeout=60,
+    )
+
+
+if __name__ == "__main__":
+    # 운영용 CLI (OPENSEARCH_ENDPOINT 환경 변수 필요, 이 디렉토리에서 PYTHONPATH=../common 으로 실행)
+    #   python index_admin.py ensure <index> [dimensions] [--routing]
+    #   python index_admin.py ensure-alias <alias> [dimensions] [--routing]   (EMBED_MODEL_ID 환경 변수를 _meta로 기록)
+    # routing 이전: python migrate_index.py --alias <alias> --dimensions <차원> --routing
+    #   → alias 전환 후 두 스택을 opensearch_routing=True로 배포
+    import sys
+
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    client = _client()
+    if args[0] == "ensure":
+        ensure_index(client, args[1], int(args[2]) if len(args) > 2 else 512, routing="--routing" in sys.argv)
+    elif args[0] == "ensure-alias":
+        ensure_alias(
+            client, args[1], int(args[2]) if len(args) > 2 else 512, routing="--routing" in sys.argv,
+            model_id=os.environ.get("EMBED_MODEL_ID", "amazon.titan-embed-text-v2:0"),
+        )
+    else:
+        sys.exit(f"알 수 없는 명령: {args[0]}")
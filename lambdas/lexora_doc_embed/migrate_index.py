@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""
+임베딩 인덱스 버전 전환 (무중단 재임베딩)
+
+alias가 가리키는 현재 인덱스의 chunk를 PIT(point in time) + search_after로 읽어 새 모델/차원으로 동시에
+다시 임베딩하고 새 버전 인덱스({alias}-v{n+1})에 색인한 뒤 alias를 한 번의 _aliases 요청으로 전환한다.
+chunk content가 인덱스에 있으므로 변환/추출 단계는 다시 실행하지 않는다.
+모델/차원/coarse 차원/저장 형식이 기존 인덱스와 모두 같으면(예: --routing만 지정) Bedrock을 호출하지 않고
+_source의 벡터(embedding/embeddingFull)를 그대로 복사한다 (--reembed로 강제 재임베딩).
+
+순서
+1. 새 인덱스 생성 (_meta에 모델/차원/저장 형식 기록, 적재 중 replica 0 / refresh 끔)
+2. 기존 인덱스 전체를 페이지 단위로 읽어 --workers개 페이지씩 동시에 임베딩 → _bulk (문서 _id/routing 유지)
+3. 적재하는 동안 기존 인덱스에 들어온 문서(timestamp 기준) 따라잡기
+4. replica/refresh 복구, green 대기 후 alias 전환
+5. 전환 직전 기존 인덱스에 들어온 문서 한 번 더 따라잡기
+기존 인덱스는 롤백용으로 남겨 둔다 (alias를 되돌리면 롤백, 확인 후 직접 삭제).
+
+embed/query Lambda는 alias가 가리키는 인덱스의 _meta에서 모델/차원을 읽으므로 전환 후 재배포 없이 새 모델을 쓴다.
+다음 배포 전에 app.py의 embed_model_id / embed_dimensions도 같은 값으로 맞춰 둔다.
+적재 중 기존 인덱스에서 삭제된 chunk(이전 버전 prune)는 새 인덱스에 남을 수 있음.
+
+사용법 (OPENSEARCH_ENDPOINT, AWS 자격 증명 필요, 이 디렉토리에서 PYTHONPATH=../common 으로 실행):
+    python migrate_index.py --alias lexora-doc-embed --dimensions 1024
+    python migrate_index.py --alias lexora-doc-embed --model amazon.titan-embed-text-v2:0 --dimensions 256 --routing
+    python migrate_index.py --alias lexora-doc-embed --dimensions 1024 --no-flip   # 적재만 (검증 후 --flip-only)
+    python migrate_index.py --alias lexora-doc-embed --dimensions 1024 --coarse-dimensions 256   # 2단계 검색 인덱스
+    python migrate_index.py --alias lexora-doc-embed --dimensions 512 --vector-data-type fp16     # 저장 형식 변경
+    python migrate_index.py --alias lexora-doc-embed --dimensions 512 --routing   # 모델/벡터 그대로 → 벡터 복사
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import boto3
+from botocore.config import Config
+
+import index_admin
+from bedrock_rate import BEDROCK_CLIENT_CONFIG, call_bedrock
+from vector_quant import VECTOR_DATA_TYPE, VECTOR_DATA_TYPES, coarse, encode_full, quantize
+
+PAGE_SIZE = 100
+PIT_KEEP_ALIVE = "10m"
+CATCH_UP_SLACK_SECONDS = 120   # 문서 timestamp와 이 도구의 시계 차이 여유
+BULK_MAX_RETRIES = 5
+
+
+class Migration:
+    def __init__(self, client, bedrock, model_id: str, dimensions: int, target: str, routing: bool,
+                 coarse_dimensions: int = 0, data_type: str = VECTOR_DATA_TYPE, copy_vectors: bool = False):
+        self.client = client
+        self.bedrock = bedrock
+        self.model_id = model_id
+        self.dimensions = dimensions
+        self.coarse_dimensions = coarse_dimensions
+        self.data_type = data_type
+        self.target = target
+        self.routing = routing
+        # True면 기존 벡터를 그대로 복사 (재임베딩 없음)
+        self.copy_vectors = copy_vectors
+        self.done = 0
+
+    def embed(self, text: str) -> list:
+        response = call_bedrock(
+            self.model_id,
+            self.bedrock.invoke_model,
+            modelId=self.model_id,
+            body=json.dumps({"inputText": text, "dimensions": self.dimensions, "normalize": True}),
+            accept="application/json",
+            contentType="application/json",
+        )
+        return json.loads(response["body"].read())["embedding"]
+
+    def migrate_page(self, hits: list):
+        lines = []
+        for hit in hits:
+            doc = dict(hit["_source"])
+            if not self.copy_vectors:
+                # 벡터를 복사할 때는 _source의 embedding/embeddingFull을 그대로 씀
+                embedding = self.embed(doc["content"])
+                if self.coarse_dimensions:
+                    doc["embedding"] = quantize(coarse(embedding, self.coarse_dimensions), self.data_type)
+                    doc["embeddingFull"] = encode_full(embedding)
+                else:
+                    doc["embedding"] = quantize(embedding, self.data_type)
+            action = {"_index": self.target, "_id": hit["_id"]}
+            routing = hit.get("_routing") or (doc["userId"] if self.routing else None)
+            if routing:
+                action["routing"] = routing
+            lines.append((json.dumps({"index": action}), json.dumps(doc, ensure_ascii=False)))
+        self.bulk(lines)
+        self.done += len(hits)
+
+    def bulk(self, lines: list):
+        for attempt in range(BULK_MAX_RETRIES):
+            response = self.client.bulk(body="".join(f"{a}\n{s}\n" for a, s in lines))
+            if not response.get("errors"):
+                return
+            failed = [(line, item["index"]) for line, item in zip(lines, response["items"])
+                      if item["index"].get("status", 500) >= 300]
+            fatal = [result for _, result in failed if result.get("status") != 429]
+            if fatal:
+                raise Exception(f"[ERROR] bulk 실패 - {len(fatal)}건, {fatal[0].get('error')}")
+            lines = [line for line, _ in failed]
+            time.sleep(2 ** attempt)
+        raise Exception(f"[ERROR] bulk 실패 - 재시도 후 {len(lines)}건 남음")
+
+    def run(self, source: str, query: dict, workers: int, total: int = None):
+        # 페이지를 읽는 대로 최대 workers*2개까지만 동시에 처리 (전체를 메모리에 올리지 않음)
+        started, before = time.time(), self.done
+        pending = set()
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for hits in iter_pages(self.client, source, query, vectors=self.copy_vectors):
+                if len(pending) >= workers * 2:
+                    finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        future.result()
+                    elapsed = time.time() - started
+                    print(f"[INFO] {self.done}/{total or '?'}개, {self.done / elapsed:.1f} chunk/s")
+                pending.add(executor.submit(self.migrate_page, hits))
+            for future in pending:
+                future.result()
+        print(f"[INFO] 적재 완료 - {self.done - before}개, {time.time() - started:.1f}s")
+
+
+def sort_fields(client, index: str) -> list:
+    # (fileId, chunkIndex)는 문서마다 유일 → search_after 정렬 키 (동적 매핑된 기존 인덱스는 fileId.keyword)
+    properties = _properties(client, index)
+    file_id = "fileId" if properties.get("fileId", {}).get("type") == "keyword" else "fileId.keyword"
+    return [{file_id: "asc"}, {"chunkIndex": "asc"}]
+
+
+def _properties(client, index: str) -> dict:
+    for mapping in client.indices.get_mapping(index=index).values():
+        return mapping["mappings"].get("properties", {})
+    return {}
+
+
+def iter_pages(client, index: str, query: dict, vectors: bool = False):
+    sort = sort_fields(client, index)
+    pit_id = client.create_point_in_time(index=index, keep_alive=PIT_KEEP_ALIVE)["pit_id"]
+    try:
+        search_after = None
+        while True:
+            body = {
+                "size": PAGE_SIZE,
+                "query": query,
+                "pit": {"id": pit_id, "keep_alive": PIT_KEEP_ALIVE},
+                "sort": sort,
+            }
+            if not vectors:
+                body["_source"] = {"excludes": ["embedding", "embeddingFull"]}
+            if search_after:
+                body["search_after"] = search_after
+            hits = client.search(body=body)["hits"]["hits"]
+            if not hits:
+                return
+            yield hits
+            search_after = hits[-1]["sort"]
+    finally:
+        client.delete_point_in_time(body={"pit_id": [pit_id]})
+
+
+def same_vectors(client, index: str, model_id: str, dimensions: int, coarse_dimensions: int, data_type: str) -> bool:
+    # 기존 인덱스의 _meta/매핑이 새 인덱스 설정과 같으면 벡터를 그대로 옮길 수 있음
+    # (모델 정보가 없는 기존 인덱스는 같은 모델인지 알 수 없으므로 재임베딩)
+    meta = index_admin.embedding_meta(client, index)
+    field = index_admin._embedding_field(client, index)
+    return (
+        meta.get("embedModelId") == model_id
+        and int(meta.get("embedDimensions", 0)) == dimensions
+        and int(meta.get("embedCoarseDimensions", 0)) == coarse_dimensions
+        and index_admin.stored_data_type(field) == data_type
+        and field.get("dimension") == (coarse_dimensions or dimensions)
+    )
+
+
+def since(timestamp: float) -> dict:
+    return {"range": {"timestamp": {"gte": int(timestamp) - CATCH_UP_SLACK_SECONDS}}}
+
+
+def flip_alias(client, alias: str, source: str, target: str):
+    client.indices.update_aliases(body={"actions": [
+        {"remove": {"index": source, "alias": alias}},
+        {"add": {"index": target, "alias": alias}},
+    ]})
+    print(f"[INFO] alias 전환 - {alias}: {source} → {target}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--alias", default=os.environ.get("OPENSEARCH_INDEX", "lexora-doc-embed"))
+    parser.add_argument("--model", default=os.environ.get("EMBED_MODEL_ID", "amazon.titan-embed-text-v2:0"))
+    parser.add_argument("--dimensions", type=int, required=True)
+    parser.add_argument("--coarse-dimensions", type=int, default=0,
+                        help="2단계 검색: HNSW용 coarse 벡터 차원 (0이면 전체 차원 벡터 하나)")
+    parser.add_argument("--vector-data-type", choices=VECTOR_DATA_TYPES, default=VECTOR_DATA_TYPE,
+                        help="새 인덱스 벡터 저장 형식 (기본: VECTOR_DATA_TYPE 환경 변수)")
+    parser.add_argument("--target", help="새 인덱스 이름 (기본: 다음 버전 {alias}-v{n})")
+    parser.add_argument("--routing", action="store_true", help="새 인덱스를 userId routing 필수로 생성")
+    parser.add_argument("--reembed", action="store_true", help="모델/벡터 설정이 같아도 다시 임베딩")
+    parser.add_argument("--workers", type=int, default=8, help="동시에 임베딩하는 페이지 수")
+    parser.add_argument("--no-flip", action="store_true", help="적재만 하고 alias는 그대로")
+    parser.add_argument("--flip-only", action="store_true", help="--target으로 적재가 끝난 인덱스로 따라잡기 후 전환")
+    args = parser.parse_args()
+
+    client = index_admin._client()
+    sources = index_admin.alias_indices(client, args.alias)
+    if len(sources) != 1:
+        sys.exit(f"alias {args.alias}가 가리키는 인덱스가 하나가 아님: {sources} (먼저 index_admin.py ensure-alias)")
+    if args.flip_only and not args.target:
+        sys.exit("--flip-only에는 --target 필요")
+    source = sources[0]
+    target = args.target or index_admin.next_versioned_index(client, args.alias)
+    if target == source:
+        sys.exit(f"새 인덱스가 현재 인덱스와 같음: {target}")
+
+    bedrock = boto3.client(
+        "bedrock-runtime",
+        region_name=os.environ.get("AWS_REGION", "ap-northeast-2"),
+        config=BEDROCK_CLIENT_CONFIG.merge(Config(max_pool_connections=max(args.workers, 10))),
+    )
+    copy_vectors = not args.reembed and same_vectors(
+        client, source, args.model, args.dimensions, args.coarse_dimensions, args.vector_data_type
+    )
+    migration = Migration(client, bedrock, args.model, args.dimensions, target, args.routing, args.coarse_dimensions,
+                          args.vector_data_type, copy_vectors)
+    print(f"[INFO] {source} → {target} ({args.model}, {args.dimensions}차원, coarse {args.coarse_dimensions}, "
+          f"{args.vector_data_type}, routing={args.routing}, {'벡터 복사' if copy_vectors else '재임베딩'})")
+
+    started = time.time()
+    if not args.flip_only:
+        if client.indices.exists(index=target):
+            sys.exit(f"이미 있는 인덱스: {target}")
+        client.indices.create(index=target, body=index_admin.index_body(
+            args.dimensions, args.routing, args.model, args.coarse_dimensions, args.vector_data_type
+        ))
+        client.indices.put_settings(index=target, body={"index": {"refresh_interval": "-1", "number_of_replicas": 0}})
+        try:
+            migration.run(source, {"match_all": {}}, args.workers, client.count(index=source)["count"])
+            # 전체 적재 중 기존 인덱스로 들어온 문서
+            migration.run(source, since(started), args.workers)
+        finally:
+            client.indices.put_settings(index=target, body={"index": {
+                "refresh_interval": index_admin.SEARCH_REFRESH_INTERVAL,
+                "number_of_replicas": index_admin.INDEX_REPLICAS,
+            }})
+        client.indices.refresh(index=target)
+        client.cluster.health(index=target, wait_for_status="green", timeout="30m")
+
+    if args.no_flip:
+        print(f"[INFO] 적재만 완료 - 확인 후: python migrate_index.py --alias {args.alias} "
+              f"--dimensions {args.dimensions} --target {target} --flip-only")
+        return
+
+    if args.flip_only:
+        # 적재 이후 기존 인덱스로 들어온 문서 (--no-flip 실행 이후 시간 포함)
+        migration.run(source, since(index_creation_time(client, target)), args.workers)
+    flipped_at = time.time()
+    flip_alias(client, args.alias, source, target)
+    # 전환 직전에 기존 인덱스로 들어온 문서
+    migration.run(source, since(flipped_at), args.workers)
+    client.indices.refresh(index=target)
+    print(f"[INFO] 마이그레이션 완료 - {time.time() - started:.1f}s, 롤백용 기존 인덱스 {source} 유지")
+
+
+def index_creation_time(client, index: str) -> float:
+    settings = client.indices.get_settings(index=index, name="index.creation_date")
+    return int(settings[index]["settings"]["index"]["creation_date"]) / 1000
+
+
+if __name__ == "__main__":
+    main()
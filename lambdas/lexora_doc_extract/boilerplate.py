@@ -0,0 +1,101 @@
+import re
+from collections import Counter
+from itertools import chain, islice
+from typing import Iterable, Iterator, List
+
+# 페이지마다 반복되는 머리글/바닥글/쪽 번호/대외비 문구 제거
+# - 앞쪽 BOILERPLATE_SAMPLE_PAGES 페이지를 미리 읽어(lookahead) 페이지 위/아래 가장자리 줄의 출현 빈도를 셈
+# - 같은 위치(위에서 i번째 / 아래에서 i번째)에 샘플 페이지의 min_ratio 이상 반복된 줄만 반복 문구로 보고 제거
+# - 쪽 번호 형식("- 3 -", "3 / 12", "Page 3 of 120", "3쪽")만 '#'으로 바꿔 비교 (표의 숫자 행은 그대로 비교)
+#   줄 전체가 쪽 번호이거나 구분자로 나뉜 줄 맨 앞/맨 뒤에 있을 때만 (본문 문장 속 숫자는 그대로)
+# - 줄 수가 적은 페이지(표/제목 위주)는 빈도 계산에서 빼고, 어떤 페이지도 빈 페이지가 되도록 지우지 않음
+# 샘플 분량만 메모리에 올리고 나머지 페이지는 generator로 그대로 흘려보냄
+
+EDGE_LINES = 3        # 페이지 위/아래에서 검사할 최대 줄 수
+MIN_PAGES = 4         # 빈도 계산 대상 페이지가 이보다 적으면 반복 문구를 판단하지 않음
+MIN_PAGE_LINES = 8    # 이보다 줄이 적은 페이지는 빈도 계산에서 제외
+
+_SPACES = re.compile(r"\s+")
+_PAGE_FORM = (
+    r"(?:(?:page|p\.)\s*\d+(?:\s*(?:of|/)\s*\d+)?"   # Page 3, Page 3 of 120, p.3
+    r"|\d+\s*/\s*\d+"                              # 3 / 12
+    r"|\d+\s*(?:쪽|페이지))"                          # 3쪽, 3 페이지
+)
+# 쪽 번호만 있는 줄, 또는 구분자(| · - 등)로 나뉜 머리글/바닥글의 맨 앞/맨 뒤 쪽 번호만 치환
+# (본문 문장 속 "12 페이지 참조" 같은 숫자는 그대로 비교 → 본문 줄이 반복 문구로 잘못 지워지지 않음)
+_PAGE_NUMBER = re.compile(
+    rf"^[-–—\s]*(?:{_PAGE_FORM}|\d+)[-–—\s]*$"        # 3, - 3 -, Page 3 of 120 (줄 전체)
+    rf"|^{_PAGE_FORM}(?=\s*[|·•–—-])"                  # Page 3 | 사내 보고서
+    rf"|(?<=[|·•–—-])\s*{_PAGE_FORM}$",                # 사내 보고서 | Page 3
+    re.IGNORECASE,
+)
+
+
+def _line_key(line: str) -> str:
+    return _PAGE_NUMBER.sub("#", _SPACES.sub(" ", line).strip())
+
+
+def _edge_count(line_count: int) -> int:
+    # 본문이 가장자리보다 많이 남도록 위/아래 각각 전체 줄의 1/4까지만 가장자리로 봄
+    return min(EDGE_LINES, line_count // 4)
+
+
+def _edge_keys(lines: List[str]) -> set:
+    n = _edge_count(len(lines))
+    keys = {("top", i, _line_key(line)) for i, line in enumerate(lines[:n])}
+    keys.update(("bottom", i, _line_key(line)) for i, line in enumerate(reversed(lines[len(lines) - n:])))
+    return keys
+
+
+def _non_blank_lines(text: str) -> List[str]:
+    return [line for line in text.splitlines() if line.strip()]
+
+
+def detect_boilerplate(pages: List[dict], min_ratio: float) -> set:
+    # {(위치, 가장자리에서의 순서, 정규화한 줄)}
+    candidates = [lines for lines in (_non_blank_lines(p["text"]) for p in pages) if len(lines) >= MIN_PAGE_LINES]
+    if len(candidates) < MIN_PAGES:
+        return set()
+    counts = Counter()
+    for lines in candidates:
+        counts.update(_edge_keys(lines))
+    threshold = max(2, len(candidates) * min_ratio)
+    return {key for key, n in counts.items() if key[2] and n >= threshold}
+
+
+def _strip_page(text: str, boilerplate: set) -> str:
+    lines = _non_blank_lines(text)
+    n = _edge_count(len(lines))
+    if not n:
+        return text
+    # 위/아래 가장자리에서 같은 위치에 반복된 줄만 제거 (본문 중간의 같은 문장은 유지)
+    head = 0
+    while head < n and ("top", head, _line_key(lines[head])) in boilerplate:
+        head += 1
+    tail = len(lines)
+    while len(lines) - tail < n and ("bottom", len(lines) - tail, _line_key(lines[tail - 1])) in boilerplate:
+        tail -= 1
+    if (head == 0 and tail == len(lines)) or head >= tail:
+        # 지울 것이 없거나 전부 반복 문구인 페이지는 원문 유지
+        return text
+    # 빈 줄(문단 구분)은 유지한 채 앞뒤 줄만 잘라냄
+    raw = text.splitlines()
+    kept = [i for i, line in enumerate(raw) if line.strip()][head:tail]
+    return "\n".join(raw[kept[0]:kept[-1] + 1])
+
+
+def strip_boilerplate(pages: Iterable[dict], sample_pages: int = 30, min_ratio: float = 0.5) -> Iterator[dict]:
+    pages = iter(pages)
+    sample = list(islice(pages, sample_pages))
+    boilerplate = detect_boilerplate(sample, min_ratio)
+    if not boilerplate:
+        yield from chain(sample, pages)
+        return
+
+    print(f"[INFO] 반복 머리글/바닥글 {len(boilerplate)}종 제거 (샘플 {len(sample)}페이지): {sorted(key[2] for key in boilerplate)[:5]}")
+    removed = 0
+    for p in chain(sample, pages):
+        text = _strip_page(p["text"], boilerplate)
+        removed += text != p["text"]
+        yield {**p, "text": text}
+    print(f"[INFO] 반복 문구 제거 페이지 {removed}개")
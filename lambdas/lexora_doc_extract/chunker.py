@@ -0,0 +1,164 @@
+import bisect
+import re
+from typing import Iterable, Iterator, NamedTuple, Optional
+
+from token_estimate import estimate_tokens, token_limit_offset
+
+# 문서 전체를 하나로 이어 붙인 텍스트의 문자 offset 위에서 chunk를 나눔
+# - 페이지 경계에서 chunk를 끊지 않음 → 페이지에 걸친 문단이 작은 조각으로 나뉘지 않음
+# - chunk는 (start, end, page_start, page_end) 레코드로만 다루고 문자열은 전송 직전에 잘라냄
+# - 이미 chunk로 나간 앞부분은 버퍼에서 버리므로 긴 문서도 처리 시간/메모리가 선형
+# - max_tokens를 주면 문자 수 대신 추정 토큰 수(token_estimate) 기준으로 chunk 크기를 맞춤
+
+PAGE_SEPARATOR = "\n\n"
+# chunk 끝 위치 우선순위: 문단 > 줄바꿈 > 문장 끝 > 공백 (없으면 한도 위치에서 자름)
+BREAK_PATTERNS = ("\n\n", "\n", ". ", " ")
+
+_BLANK_LINES = re.compile(r"\n[ \t\r\f\v]*\n\s*")
+_WHITESPACE = re.compile(r"\s+")
+_NON_WHITESPACE = re.compile(r"\S")
+
+
+class ChunkSpan(NamedTuple):
+    start: int       # 문서 전체 기준 문자 offset [start, end)
+    end: int
+    page_start: int
+    page_end: int
+    token_count: int
+
+
+def _normalize(text: str) -> str:
+    # 빈 줄 여러 개는 문단 구분 하나로
+    return _BLANK_LINES.sub("\n\n", (text or "").strip())
+
+
+class OffsetChunker:
+    def __init__(self, max_chars: int = 1000, overlap: int = 200,
+                 max_tokens: Optional[int] = None, overlap_tokens: int = 0):
+        # overlap이 한도의 절반 이상이면 다음 chunk의 끝 위치 탐색(한도 절반 이후)이 이전 chunk 끝에 머물러
+        # 같은 끝을 가진 중복 chunk가 계속 생김
+        if max_tokens:
+            if not 0 <= overlap_tokens < max_tokens // 2:
+                raise ValueError(f"overlap_tokens({overlap_tokens})는 max_tokens({max_tokens})의 절반보다 작아야 함")
+        elif not 0 <= overlap < max_chars // 2:
+            raise ValueError(f"overlap({overlap})은 max_chars({max_chars})의 절반보다 작아야 함")
+        self.max_chars = max_chars
+        self.overlap = overlap
+        self.max_tokens = max_tokens
+        self.overlap_tokens = overlap_tokens
+        self._buf = ""
+        self._base = 0           # _buf[0]의 문서 기준 offset
+        self._page_starts = []   # 페이지 시작 offset (오름차순)
+        self._page_nums = []
+        self._last_end = 0       # 마지막으로 내보낸 chunk의 끝 offset
+
+    def text(self, span: ChunkSpan) -> str:
+        # iter_spans가 다음 chunk를 만들기 전까지만 유효 (그 뒤에는 버퍼에서 잘려 나갈 수 있음)
+        return self._buf[span.start - self._base:span.end - self._base]
+
+    def _page_of(self, offset: int) -> int:
+        return self._page_nums[bisect.bisect_right(self._page_starts, offset) - 1]
+
+    def _limit(self, start: int) -> Optional[int]:
+        # start부터 chunk 한도가 끝나는 위치 / 버퍼 끝까지 한도 안이면 None
+        if self.max_tokens:
+            return token_limit_offset(self._buf, start, self.max_tokens)
+        return start + self.max_chars if len(self._buf) - start > self.max_chars else None
+
+    def _next_span(self, cursor: int, final: bool):
+        # (span, 마지막 여부) / 다음 페이지가 더 필요하면 None
+        buf = self._buf
+        start = cursor - self._base
+        limit = self._limit(start)
+        if limit is None:
+            if not final:
+                return None
+            end = len(buf)
+            last = True
+        else:
+            limit = max(limit, start + 1, self._last_end - self._base + 1)
+            end = limit
+            # 너무 짧은 chunk가 생기지 않도록 한도의 절반 이후에서만 찾고,
+            # 이전 chunk 안에 포함되는 chunk가 되지 않도록 이전 chunk 끝 이후에서만 찾음
+            lo = max(start + (limit - start) // 2, self._last_end - self._base)
+            for pattern in BREAK_PATTERNS:
+                pos = buf.rfind(pattern, lo, limit)
+                if pos >= 0:
+                    end = pos + len(pattern)
+                    break
+            last = False
+
+        end = self._strip_end(start, end)
+        if self._base + end <= self._last_end:
+            if last:
+                # 남은 부분이 이전 chunk에 모두 포함됨
+                return None
+            # 찾은 위치 앞이 공백뿐이면 한도 위치에서 자름
+            end = self._strip_end(start, limit)
+        if end == start:
+            return None
+        self._last_end = self._base + end
+        span = ChunkSpan(
+            start=cursor,
+            end=self._base + end,
+            page_start=self._page_of(cursor),
+            page_end=self._page_of(self._base + end - 1),
+            token_count=estimate_tokens(buf, start, end),
+        )
+        return span, last
+
+    def _strip_end(self, start: int, end: int) -> int:
+        while end > start and self._buf[end - 1].isspace():
+            end -= 1
+        return end
+
+    def _next_start(self, span: ChunkSpan) -> int:
+        buf = self._buf
+        start = span.end - self._base
+        overlap = self.overlap
+        if self.max_tokens:
+            # 토큰 기준 overlap은 이번 chunk의 글자/토큰 비율로 글자 수 환산
+            overlap = self.overlap_tokens * (span.end - span.start) // max(span.token_count, 1)
+            # 환산 값이 chunk 길이의 절반을 넘으면 다음 chunk가 이전 chunk 안에 갇힐 수 있음
+            overlap = min(overlap, (span.end - span.start - 1) // 2)
+        if overlap > 0:
+            # overlap 구간은 단어 중간에서 시작하지 않도록 첫 공백 다음부터
+            lo = max(span.end - overlap, span.start + 1) - self._base
+            ws = _WHITESPACE.search(buf, lo, start)
+            start = ws.end() if ws else lo
+        m = _NON_WHITESPACE.search(buf, start)
+        return self._base + (m.start() if m else len(buf))
+
+    def iter_spans(self, pages: Iterable[dict]) -> Iterator[ChunkSpan]:
+        cursor = 0  # 다음 chunk 시작 offset
+        for p in pages:
+            text = _normalize(p["text"])
+            if not text:
+                continue
+
+            # 다음 chunk 시작 이전은 더 이상 필요 없음
+            self._buf = self._buf[cursor - self._base:]
+            self._base = cursor
+            if self._buf:
+                self._buf += PAGE_SEPARATOR
+            self._page_starts.append(self._base + len(self._buf))
+            self._page_nums.append(p["page"])
+            self._buf += text
+
+            while True:
+                result = self._next_span(cursor, final=False)
+                if result is None:
+                    break
+                span, _ = result
+                yield span
+                cursor = self._next_start(span)
+
+        while cursor < self._base + len(self._buf):
+            result = self._next_span(cursor, final=True)
+            if result is None:
+                break
+            span, last = result
+            yield span
+            if last:
+                break
+            cursor = self._next_start(span)
@@ -1,20 +1,52 @@
 import os
+import gzip
+import hashlib
 import json
+import multiprocessing
 import time
 import re
 import tempfile
-import textwrap
-from typing import List
+from typing import Iterable, Iterator, List, Optional
 from urllib.parse import urlparse
 
 import boto3
 import pdfplumber
 from botocore.exceptions import ClientError
 
+from boilerplate import strip_boilerplate
+from chunker import ChunkSpan, OffsetChunker
+from office_extract import OFFICE_FORMATS, extract_office_pages
+from pdf_backends import get_pdf_backend
+from text_extract import TEXT_NATIVE_FORMATS, extract_text_pages
+
 # 환경 변수
 CONVERTED_BUCKET = os.getenv("CONVERTED_BUCKET")
 EMBEDDING_QUEUE_URL = os.getenv("EMBEDDING_QUEUE_URL")
 FILES_TABLE = os.getenv("FILES_TABLE")
+# 페이지 병렬 추출 워커 수 (0이면 Lambda vCPU 수), 워커당 최소 페이지 수
+EXTRACT_WORKERS = int(os.getenv("EXTRACT_WORKERS", "0")) or (os.cpu_count() or 1)
+PAGES_PER_WORKER = int(os.getenv("PAGES_PER_WORKER", "20"))
+# chunk 최대 길이/overlap (문자 수)
+CHUNK_MAX_CHARS = int(os.getenv("CHUNK_MAX_CHARS", "1000"))
+CHUNK_OVERLAP = int(os.getenv("CHUNK_OVERLAP", "200"))
+# 0보다 크면 추정 토큰 수 기준으로 chunk 분할 (CHUNK_MAX_CHARS/CHUNK_OVERLAP 대신 사용)
+CHUNK_MAX_TOKENS = int(os.getenv("CHUNK_MAX_TOKENS", "0"))
+CHUNK_OVERLAP_TOKENS = int(os.getenv("CHUNK_OVERLAP_TOKENS", "50"))
+# PDF 페이지마다 반복되는 머리글/바닥글 제거 (앞쪽 샘플 페이지 중 비율 이상에서 반복되는 줄)
+STRIP_BOILERPLATE = os.getenv("STRIP_BOILERPLATE", "true").lower() == "true"
+BOILERPLATE_SAMPLE_PAGES = int(os.getenv("BOILERPLATE_SAMPLE_PAGES", "30"))
+BOILERPLATE_MIN_RATIO = float(os.getenv("BOILERPLATE_MIN_RATIO", "0.5"))
+# chunk는 S3에 batch(part) 단위 gzip JSONL로 저장하고 임베딩 큐에는 위치만 전송
+# part 1개 = 임베딩 메시지 1건 = embed Lambda 병렬 처리 단위
+CHUNKS_BUCKET = os.getenv("CHUNKS_BUCKET", CONVERTED_BUCKET)
+CHUNKS_PREFIX = os.getenv("CHUNKS_PREFIX", "chunks")
+EMBED_BATCH_MAX_CHUNKS = int(os.getenv("EMBED_BATCH_MAX_CHUNKS", "50"))
+EMBED_BATCH_MAX_BYTES = int(os.getenv("EMBED_BATCH_MAX_BYTES", str(1024 * 1024)))
+SQS_SEND_BATCH_SIZE = 10  # send_message_batch 최대 건수
+# 새 버전 재수집 시 이전에 색인된 chunk manifest와 비교해서 바뀐 chunk만 임베딩
+INCREMENTAL_REINGEST = os.getenv("INCREMENTAL_REINGEST", "true").lower() == "true"
+# 배치로 받은 메시지 중 남은 실행 시간이 이보다 적으면 시작하지 않고 재시도로 넘김
+EXTRACT_TIME_SAFETY_MS = int(os.getenv("EXTRACT_TIME_SAFETY_MS", "60000"))
 
 # AWS 리소스
 s3 = boto3.client("s3")
@@ -87,6 +119,37 @@ def send_to_embedding_queue(message: dict):
         raise Exception(f"SQS 전송 실패: {e}")
 
 
+def chunk_part_key(file_id: str, batch_index: int) -> str:
+    return f"{CHUNKS_PREFIX}/{file_id}/part-{batch_index:05d}.jsonl.gz"
+
+
+def write_chunk_part(file_id: str, batch_index: int, batch: List[dict]) -> str:
+    key = chunk_part_key(file_id, batch_index)
+    body = gzip.compress("".join(json.dumps(c, ensure_ascii=False) + "\n" for c in batch).encode("utf-8"))
+    try:
+        s3.put_object(Bucket=CHUNKS_BUCKET, Key=key, Body=body, ContentType="application/gzip")
+    except ClientError as e:
+        raise Exception(f"chunk part 저장 실패: {e}")
+    return f"s3://{CHUNKS_BUCKET}/{key}"
+
+
+def send_pointers_to_embedding_queue(messages: List[dict]):
+    # 실패한 항목만 한 번 재전송
+    pending = {str(m["batchIndex"]): m for m in messages}
+    for _ in range(2):
+        try:
+            response = sqs.send_message_batch(
+                QueueUrl=EMBEDDING_QUEUE_URL,
+                Entries=[{"Id": entry_id, "MessageBody": json.dumps(m)} for entry_id, m in pending.items()]
+            )
+        except Exception as e:
+            raise Exception(f"SQS 전송 실패: {e}")
+        pending = {f["Id"]: pending[f["Id"]] for f in response.get("Failed", [])}
+        if not pending:
+            return
+    raise Exception(f"SQS 전송 실패: batch {', '.join(pending)}")
+
+
 def update_file_status(file_id: str, status: str, error_msg: str = None):
     update_expr = "SET #s = :s, updatedAt = :u"
     expr_values = {
@@ -110,45 +173,268 @@ def update_file_status(file_id: str, status: str, error_msg: str = None):
     except Exception as e:
         raise Exception(f"DynamoDB 상태 업데이트 실패: {e}")
 
-def extract_text_by_page(bucket: str, key: str) -> List[dict]:
+def _extract_page_range(pdf_path: str, start: int, end: int, backend_name: str, conn):
+    # 워커 프로세스: PDF를 독립적으로 열어 [start, end) 페이지 텍스트를 부모에게 전달
+    try:
+        texts = list(get_pdf_backend(backend_name).iter_texts(pdf_path, start, end))
+        conn.send(("ok", texts))
+    except Exception as e:
+        conn.send(("error", str(e)))
+    finally:
+        conn.close()
+
+
+def _extract_texts_parallel(pdf_path: str, start: int, end: int, workers: int, backend_name: str) -> List[str]:
+    # Lambda에는 /dev/shm이 없어 multiprocessing.Pool/Queue를 쓸 수 없음 → Process + Pipe 사용
+    procs = []
+    for i in range(workers):
+        range_start = start + (end - start) * i // workers
+        range_end = start + (end - start) * (i + 1) // workers
+        recv_conn, send_conn = multiprocessing.Pipe(duplex=False)
+        proc = multiprocessing.Process(
+            target=_extract_page_range, args=(pdf_path, range_start, range_end, backend_name, send_conn)
+        )
+        proc.start()
+        send_conn.close()
+        procs.append((proc, recv_conn))
+
+    texts = []
+    errors = []
+    for proc, recv_conn in procs:
+        try:
+            status, payload = recv_conn.recv()  # join 전에 받아야 큰 결과에서 pipe가 막히지 않음
+        except EOFError:
+            status, payload = "error", "워커 비정상 종료"
+        proc.join()
+        if status == "ok":
+            texts.extend(payload)
+        else:
+            errors.append(payload)
+
+    if errors:
+        raise Exception(f"페이지 병렬 추출 실패: {errors[0]}")
+    return texts
+
+
+def _iter_texts_parallel(pdf_path: str, page_count: int, workers: int, backend_name: str) -> Iterator[str]:
+    # 워커 수 × PAGES_PER_WORKER 페이지씩 나눠 처리 → 메모리에 올라가는 텍스트는 한 묶음 분량
+    wave = workers * PAGES_PER_WORKER
+    for start in range(0, page_count, wave):
+        yield from _extract_texts_parallel(pdf_path, start, min(start + wave, page_count), workers, backend_name)
+
+
+def iter_pdf_pages(bucket: str, key: str, backend_name: str = None) -> Iterator[dict]:
+    backend = get_pdf_backend(backend_name)
     with tempfile.NamedTemporaryFile(suffix=".pdf") as tmp:
         s3.download_file(bucket, key, tmp.name)
-        with pdfplumber.open(tmp.name) as pdf:
-            result = []
-            for page_num, page in enumerate(pdf.pages):
-                txt = page.extract_text()
-                if txt:
-                    result.append({"page": page_num + 1, "text": txt})  # 페이지 번호는 1부터
-                else:
-                    print(f"[WARN][{key}] Page {page_num + 1}에서 텍스트 추출 실패")
-            if not result:
-                raise Exception("PDF 전체에서 텍스트 추출 실패")
-            return result
+        page_count = backend.page_count(tmp.name)
+        workers = min(EXTRACT_WORKERS, page_count // PAGES_PER_WORKER)
 
-
-def split_chunks_with_page_info(pages: List[dict], max_chars=1000, overlap=200) -> List[dict]:
-    chunks = []
-    for p in pages:
-        text = p["text"].strip()
-        paragraphs = [para.strip() for para in re.split(r'\n{2,}', text) if para.strip()]
-        current_chunk = ""
-        for para in paragraphs:
-            if len(current_chunk) + len(para) + 2 <= max_chars:
-                current_chunk += para + "\n\n"
+        if workers > 1:
+            print(f"[INFO] 페이지 병렬 추출 - {page_count}페이지, 워커 {workers}개, backend={backend.name}")
+            texts = _iter_texts_parallel(tmp.name, page_count, workers, backend.name)
+        else:
+            print(f"[INFO] 페이지 추출 - {page_count}페이지, backend={backend.name}")
+            texts = backend.iter_texts(tmp.name)
+
+        extracted = False
+        for page_num, txt in enumerate(texts):
+            if txt and txt.strip():
+                extracted = True
+                yield {"page": page_num + 1, "text": txt}  # 페이지 번호는 1부터
             else:
-                if current_chunk.strip():
-                    chunks.append({"content": current_chunk.strip(), "page": p["page"]})
-                overlap_text = current_chunk[-overlap:] if overlap > 0 else ""
-                current_chunk = overlap_text + para + "\n\n"
-        if current_chunk.strip():
-            chunks.append({"content": current_chunk.strip(), "page": p["page"]})
-    return chunks
+                print(f"[WARN][{key}] Page {page_num + 1}에서 텍스트 추출 실패")
+        if not extracted:
+            raise Exception("PDF 전체에서 텍스트 추출 실패")
+
+
+def extract_text_native(bucket: str, key: str, source_format: str) -> List[dict]:
+    # txt/md/csv/html, docx/xlsx/pptx는 PDF 변환 없이 원본을 바로 파싱
+    try:
+        data = s3.get_object(Bucket=bucket, Key=key)["Body"].read()
+    except ClientError as e:
+        raise Exception(f"S3 다운로드 실패: {e}")
+
+    if source_format in OFFICE_FORMATS:
+        result = extract_office_pages(data, source_format)
+    else:
+        result = extract_text_pages(data, source_format)
+    if not result:
+        raise Exception(f"{source_format} 파일에서 텍스트 추출 실패")
+    return result
+
+
+def iter_pages(bucket: str, key: str, source_format: str, pdf_backend: str = None) -> Iterator[dict]:
+    if source_format in TEXT_NATIVE_FORMATS or source_format in OFFICE_FORMATS:
+        print(f"[INFO] 원본 형식({source_format}) 직접 추출 시작")
+        return iter(extract_text_native(bucket, key, source_format))
+    print("[INFO] PDF 텍스트 추출 시작")
+    pages = iter_pdf_pages(bucket, key, pdf_backend)
+    if STRIP_BOILERPLATE:
+        pages = strip_boilerplate(pages, BOILERPLATE_SAMPLE_PAGES, BOILERPLATE_MIN_RATIO)
+    return pages
+
+
+def extract_pages(bucket: str, key: str, source_format: str, pdf_backend: str = None) -> List[dict]:
+    return list(iter_pages(bucket, key, source_format, pdf_backend))
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:32]
+
+
+def iter_chunk_items(chunker: OffsetChunker, spans: Iterable[ChunkSpan]) -> Iterator[dict]:
+    # chunk 문자열은 여기서 처음 만들어 chunkIndex, 내용 hash와 함께 내보냄
+    for chunk_index, span in enumerate(spans):
+        content = chunker.text(span)
+        yield {
+            "chunkIndex": chunk_index,
+            "content": content,
+            "contentHash": content_hash(content),
+            "page": span.page_start,
+            "pageEnd": span.page_end,
+            "tokenCount": span.token_count,
+            "charStart": span.start,
+            "charEnd": span.end
+        }
+
+
+def filter_changed_chunks(items: Iterable[dict], previous: Optional[dict], manifest: List[list]) -> Iterator[dict]:
+    # 모든 chunk를 manifest에 기록하고, 이전 색인과 같은 위치/내용/페이지인 chunk는 임베딩 큐로 보내지 않음
+    # 위치만 바뀐 chunk는 reuse 표시 → embed 단계에서 기존 벡터를 재사용 (Bedrock 호출 생략)
+    previous_chunks = previous["chunks"] if previous else []
+    known_hashes = {c[0] for c in previous_chunks}
+    for item in items:
+        entry = [item["contentHash"], item["page"], item["pageEnd"]]
+        index = len(manifest)
+        manifest.append(entry)
+        if index < len(previous_chunks) and previous_chunks[index] == entry:
+            continue
+        if item["contentHash"] in known_hashes:
+            item["reuse"] = True
+        yield item
+
+
+def iter_chunk_batches(items: Iterable[dict]) -> Iterator[List[dict]]:
+    # part 크기/개수 한도 안에서 묶음 단위로 내보냄
+    batch = []
+    batch_bytes = 0
+    for item in items:
+        item_bytes = len(json.dumps(item, ensure_ascii=False).encode("utf-8"))
+        if batch and (len(batch) >= EMBED_BATCH_MAX_CHUNKS or batch_bytes + item_bytes > EMBED_BATCH_MAX_BYTES):
+            yield batch
+            batch = []
+            batch_bytes = 0
+        batch.append(item)
+        batch_bytes += item_bytes
+    if batch:
+        yield batch
+
+
+def reset_batch_progress(file_id: str) -> dict:
+    # 재추출 시 이전 실행의 임베딩 진행 상황 초기화, 이전 항목(indexedManifest 포함) 반환
+    try:
+        return files_table.update_item(
+            Key={"fileId": file_id},
+            UpdateExpression="REMOVE embeddedBatches, batchCount, pendingManifest",
+            ReturnValues="ALL_OLD"
+        ).get("Attributes", {})
+    except Exception as e:
+        raise Exception(f"DynamoDB 진행 상황 초기화 실패: {e}")
+
+
+def load_chunk_manifest(manifest_path: Optional[str]) -> Optional[dict]:
+    # 마지막으로 임베딩까지 끝난 버전의 chunk manifest, 없거나 읽을 수 없으면 전체 재임베딩
+    if not manifest_path:
+        return None
+    bucket, key = parse_s3_path(manifest_path)
+    try:
+        data = s3.get_object(Bucket=bucket, Key=key)["Body"].read()
+        return json.loads(gzip.decompress(data).decode("utf-8"))
+    except Exception as e:
+        print(f"[WARN] 이전 chunk manifest 읽기 실패 - 전체 재임베딩: {e}")
+        return None
+
+
+def write_chunk_manifest(file_id: str, source_path: str, manifest: List[list]) -> str:
+    # 실행마다 새 key로 저장 → 임베딩 완료 전까지 이전 manifest(indexedManifest)는 그대로 유지
+    # (indexedManifest로 승격될 때 이전 manifest 삭제)
+    key = f"{CHUNKS_PREFIX}/{file_id}/manifest-{int(time.time() * 1000)}.json.gz"
+    body = gzip.compress(json.dumps({
+        "fileId": file_id,
+        "sourcePath": source_path,
+        "chunkCount": len(manifest),
+        "chunks": manifest  # [contentHash, page, pageEnd] (chunkIndex 순)
+    }).encode("utf-8"))
+    try:
+        s3.put_object(Bucket=CHUNKS_BUCKET, Key=key, Body=body, ContentType="application/gzip")
+    except ClientError as e:
+        raise Exception(f"chunk manifest 저장 실패: {e}")
+    return f"s3://{CHUNKS_BUCKET}/{key}"
+
+
+def finalize_extraction(file_id: str, batch_count: int, chunk_count: int, manifest_path: str):
+    # 전체 batch 수 기록 → embed 단계가 먼저 끝났으면 여기서 embedded로 전환
+    # pendingManifest는 모든 batch 임베딩이 끝나면 indexedManifest로 승격 (다음 버전 비교 기준)
+    try:
+        item = files_table.update_item(
+            Key={"fileId": file_id},
+            UpdateExpression="SET #s = :s, batchCount = :b, chunkCount = :c, pendingManifest = :m, updatedAt = :u",
+            ExpressionAttributeNames={"#s": "status"},
+            ExpressionAttributeValues={
+                ":s": "extracted",
+                ":b": batch_count,
+                ":c": chunk_count,
+                ":m": manifest_path,
+                ":u": int(time.time())
+            },
+            ReturnValues="ALL_NEW"
+        )["Attributes"]
+        print(f"[INFO] fileId={file_id} 상태 업데이트 → extracted (batch {batch_count}개)")
+    except Exception as e:
+        raise Exception(f"DynamoDB 상태 업데이트 실패: {e}")
+
+    if len(item.get("embeddedBatches", ())) >= batch_count:
+        mark_file_embedded(file_id, manifest_path)
+
+
+def mark_file_embedded(file_id: str, manifest_path: str):
+    try:
+        old = files_table.update_item(
+            Key={"fileId": file_id},
+            UpdateExpression="SET #s = :s, indexedManifest = :m, updatedAt = :u",
+            ExpressionAttributeNames={"#s": "status"},
+            ExpressionAttributeValues={":s": "embedded", ":m": manifest_path, ":u": int(time.time())},
+            ReturnValues="UPDATED_OLD"
+        ).get("Attributes", {})
+        print(f"[INFO] fileId={file_id} 상태 업데이트 → embedded")
+    except Exception as e:
+        raise Exception(f"DynamoDB 상태 업데이트 실패: {e}")
+
+    # 승격으로 더 이상 비교 기준이 아닌 이전 manifest 삭제
+    if old.get("indexedManifest") not in (None, manifest_path):
+        delete_chunk_objects([parse_s3_path(old["indexedManifest"])[1]])
+
+
+def delete_chunk_objects(keys: List[str]):
+    # 이전 실행의 manifest / 남은 chunk part 정리, 실패해도 처리 결과에는 영향 없음
+    for i in range(0, len(keys), 1000):
+        try:
+            s3.delete_objects(
+                Bucket=CHUNKS_BUCKET,
+                Delete={"Objects": [{"Key": key} for key in keys[i:i + 1000]], "Quiet": True}
+            )
+            print(f"[INFO] 이전 chunk 객체 {len(keys[i:i + 1000])}개 삭제")
+        except Exception as e:
+            print(f"[WARN] 이전 chunk 객체 삭제 실패: {e}")
+
 
 def lambda_handler(event, context):
     print("[INFO] Lexora Extract Lambda triggered")
+    records = event.get("Records", [])
+    failures = []
 
-    for record in event.get("Records", []):
-        file_id = None
+    for record in records:
         try:
             body = json.loads(record["body"])
             print(f"[INFO] SQS 메시지 수신: {body}")
@@ -156,45 +442,96 @@ def lambda_handler(event, context):
             file_id = body["fileId"]
             user_id = body["userId"]
             s3_path = body["s3Path"]
+        except Exception as e:
+            # 파싱 불가 메시지는 재시도해도 실패하므로 실패 목록에 넣지 않음
+            print(f"[ERROR] 메시지 파싱 실패: {e}")
+            continue
 
+        if context is not None and context.get_remaining_time_in_millis() < EXTRACT_TIME_SAFETY_MS:
+            print(f"[WARN] 남은 실행 시간 부족 - fileId={file_id} 재시도로 넘김")
+            failures.append(record["messageId"])
+            continue
+
+        try:
             bucket, key = parse_s3_path(s3_path)
             print(f"[INFO] S3 경로 파싱 완료 - bucket: {bucket}, key: {key}")
 
-            print("[INFO] PDF 텍스트 추출 시작")
-            pages = extract_text_by_page(bucket, key)
-            print(f"[INFO] 페이지 수: {len(pages)}")
-
-            print("[INFO] chunk 분할 시작")
-            chunks = split_chunks_with_page_info(pages, max_chars=1000, overlap=200)
-            if not chunks:
+            source_format = body.get("sourceFormat") or os.path.splitext(key)[1].lstrip(".").lower()
+
+            # 페이지 → chunk → batch를 generator로 이어서 처리하고 batch 단위로 S3 저장 + 위치 전송
+            # (문서 전체 텍스트/chunk를 메모리에 쌓지 않음)
+            previous_item = reset_batch_progress(file_id)
+            previous = load_chunk_manifest(previous_item.get("indexedManifest")) if INCREMENTAL_REINGEST else None
+            # 문서별 backend 지정(pdfBackend)이 없으면 PDF_TEXT_BACKEND 환경 변수 사용
+            pages = iter_pages(bucket, key, source_format, body.get("pdfBackend"))
+            chunker = OffsetChunker(
+                max_chars=CHUNK_MAX_CHARS,
+                overlap=CHUNK_OVERLAP,
+                max_tokens=CHUNK_MAX_TOKENS or None,
+                overlap_tokens=CHUNK_OVERLAP_TOKENS
+            )
+            spans = chunker.iter_spans(pages)
+            manifest = []
+            items = filter_changed_chunks(iter_chunk_items(chunker, spans), previous, manifest)
+
+            batch_count = 0
+            sent_count = 0
+            pointers = []
+            for batch in iter_chunk_batches(items):
+                chunks_path = write_chunk_part(file_id, batch_count, batch)
+                pointers.append({
+                    "fileId": file_id,
+                    "userId": user_id,
+                    "batchIndex": batch_count,
+                    "chunksPath": chunks_path,
+                    "chunkStart": batch[0]["chunkIndex"],
+                    "chunkEnd": batch[-1]["chunkIndex"] + 1
+                })
+                batch_count += 1
+                sent_count += len(batch)
+                print(f"[INFO] chunk part 저장 - {chunks_path}, 누적 chunk {sent_count}개")
+
+                if len(pointers) == SQS_SEND_BATCH_SIZE:
+                    send_pointers_to_embedding_queue(pointers)
+                    pointers = []
+
+            if pointers:
+                send_pointers_to_embedding_queue(pointers)
+
+            chunk_count = len(manifest)
+            if not chunk_count:
                 raise Exception("chunk 분할 실패 - 결과 없음")
-            print(f"[INFO] chunk 분할 완료 - 총 {len(chunks)}개")
-
-            chunk_payload = {
-                "fileId": file_id,
-                "userId": user_id,
-                "chunks": [
-                    {
-                        "chunkIndex": i,
-                        "content": chunk["content"],
-                        "page": chunk["page"]  # 여기 추가
-                    }
-                    for i, chunk in enumerate(chunks)
-                ]
-            }
-            send_to_embedding_queue(chunk_payload)
-            print(f"[INFO] 전체 chunk 전송 완료 - 총 {len(chunks)}개")
-
-            update_file_status(file_id, "extracted")
+            if previous:
+                print(f"[INFO] 이전 버전 대비 변경 chunk {sent_count}/{chunk_count}개만 임베딩 요청")
+            print(f"[INFO] 전체 chunk 전송 완료 - 총 {chunk_count}개, batch {batch_count}개")
+
+            # 이전 버전보다 chunk 수가 줄었으면 남은 chunk 색인 삭제 요청
+            if previous and previous["chunkCount"] > chunk_count:
+                send_to_embedding_queue({
+                    "fileId": file_id,
+                    "userId": user_id,
+                    "action": "prune",
+                    "chunkCount": chunk_count
+                })
+
+            manifest_path = write_chunk_manifest(file_id, s3_path, manifest)
+            finalize_extraction(file_id, batch_count, chunk_count, manifest_path)
+            # part는 batch 번호로 덮어쓰므로 이전 실행의 batch가 더 많았으면 그 뒤 번호만 남음
+            # 임베딩이 끝나기 전에 다시 추출된 이전 실행의 manifest는 승격될 일이 없음
+            stale = [chunk_part_key(file_id, i) for i in range(batch_count, int(previous_item.get("batchCount", 0)))]
+            if previous_item.get("pendingManifest") not in (None, previous_item.get("indexedManifest")):
+                stale.append(parse_s3_path(previous_item["pendingManifest"])[1])
+            delete_chunk_objects(stale)
             print(f"[INFO] 처리 완료 - fileId={file_id}, status=extracted")
 
         except Exception as e:
             print(f"[ERROR] 처리 실패 - {e}")
-            if file_id:
-                try:
-                    update_file_status(file_id, "failed", str(e))
-                    print(f"[INFO] 실패 상태 기록 완료 - fileId={file_id}, status=failed")
-                except Exception as e2:
-                    print(f"[ERROR] DynamoDB 상태 업데이트 실패 - {e2}")
-            else:
-                print("[ERROR] fileId 없음 - 상태 업데이트 생략")
+            failures.append(record["messageId"])
+            try:
+                update_file_status(file_id, "failed", str(e))
+                print(f"[INFO] 실패 상태 기록 완료 - fileId={file_id}, status=failed")
+            except Exception as e2:
+                print(f"[ERROR] DynamoDB 상태 업데이트 실패 - {e2}")
+
+    print(f"[INFO] 배치 처리 완료 - 성공 {len(records) - len(failures)}건, 실패 {len(failures)}건")
+    return {"batchItemFailures": [{"itemIdentifier": message_id} for message_id in failures]}
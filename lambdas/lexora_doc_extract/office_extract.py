@@ -0,0 +1,223 @@
+import io
+import posixpath
+import re
+import zipfile
+import xml.etree.ElementTree as ET
+from typing import List
+
+from text_extract import rows_to_text
+
+# OOXML(docx/xlsx/pptx)을 PDF 변환 없이 직접 파싱
+# 결과는 PDF 추출(iter_pdf_pages)과 같은 [{"page": n, "text": ...}] 형태
+# - docx: 페이지 나눔 기준 페이지 번호
+# - xlsx: 시트 번호
+# - pptx: 슬라이드 번호
+
+OFFICE_FORMATS = {"docx", "xlsx", "pptx"}
+
+W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+S = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+A = "{http://schemas.openxmlformats.org/drawingml/2006/main}"
+P = "{http://schemas.openxmlformats.org/presentationml/2006/main}"
+R = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+REL = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+
+
+def _read_xml(zf: zipfile.ZipFile, name: str):
+    try:
+        return ET.fromstring(zf.read(name))
+    except KeyError:
+        return None
+
+
+def _relationships(zf: zipfile.ZipFile, part: str) -> dict:
+    # part 기준 상대 경로를 zip 내부 절대 경로로 변환한 {rId: path}
+    base_dir, base_name = posixpath.split(part)
+    root = _read_xml(zf, posixpath.join(base_dir, "_rels", f"{base_name}.rels"))
+    if root is None:
+        return {}
+    rels = {}
+    for rel in root.iter(f"{REL}Relationship"):
+        target = rel.get("Target", "")
+        if target.startswith("/"):
+            rels[rel.get("Id")] = target.lstrip("/")
+        else:
+            rels[rel.get("Id")] = posixpath.normpath(posixpath.join(base_dir, target))
+    return rels
+
+
+def _pages_from_units(units: List[tuple]) -> List[dict]:
+    return [{"page": page, "text": text.strip()} for page, text in units if text.strip()]
+
+
+# ---------- docx ----------
+
+def _docx_paragraph(p, use_rendered_breaks: bool):
+    # (텍스트, 이 문단 안에서 넘어간 페이지 수)
+    parts = []
+    breaks = 0
+    for el in p.iter():
+        if el.tag == f"{W}t":
+            parts.append(el.text or "")
+        elif el.tag == f"{W}tab":
+            parts.append("\t")
+        elif el.tag in (f"{W}br", f"{W}cr"):
+            if el.get(f"{W}type") == "page":
+                breaks += 0 if use_rendered_breaks else 1
+            else:
+                parts.append("\n")
+        elif el.tag == f"{W}lastRenderedPageBreak" and use_rendered_breaks:
+            breaks += 1
+    return "".join(parts), breaks
+
+
+def _docx_children(el):
+    # 내용 컨트롤(w:sdt/w:sdtContent)과 사용자 지정 XML(w:customXml)로 감싼 요소는 풀어서 그 안의 요소를 반환
+    for child in el:
+        if child.tag == f"{W}sdt":
+            content = child.find(f"{W}sdtContent")
+            if content is not None:
+                yield from _docx_children(content)
+        elif child.tag == f"{W}customXml":
+            yield from _docx_children(child)
+        else:
+            yield child
+
+
+def extract_docx_pages(zf: zipfile.ZipFile) -> List[dict]:
+    root = _read_xml(zf, "word/document.xml")
+    if root is None:
+        return []
+    body = root.find(f"{W}body")
+
+    # Word가 마지막 저장 시 기록한 렌더링 페이지 나눔이 있으면 그것을, 없으면 명시적 페이지 나눔 사용
+    use_rendered_breaks = root.find(f".//{W}lastRenderedPageBreak") is not None
+
+    page = 1
+    units = []
+    current = []
+
+    def add(text: str, breaks: int):
+        nonlocal page, current
+        if breaks:
+            units.append((page, "\n\n".join(current)))
+            page += breaks
+            current = []
+        if text.strip():
+            current.append(text.strip())
+
+    for el in _docx_children(body):
+        if el.tag == f"{W}p":
+            add(*_docx_paragraph(el, use_rendered_breaks))
+        elif el.tag == f"{W}tbl":
+            rows = []
+            breaks = 0
+            for tr in el.iter(f"{W}tr"):
+                cells = []
+                for tc in (c for c in _docx_children(tr) if c.tag == f"{W}tc"):
+                    texts = []
+                    for p in tc.iter(f"{W}p"):
+                        text, b = _docx_paragraph(p, use_rendered_breaks)
+                        breaks += b
+                        if text.strip():
+                            texts.append(text.strip())
+                    cells.append(" ".join(texts))
+                rows.append(" | ".join(cells))
+            add("\n".join(row for row in rows if row.strip(" |")), breaks)
+
+    units.append((page, "\n\n".join(current)))
+    return _pages_from_units(units)
+
+
+# ---------- xlsx ----------
+
+def _shared_strings(zf: zipfile.ZipFile) -> List[str]:
+    root = _read_xml(zf, "xl/sharedStrings.xml")
+    if root is None:
+        return []
+    return ["".join(t.text or "" for t in si.iter(f"{S}t")) for si in root.findall(f"{S}si")]
+
+
+def _cell_value(c, shared: List[str]) -> str:
+    cell_type = c.get("t")
+    if cell_type == "inlineStr":
+        return "".join(t.text or "" for t in c.iter(f"{S}t"))
+    v = c.find(f"{S}v")
+    if v is None or v.text is None:
+        return ""
+    if cell_type == "s":
+        return shared[int(v.text)]
+    if cell_type == "b":
+        return "TRUE" if v.text == "1" else "FALSE"
+    return v.text
+
+
+def _column_index(ref: str) -> int:
+    index = 0
+    for ch in re.match(r"[A-Z]*", ref or "").group():
+        index = index * 26 + ord(ch) - ord("A") + 1
+    return index - 1
+
+
+def extract_xlsx_pages(zf: zipfile.ZipFile) -> List[dict]:
+    workbook = _read_xml(zf, "xl/workbook.xml")
+    if workbook is None:
+        return []
+    rels = _relationships(zf, "xl/workbook.xml")
+    shared = _shared_strings(zf)
+
+    units = []
+    for sheet_num, sheet in enumerate(workbook.iter(f"{S}sheet"), start=1):
+        root = _read_xml(zf, rels.get(sheet.get(f"{R}id"), ""))
+        if root is None:
+            continue
+        rows = []
+        for row in root.iter(f"{S}row"):
+            values = {}
+            for c in row.findall(f"{S}c"):
+                value = _cell_value(c, shared).strip()
+                if value:
+                    values[_column_index(c.get("r")) if c.get("r") else len(values)] = value
+            if values:
+                rows.append([values.get(i, "") for i in range(max(values) + 1)])
+        text = rows_to_text(rows)
+        if text:
+            units.append((sheet_num, f"[{sheet.get('name')}]\n{text}"))
+    return _pages_from_units(units)
+
+
+# ---------- pptx ----------
+
+def extract_pptx_pages(zf: zipfile.ZipFile) -> List[dict]:
+    presentation = _read_xml(zf, "ppt/presentation.xml")
+    if presentation is None:
+        return []
+    rels = _relationships(zf, "ppt/presentation.xml")
+
+    units = []
+    for slide_num, slide_id in enumerate(presentation.iter(f"{P}sldId"), start=1):
+        root = _read_xml(zf, rels.get(slide_id.get(f"{R}id"), ""))
+        if root is None:
+            continue
+        paragraphs = []
+        for p in root.iter(f"{A}p"):
+            text = "".join(t.text or "" for t in p.iter(f"{A}t")).strip()
+            if text:
+                paragraphs.append(text)
+        units.append((slide_num, "\n\n".join(paragraphs)))
+    return _pages_from_units(units)
+
+
+EXTRACTORS = {
+    "docx": extract_docx_pages,
+    "xlsx": extract_xlsx_pages,
+    "pptx": extract_pptx_pages,
+}
+
+
+def extract_office_pages(data: bytes, source_format: str) -> List[dict]:
+    try:
+        with zipfile.ZipFile(io.BytesIO(data)) as zf:
+            return EXTRACTORS[source_format](zf)
+    except zipfile.BadZipFile as e:
+        raise Exception(f"OOXML 파일 형식 오류({source_format}): {e}")
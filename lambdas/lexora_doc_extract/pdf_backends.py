@@ -0,0 +1,104 @@
+import io
+import os
+from typing import Iterator, Optional
+
+# PDF 텍스트 추출 backend
+# - pdfium: pypdfium2 텍스트 레이어 직접 추출 (레이아웃 분석 없음, 가장 빠름)
+# - pdfminer: pdfminer.six 기본 레이아웃 분석 (pdfplumber 문자 객체 생성 생략)
+# - pdfplumber: 문자 단위 레이아웃 분석 (가장 느림, 기존 방식)
+# 모든 backend는 iter_texts(path, start, end)로 [start, end) 페이지 텍스트를 순서대로 yield
+
+DEFAULT_PDF_BACKEND = os.getenv("PDF_TEXT_BACKEND", "pdfium")
+
+
+class PdfiumBackend:
+    name = "pdfium"
+
+    def page_count(self, path: str) -> int:
+        import pypdfium2 as pdfium
+
+        pdf = pdfium.PdfDocument(path)
+        try:
+            return len(pdf)
+        finally:
+            pdf.close()
+
+    def iter_texts(self, path: str, start: int = 0, end: Optional[int] = None) -> Iterator[str]:
+        import pypdfium2 as pdfium
+
+        pdf = pdfium.PdfDocument(path)
+        try:
+            for i in range(start, len(pdf) if end is None else end):
+                page = pdf[i]
+                textpage = page.get_textpage()
+                try:
+                    text = textpage.get_text_range()
+                finally:
+                    textpage.close()
+                    page.close()
+                yield text.replace("\r\n", "\n").replace("\r", "\n")
+        finally:
+            pdf.close()
+
+
+class PdfminerBackend:
+    name = "pdfminer"
+
+    def page_count(self, path: str) -> int:
+        from pdfminer.pdfpage import PDFPage
+
+        with open(path, "rb") as f:
+            return sum(1 for _ in PDFPage.get_pages(f))
+
+    def iter_texts(self, path: str, start: int = 0, end: Optional[int] = None) -> Iterator[str]:
+        from pdfminer.converter import TextConverter
+        from pdfminer.layout import LAParams
+        from pdfminer.pdfinterp import PDFPageInterpreter, PDFResourceManager
+        from pdfminer.pdfpage import PDFPage
+
+        rsrcmgr = PDFResourceManager(caching=True)
+        with open(path, "rb") as f:
+            for i, page in enumerate(PDFPage.get_pages(f)):
+                if i < start:
+                    continue
+                if end is not None and i >= end:
+                    break
+                out = io.StringIO()
+                device = TextConverter(rsrcmgr, out, laparams=LAParams())
+                try:
+                    PDFPageInterpreter(rsrcmgr, device).process_page(page)
+                finally:
+                    device.close()
+                yield out.getvalue().replace("\f", "").strip()
+
+
+class PdfplumberBackend:
+    name = "pdfplumber"
+
+    def page_count(self, path: str) -> int:
+        import pdfplumber
+
+        with pdfplumber.open(path) as pdf:
+            return len(pdf.pages)
+
+    def iter_texts(self, path: str, start: int = 0, end: Optional[int] = None) -> Iterator[str]:
+        import pdfplumber
+
+        pages = list(range(start + 1, end + 1)) if end is not None else None
+        with pdfplumber.open(path, pages=pages) as pdf:
+            for page in (pdf.pages if end is not None else pdf.pages[start:]):
+                yield page.extract_text() or ""
+                page.flush_cache()  # 페이지별 문자/객체 캐시 해제
+
+
+PDF_BACKENDS = {
+    backend.name: backend
+    for backend in (PdfiumBackend(), PdfminerBackend(), PdfplumberBackend())
+}
+
+
+def get_pdf_backend(name: Optional[str] = None):
+    name = (name or DEFAULT_PDF_BACKEND).lower()
+    if name not in PDF_BACKENDS:
+        raise ValueError(f"지원하지 않는 PDF backend: {name} (가능: {', '.join(PDF_BACKENDS)})")
+    return PDF_BACKENDS[name]
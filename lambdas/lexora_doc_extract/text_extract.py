@@ -0,0 +1,109 @@
+import csv
+import io
+import re
+from html.parser import HTMLParser
+from typing import List
+
+# PDF 변환 없이 바로 파싱하는 텍스트 기반 형식
+# 결과는 PDF 추출(iter_pdf_pages)과 같은 [{"page": n, "text": ...}] 형태
+
+TEXT_FORMATS = {"txt", "md", "markdown"}
+HTML_FORMATS = {"html", "htm"}
+CSV_FORMATS = {"csv"}
+TEXT_NATIVE_FORMATS = TEXT_FORMATS | HTML_FORMATS | CSV_FORMATS
+
+# 한국어 문서는 utf-8 외에 cp949(euc-kr 상위 집합) 인코딩이 흔함
+ENCODINGS = ("utf-8-sig", "cp949")
+
+CSV_ROWS_PER_PARAGRAPH = 20
+
+BLOCK_TAGS = {
+    "p", "div", "section", "article", "header", "footer", "li", "tr",
+    "table", "ul", "ol", "h1", "h2", "h3", "h4", "h5", "h6", "pre",
+    "blockquote", "title",
+}
+SKIP_TAGS = {"script", "style", "noscript", "template"}
+
+
+def decode_text(data: bytes) -> str:
+    for encoding in ENCODINGS:
+        try:
+            return data.decode(encoding)
+        except UnicodeDecodeError:
+            continue
+    return data.decode("utf-8", errors="replace")
+
+
+class _HtmlTextParser(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts = []
+        self.skip_depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in SKIP_TAGS:
+            self.skip_depth += 1
+        elif tag == "br":
+            self.parts.append("\n")
+        elif tag in ("td", "th"):
+            self.parts.append(" | ")
+        elif tag in BLOCK_TAGS:
+            self.parts.append("\n\n")
+
+    def handle_endtag(self, tag):
+        if tag in SKIP_TAGS:
+            self.skip_depth = max(0, self.skip_depth - 1)
+        elif tag in BLOCK_TAGS:
+            self.parts.append("\n\n")
+
+    def handle_data(self, data):
+        if self.skip_depth:
+            return
+        text = re.sub(r"\s+", " ", data)
+        if text.strip():
+            self.parts.append(text)
+
+
+def html_to_text(html: str) -> str:
+    parser = _HtmlTextParser()
+    parser.feed(html)
+    parser.close()
+    text = "".join(parser.parts)
+    text = re.sub(r"[ \t]*\n[ \t]*", "\n", text)
+    text = re.sub(r"(^|\n)(?: ?\| ?)+", r"\1", text)  # 행 첫 셀 앞 구분자 제거
+    return re.sub(r"\n{3,}", "\n\n", text).strip()
+
+
+def rows_to_text(rows: List[List[str]]) -> str:
+    rows = [row for row in rows if any(row)]
+    if not rows:
+        return ""
+
+    # 헤더를 각 행 묶음 앞에 반복해서 chunk 단독으로도 열 의미가 남도록 함
+    header = " | ".join(rows[0])
+    body = rows[1:]
+    paragraphs = []
+    for i in range(0, len(body), CSV_ROWS_PER_PARAGRAPH):
+        lines = [" | ".join(row) for row in body[i:i + CSV_ROWS_PER_PARAGRAPH]]
+        paragraphs.append("\n".join([header] + lines))
+    return "\n\n".join(paragraphs) if paragraphs else header
+
+
+def csv_to_text(data: str) -> str:
+    return rows_to_text([[cell.strip() for cell in row] for row in csv.reader(io.StringIO(data))])
+
+
+def extract_text_pages(data: bytes, source_format: str) -> List[dict]:
+    text = decode_text(data).replace("\r\n", "\n").replace("\r", "\n")
+
+    if source_format in HTML_FORMATS:
+        text = html_to_text(text)
+    elif source_format in CSV_FORMATS:
+        text = csv_to_text(text)
+
+    # 폼 피드(\f)가 있으면 페이지 구분으로 사용
+    result = []
+    for page_num, page_text in enumerate(text.split("\f")):
+        if page_text.strip():
+            result.append({"page": page_num + 1, "text": page_text.strip()})
+    return result
@@ -42,7 +42,7 @@ def generate_questions_v2(event, context):
         validate_file_ids(file_ids, user_id)
 
         # OpenSearch에서 랜덤 샘플링
-        sampled_contents = sample_chunks_from_opensearch(file_ids, sample_size=3)
+        sampled_contents = sample_chunks_from_opensearch(file_ids, sample_size=3, user_id=user_id)
         if not sampled_contents:
             return response(False, "문서에서 샘플 청크를 가져올 수 없습니다.", status_code=400)
 
@@ -128,7 +128,7 @@ def query_send(event, context):
         if file_ids:
             validate_file_ids(file_ids, user_id)
             embedding = get_prompt_embedding(prompt)
-            context_chunks = search_similar_chunks(embedding, file_ids)
+            context_chunks = search_similar_chunks(embedding, file_ids, user_id=user_id)
 
         # Claude 프롬프트 구성
         if context_chunks:
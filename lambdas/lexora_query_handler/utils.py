@@ -11,14 +11,29 @@ from boto3.dynamodb.conditions import Key
 from opensearchpy import OpenSearch, RequestsHttpConnection, AWSV4SignerAuth
 import random
 
+from bedrock_rate import BEDROCK_CLIENT_CONFIG, call_bedrock
+from token_estimate import estimate_tokens
+from vector_quant import VECTOR_DATA_TYPE, coarse, cosine, decode_full, quantize, similarity_score
+
 # 환경 변수
 FILES_TABLE = os.getenv("FILES_TABLE")
 QUERY_SESSIONS_TABLE = os.getenv("QUERY_SESSIONS_TABLE")
 OPENSEARCH_ENDPOINT = os.getenv("OPENSEARCH_ENDPOINT")
+# alias 이름 - 실제 검색은 alias가 가리키는 인덱스 (get_index_config)
 OPENSEARCH_INDEX = os.getenv("OPENSEARCH_INDEX")
+# userId로 shard routing된 인덱스면 해당 사용자 shard만 검색 (embed 스택과 같은 값)
+OPENSEARCH_ROUTING = os.getenv("OPENSEARCH_ROUTING", "false").lower() == "true"
 BEDROCK_REGION = os.getenv("BEDROCK_REGION", "ap-northeast-2")
+# 프롬프트에 넣을 참고 문서 chunk의 최대 추정 토큰 수 (점수 높은 순으로 채움)
+CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", "6000"))
 # constants.py 또는 utils.py 내 상단
-EMBED_MODEL_ID = "amazon.titan-embed-text-v2:0"  
+# 기본값: 인덱스 _meta에 모델/차원이 있으면 그 값을 사용 (색인된 벡터와 같은 모델로 질의 임베딩)
+EMBED_MODEL_ID = os.getenv("EMBED_MODEL_ID", "amazon.titan-embed-text-v2:0")
+EMBED_DIMENSIONS = int(os.getenv("EMBED_DIMENSIONS", "512"))
+# alias → 실제 인덱스/모델/차원 조회 결과 캐시 시간 (alias 전환 후 이 시간 동안은 이전 인덱스를 이전 모델로 검색)
+INDEX_CONFIG_TTL_SECONDS = int(os.getenv("INDEX_CONFIG_TTL_SECONDS", "60"))
+# 2단계 검색 인덱스: coarse 벡터로 top_k * 이 배수만큼 후보를 뽑은 뒤 전체 차원 벡터로 재정렬
+RESCORE_CANDIDATE_FACTOR = int(os.getenv("RESCORE_CANDIDATE_FACTOR", "4"))
 CLAUDE_MODEL_ID  = "anthropic.claude-3-5-sonnet-20240620-v1:0"
 
 # MODEL_ID = "anthropic.claude-3-5-sonnet-20241022-v2:0" 
@@ -36,7 +51,7 @@ files_table = dynamodb.Table("lexora-files")
 sessions_table = dynamodb.Table("lexora-sessions")
 query_sessions_table = dynamodb.Table(os.environ["QUERY_SESSIONS_TABLE"])
 
-bedrock = boto3.client("bedrock-runtime", region_name="ap-northeast-2")
+bedrock = boto3.client("bedrock-runtime", region_name="ap-northeast-2", config=BEDROCK_CLIENT_CONFIG)
 
 
 
@@ -143,41 +158,93 @@ def generate_session_title(prompt, max_length=30):
     cleaned = re.sub(r"[\"\'\\]", "", cleaned)
     return cleaned[:max_length] + "..." if len(cleaned) > max_length else cleaned
 
+_index_config = {"loadedAt": 0}
+
+
+def get_index_config():
+    # (실제 인덱스 이름, 임베딩 모델, 차원, coarse 차원, 벡터 저장 형식) - 한 번에 묶어 캐시해서 alias 전환 중에도 서로 어긋나지 않음
+    now = time.time()
+    if now - _index_config["loadedAt"] >= INDEX_CONFIG_TTL_SECONDS:
+        index, meta = OPENSEARCH_INDEX, {}
+        try:
+            for index, mapping in opensearch.indices.get_mapping(index=OPENSEARCH_INDEX).items():
+                meta = mapping["mappings"].get("_meta", {})
+                break
+        except Exception as e:
+            print(f"[WARNING] 인덱스 설정 조회 실패 - 기본값 사용: {e}")
+        _index_config.update(
+            loadedAt=now,
+            index=index,
+            modelId=meta.get("embedModelId", EMBED_MODEL_ID),
+            dimensions=int(meta.get("embedDimensions", EMBED_DIMENSIONS)),
+            coarseDimensions=int(meta.get("embedCoarseDimensions", 0)),
+            vectorDataType=meta.get("vectorDataType", VECTOR_DATA_TYPE),
+        )
+    config = _index_config
+    return (config["index"], config["modelId"], config["dimensions"], config["coarseDimensions"],
+            config["vectorDataType"])
+
+
 def get_prompt_embedding(text):
+    _, model_id, dimensions, _, _ = get_index_config()
     payload = {
         "inputText": text,
-        "dimensions": 512,
+        "dimensions": dimensions,
         "normalize": True
     }
-    res = bedrock.invoke_model(
-        modelId=EMBED_MODEL_ID,
+    res = call_bedrock(
+        model_id,
+        bedrock.invoke_model,
+        modelId=model_id,
         contentType="application/json",
         accept="application/json",
         body=json.dumps(payload)
     )
     return json.loads(res["body"].read())["embedding"]
 
-def search_similar_chunks(embedding_vector, file_ids, top_k=10, min_score=0.5):
+def _routing(user_id):
+    # file_ids는 validate_file_ids로 user_id 소유임을 확인한 뒤 검색하므로 같은 shard에 있음
+    return {"routing": user_id} if OPENSEARCH_ROUTING and user_id else {}
+
+
+def search_similar_chunks(embedding_vector, file_ids, top_k=10, min_score=0.5, user_id=None):
+    index, _, _, coarse_dimensions, data_type = get_index_config()
+    # 2단계 검색 인덱스면 coarse 벡터로 후보를 넉넉히 뽑고 embeddingFull로 재정렬
+    candidates = top_k * RESCORE_CANDIDATE_FACTOR if coarse_dimensions else top_k
+    search_vector = coarse(embedding_vector, coarse_dimensions) if coarse_dimensions else embedding_vector
     query = {
-        "size": top_k,
+        "size": candidates,
+        "_source": {"excludes": ["embedding"] if coarse_dimensions else ["embedding", "embeddingFull"]},
         "query": {
             "bool": {
                 "filter": [{"terms": {"fileId": file_ids}}],
                 "must": {
                     "knn": {
                         "embedding": {
-                            "vector": embedding_vector,
-                            "k": top_k
+                            # 인덱스 저장 형식(_meta vectorDataType)으로 양자화한 질의 벡터
+                            "vector": quantize(search_vector, data_type),
+                            "k": candidates
                         }
                     }
                 }
             }
         }
     }
-    res = opensearch.search(index=os.environ["OPENSEARCH_INDEX"], body=query)
+    res = opensearch.search(index=index, body=query, **_routing(user_id))
+
+    hits = res["hits"]["hits"]
+    if coarse_dimensions:
+        # 전체 차원 코사인 → coarse 검색과 같은 (1 + cos) / 2 범위 점수
+        for hit in hits:
+            full = hit["_source"].get("embeddingFull")
+            hit["_score"] = (1 + cosine(embedding_vector, decode_full(full))) / 2 if full else 0.0
+        hits = sorted(hits, key=lambda h: h["_score"], reverse=True)[:top_k]
+    else:
+        for hit in hits:
+            hit["_score"] = similarity_score(hit["_score"], data_type)
 
     results = []
-    for hit in res["hits"]["hits"]:
+    for hit in hits:
         score = hit["_score"]
         if score >= min_score:
             src = hit["_source"]
@@ -185,6 +252,7 @@ def search_similar_chunks(embedding_vector, file_ids, top_k=10, min_score=0.5):
             chunk_index = src["chunkIndex"]
             content = src["content"]
             page = src.get("page")
+            token_count = src.get("tokenCount")
 
             try:
                 file_meta = files_table.get_item(Key={"fileId": file_id}).get("Item")
@@ -199,6 +267,7 @@ def search_similar_chunks(embedding_vector, file_ids, top_k=10, min_score=0.5):
                 "chunkIndex": chunk_index,
                 "content": content,
                 "page": page, 
+                "tokenCount": token_count,
                 "score": score
             })
 
@@ -206,9 +275,27 @@ def search_similar_chunks(embedding_vector, file_ids, top_k=10, min_score=0.5):
 
 
 
-def build_marked_prompt(prompt, chunks):
+def pack_chunks_to_budget(chunks, max_tokens=CONTEXT_TOKEN_BUDGET):
+    # 점수 순서를 유지하면서 토큰 예산 안에 들어가는 chunk만 선택
+    # (색인 시 기록한 tokenCount 사용, 이전 문서는 내용으로 추정)
+    packed = []
+    used = 0
+    for c in chunks:
+        tokens = c.get("tokenCount") or estimate_tokens(c["content"])
+        tokens += 3  # [n] 마커와 줄바꿈
+        if used + tokens > max_tokens:
+            continue
+        packed.append(c)
+        used += tokens
+    if len(packed) < len(chunks):
+        print(f"[INFO] 토큰 예산({max_tokens}) 초과로 chunk {len(chunks) - len(packed)}개 제외 - 사용 {used}토큰")
+    return packed
+
+
+def build_marked_prompt(prompt, chunks, max_context_tokens=CONTEXT_TOKEN_BUDGET):
     prompt_parts = []
     footnotes = []
+    chunks = pack_chunks_to_budget(chunks, max_context_tokens)
     file_names = list({c['fileName'] for c in chunks})  # 중복 제거
 
     # 문서 목록 헤더
@@ -304,7 +391,7 @@ def build_claude_messages(prompt, file_ids, context_chunks, chat_history):
 
 
 def invoke_claude_converse_stream(prompt: str, system_prompt: str = SYSTEM_PROMPT):
-    client = boto3.client("bedrock-runtime", region_name="ap-northeast-2")
+    client = boto3.client("bedrock-runtime", region_name="ap-northeast-2", config=BEDROCK_CLIENT_CONFIG)
 
     body = {
         "anthropic_version": "bedrock-2023-05-31",
@@ -323,7 +410,9 @@ def invoke_claude_converse_stream(prompt: str, system_prompt: str = SYSTEM_PROMP
         "top_k": 250
     }
 
-    response = client.invoke_model_with_response_stream(
+    response = call_bedrock(
+        CLAUDE_MODEL_ID,
+        client.invoke_model_with_response_stream,
         modelId=CLAUDE_MODEL_ID,
         body=json.dumps(body),
         contentType="application/json"
@@ -350,7 +439,9 @@ def invoke_claude(messages):
         "messages": messages
     }
 
-    claude_res = bedrock.invoke_model(
+    claude_res = call_bedrock(
+        CLAUDE_MODEL_ID,
+        bedrock.invoke_model,
         modelId=CLAUDE_MODEL_ID,
         contentType="application/json",
         accept="application/json",
@@ -421,7 +512,9 @@ def generate_questions_from_chunks(chunks, max_questions=5):
     }
 
     # Claude 모델 호출
-    claude_res = bedrock.invoke_model(
+    claude_res = call_bedrock(
+        CLAUDE_MODEL_ID,
+        bedrock.invoke_model,
         modelId=CLAUDE_MODEL_ID,
         contentType="application/json",
         accept="application/json",
@@ -442,7 +535,7 @@ def generate_questions_from_chunks(chunks, max_questions=5):
         raise ValueError(f"Claude 응답 JSON 파싱 실패: {e}\n\n원본 응답:\n{raw_text}")
     
 
-def sample_chunks_from_opensearch(file_ids: list[str], sample_size: int = 3) -> list[str]:
+def sample_chunks_from_opensearch(file_ids: list[str], sample_size: int = 3, user_id: str = None) -> list[str]:
     """
     OpenSearch에서 file_ids에 해당하는 문서 청크를 랜덤 샘플링합니다.
     - fileId 필터링 후, function_score.random_score를 이용해 랜덤 추출
@@ -466,6 +559,7 @@ def sample_chunks_from_opensearch(file_ids: list[str], sample_size: int = 3) ->
         "_source": ["content"]
     }
 
-    resp = opensearch.search(index=OPENSEARCH_INDEX, body=body)
+    index, _, _, _, _ = get_index_config()
+    resp = opensearch.search(index=index, body=body, **_routing(user_id))
     hits = resp["hits"]["hits"]
     return [hit["_source"]["content"] for hit in hits]
\ No newline at end of file
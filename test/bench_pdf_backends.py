@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+PDF 텍스트 추출 backend 비교 (lexora_doc_extract/pdf_backends.py)
+
+각 backend의 처리량(pages/s)과 pdfplumber 결과 대비 텍스트 충실도를 비교한다.
+- similarity: 공백 정규화 후 difflib 유사도
+- hangul_recall: 기준 텍스트의 한글 음절 중 backend 결과에도 있는 비율 (글자 빈도 기준)
+
+사용법:
+    python3 test/bench_pdf_backends.py                     # test/*.pdf
+    python3 test/bench_pdf_backends.py manual.pdf --repeat 3 --json backends.json
+"""
+import argparse
+import difflib
+import glob
+import json
+import os
+import re
+import sys
+import time
+from collections import Counter
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "lambdas", "lexora_doc_extract"))
+
+from pdf_backends import PDF_BACKENDS  # noqa: E402
+
+REFERENCE_BACKEND = "pdfplumber"
+HANGUL = re.compile(r"[가-힣]")
+
+
+def _normalize(text: str) -> str:
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def _hangul_recall(reference: str, candidate: str) -> float:
+    ref = Counter(HANGUL.findall(reference))
+    if not ref:
+        return 1.0
+    cand = Counter(HANGUL.findall(candidate))
+    return sum(min(n, cand[ch]) for ch, n in ref.items()) / sum(ref.values())
+
+
+def run_backend(backend, path: str, repeat: int):
+    timings = []
+    texts = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        texts = list(backend.iter_texts(path))
+        timings.append(time.perf_counter() - started)
+    return min(timings), texts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("pdfs", nargs="*", help="비교할 PDF (기본: test/*.pdf)")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--json", help="결과 JSON 저장 경로")
+    args = parser.parse_args()
+
+    pdfs = args.pdfs or sorted(glob.glob(os.path.join(ROOT, "test", "*.pdf")))
+    results = []
+    for path in pdfs:
+        reference = None
+        for name in [REFERENCE_BACKEND] + [n for n in PDF_BACKENDS if n != REFERENCE_BACKEND]:
+            elapsed, texts = run_backend(PDF_BACKENDS[name], path, args.repeat)
+            joined = "\n".join(texts)
+            if reference is None:
+                reference = joined
+            results.append({
+                "pdf": os.path.basename(path),
+                "backend": name,
+                "pages": len(texts),
+                "seconds": round(elapsed, 3),
+                "pages_per_s": round(len(texts) / elapsed, 1) if elapsed else None,
+                "similarity": round(difflib.SequenceMatcher(
+                    None, _normalize(reference), _normalize(joined), autojunk=False).ratio(), 4),
+                "hangul_recall": round(_hangul_recall(reference, joined), 4),
+            })
+
+    columns = ["pdf", "backend", "pages", "seconds", "pages_per_s", "similarity", "hangul_recall"]
+    widths = [max(len(c), *(len(str(r[c])) for r in results)) for c in columns] if results else []
+    print("  ".join(c.ljust(w) for c, w in zip(columns, widths)))
+    for r in results:
+        print("  ".join(str(r[c]).ljust(w) for c, w in zip(columns, widths)))
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,370 @@
+#!/usr/bin/env python3
+"""
+ConvPDF / Extract 단계 벤치마크
+
+test/ 샘플 문서 + 생성한 대용량 문서를 대상으로
+- convert: lexora_doc_convpdf._convert_and_store_pdf (LibreOffice listener, cold/warm)
+- extract: lexora_doc_extract.extract_pages + chunker.OffsetChunker
+를 로컬 디렉토리 기반 S3 대체물로 실행하고 형식별 소요 시간, peak RSS, 출력 크기를 출력한다.
+
+사용법 (test/Dockerfile.test 이미지 안에서 실행):
+    python3 test/bench_pipeline.py --stage all --iterations 3 --json bench.json
+    python3 test/bench_pipeline.py --baseline bench.json --tolerance 0.25   # 회귀 시 exit 1
+"""
+import argparse
+import importlib.util
+import io
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import zipfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CORPUS_DIR = os.path.join(ROOT, "test")
+CONVPDF_DIR = os.path.join(ROOT, "lambdas", "lexora_doc_convpdf")
+EXTRACT_DIR = os.path.join(ROOT, "lambdas", "lexora_doc_extract")
+COMMON_DIR = os.path.join(ROOT, "lambdas", "common")
+
+RAW_BUCKET = "bench-raw"
+CONVERTED_BUCKET = "bench-converted"
+
+CORPUS_FORMATS = {"pdf", "doc", "docx", "xlsx", "pptx", "html", "txt"}
+
+SAMPLE_PARAGRAPH = (
+    "본 규정은 회사의 정보보안 정책에 관한 사항을 정한다. 모든 임직원은 업무상 취득한 정보를 "
+    "외부에 유출하여서는 아니 되며, This policy applies to all employees and contractors. "
+)
+
+
+# ---------- 로컬 S3 대체물 ----------
+
+class LocalS3:
+    """handler 모듈의 boto3 s3 client 자리에 주입하는 디렉토리 기반 S3"""
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def _path(self, bucket: str, key: str) -> str:
+        return os.path.join(self.root, bucket, key)
+
+    def _missing(self, op: str):
+        from botocore.exceptions import ClientError
+        return ClientError({"Error": {"Code": "404", "Message": "Not Found"}}, op)
+
+    def put_file(self, bucket: str, key: str, src: str):
+        os.makedirs(os.path.dirname(self._path(bucket, key)), exist_ok=True)
+        shutil.copyfile(src, self._path(bucket, key))
+
+    def download_file(self, bucket, key, filename):
+        if not os.path.isfile(self._path(bucket, key)):
+            raise self._missing("GetObject")
+        shutil.copyfile(self._path(bucket, key), filename)
+
+    def upload_fileobj(self, fileobj, bucket, key):
+        os.makedirs(os.path.dirname(self._path(bucket, key)), exist_ok=True)
+        with open(self._path(bucket, key), "wb") as f:
+            shutil.copyfileobj(fileobj, f)
+
+    def head_object(self, Bucket, Key, **kwargs):
+        if not os.path.isfile(self._path(Bucket, Key)):
+            raise self._missing("HeadObject")
+        return {"ContentLength": os.path.getsize(self._path(Bucket, Key))}
+
+    def get_object(self, Bucket, Key, **kwargs):
+        if not os.path.isfile(self._path(Bucket, Key)):
+            raise self._missing("GetObject")
+        with open(self._path(Bucket, Key), "rb") as f:
+            return {"Body": io.BytesIO(f.read())}
+
+    def copy_object(self, Bucket, CopySource, Key, **kwargs):
+        self.put_file(Bucket, Key, self._path(CopySource["Bucket"], CopySource["Key"]))
+
+
+# ---------- handler 모듈 로드 ----------
+
+def _load_handler(name: str, lambda_dir: str):
+    os.environ.setdefault("AWS_DEFAULT_REGION", "ap-northeast-2")
+    os.environ.setdefault("FILES_TABLE", "lexora-files")
+    sys.path[:0] = [lambda_dir, COMMON_DIR]
+    spec = importlib.util.spec_from_file_location(name, os.path.join(lambda_dir, "handler.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+# ---------- 대용량 문서 생성 ----------
+
+def _generate_docx(path: str, pages: int, paragraphs_per_page: int = 12):
+    w = 'xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"'
+    body = []
+    for page in range(pages):
+        for i in range(paragraphs_per_page):
+            body.append(f"<w:p><w:r><w:t>{page + 1}-{i + 1}. {SAMPLE_PARAGRAPH}</w:t></w:r></w:p>")
+        body.append('<w:p><w:r><w:br w:type="page"/></w:r></w:p>')
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr(
+            "[Content_Types].xml",
+            '<?xml version="1.0" encoding="UTF-8"?>'
+            '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+            '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+            '<Default Extension="xml" ContentType="application/xml"/>'
+            '<Override PartName="/word/document.xml" '
+            'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+            "</Types>",
+        )
+        zf.writestr(
+            "_rels/.rels",
+            '<?xml version="1.0" encoding="UTF-8"?>'
+            '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+            '<Relationship Id="rId1" '
+            'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+            'Target="word/document.xml"/></Relationships>',
+        )
+        zf.writestr(
+            "word/document.xml",
+            f'<?xml version="1.0" encoding="UTF-8"?><w:document {w}><w:body>{"".join(body)}</w:body></w:document>',
+        )
+
+
+def _generate_txt(path: str, paragraphs: int):
+    with open(path, "w", encoding="utf-8") as f:
+        for i in range(paragraphs):
+            f.write(f"{i + 1}. {SAMPLE_PARAGRAPH}\n\n")
+
+
+def _generate_csv(path: str, rows: int):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("번호,부서,내용\n")
+        for i in range(rows):
+            f.write(f"{i + 1},정보보안팀,\"{SAMPLE_PARAGRAPH.strip()}\"\n")
+
+
+def build_corpus(workdir: str, large_pages: int) -> list:
+    # (이름, 로컬 경로, 형식)
+    corpus = []
+    for name in sorted(os.listdir(CORPUS_DIR)):
+        path = os.path.join(CORPUS_DIR, name)
+        fmt = os.path.splitext(name)[1].lstrip(".").lower()
+        if os.path.isfile(path) and fmt in CORPUS_FORMATS:
+            corpus.append((name, path, fmt))
+
+    if large_pages > 0:
+        generated = [
+            (f"large-{large_pages}p.docx", _generate_docx, large_pages),
+            (f"large-{large_pages}p.txt", _generate_txt, large_pages * 12),
+            (f"large-{large_pages}p.csv", _generate_csv, large_pages * 40),
+        ]
+        for name, generator, size in generated:
+            path = os.path.join(workdir, name)
+            generator(path, size)
+            corpus.append((name, path, os.path.splitext(name)[1].lstrip(".")))
+    return corpus
+
+
+# ---------- 측정 ----------
+
+def _tree_peak_rss_kb(pid: int) -> int:
+    # listener(soffice → oosplash → soffice.bin) 프로세스 트리의 VmHWM 합계
+    total = 0
+    pending = [pid]
+    while pending:
+        current = pending.pop()
+        try:
+            with open(f"/proc/{current}/status") as f:
+                for line in f:
+                    if line.startswith("VmHWM:"):
+                        total += int(line.split()[1])
+            for task in os.listdir(f"/proc/{current}/task"):
+                with open(f"/proc/{current}/task/{task}/children") as f:
+                    pending.extend(int(child) for child in f.read().split())
+        except (FileNotFoundError, ProcessLookupError):
+            continue
+    return total
+
+
+def bench_convert(corpus: list, workdir: str, iterations: int) -> list:
+    convpdf = _load_handler("convpdf_handler", CONVPDF_DIR)
+    import lo_daemon
+
+    results = []
+    for name, path, fmt in corpus:
+        if fmt == "pdf":
+            continue
+
+        # 형식별로 listener를 새로 띄워서 cold / warm 분리 측정
+        lo_daemon.shutdown()
+        timings = []
+        output_size = 0
+        for i in range(iterations + 1):
+            store = LocalS3(os.path.join(workdir, f"s3-convert-{fmt}-{i}"))  # 매 회 빈 저장소 → 변환 캐시 미적중
+            store.put_file(RAW_BUCKET, name, path)
+            convpdf.s3 = store
+            convpdf.RAW_BUCKET = RAW_BUCKET
+            convpdf.CONVERTED_BUCKET = CONVERTED_BUCKET
+
+            started = time.perf_counter()
+            convpdf._convert_and_store_pdf(name, f"{name}.pdf")
+            timings.append(time.perf_counter() - started)
+
+            output = store._path(CONVERTED_BUCKET, f"{name}.pdf")
+            output_size = os.path.getsize(output)
+            shutil.copyfile(output, os.path.join(workdir, f"{name}.pdf"))
+
+        pid = lo_daemon.listener_pid()
+        results.append({
+            "stage": "convert",
+            "name": name,
+            "format": fmt,
+            "input_bytes": os.path.getsize(path),
+            "cold_s": round(timings[0], 3),
+            "warm_s": round(statistics.median(timings[1:]), 3) if iterations else None,
+            "peak_rss_mb": round(_tree_peak_rss_kb(pid) / 1024, 1) if pid else None,
+            "output_bytes": output_size,
+        })
+    lo_daemon.shutdown()
+    return results
+
+
+def _extract_once(path: str, fmt: str) -> dict:
+    # 자식 프로세스에서 실행 (형식별 peak RSS 분리)
+    import resource
+
+    extract = _load_handler("extract_handler", EXTRACT_DIR)
+    store = LocalS3(tempfile.mkdtemp(prefix="bench-s3-"))
+    key = os.path.basename(path)
+    store.put_file(CONVERTED_BUCKET, key, path)
+    extract.s3 = store
+
+    started = time.perf_counter()
+    pages = extract.extract_pages(CONVERTED_BUCKET, key, fmt)
+    chunker = extract.OffsetChunker(max_chars=extract.CHUNK_MAX_CHARS, overlap=extract.CHUNK_OVERLAP)
+    chunks = [chunker.text(span) for span in chunker.iter_spans(pages)]
+    elapsed = time.perf_counter() - started
+    shutil.rmtree(store.root, ignore_errors=True)
+
+    return {
+        "wall_s": round(elapsed, 3),
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "pages": len(pages),
+        "chunks": len(chunks),
+        "output_bytes": len(json.dumps(chunks, ensure_ascii=False).encode()),
+    }
+
+
+def bench_extract(corpus: list, workdir: str, iterations: int) -> list:
+    sys.path.insert(0, EXTRACT_DIR)
+    from office_extract import OFFICE_FORMATS
+    from text_extract import TEXT_NATIVE_FORMATS
+
+    # 원본 직접 추출 가능한 형식 + convert 단계에서 만든 PDF
+    targets = []
+    for name, path, fmt in corpus:
+        if fmt == "pdf" or fmt in OFFICE_FORMATS or fmt in TEXT_NATIVE_FORMATS:
+            targets.append((name, path, fmt))
+        converted = os.path.join(workdir, f"{name}.pdf")
+        if fmt != "pdf" and os.path.isfile(converted):
+            targets.append((f"{name}.pdf", converted, "pdf"))
+
+    results = []
+    for name, path, fmt in targets:
+        runs = []
+        for _ in range(max(iterations, 1)):
+            proc = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), "--extract-one", path, fmt],
+                capture_output=True, text=True,
+            )
+            if proc.returncode != 0:
+                print(f"[WARN] extract 실패 - {name}: {proc.stderr.strip()[-300:]}")
+                break
+            runs.append(json.loads(proc.stdout.strip().splitlines()[-1]))
+        if not runs:
+            continue
+        results.append({
+            "stage": "extract",
+            "name": name,
+            "format": fmt,
+            "input_bytes": os.path.getsize(path),
+            "wall_s": round(statistics.median(r["wall_s"] for r in runs), 3),
+            "peak_rss_mb": max(r["peak_rss_mb"] for r in runs),
+            "pages": runs[0]["pages"],
+            "chunks": runs[0]["chunks"],
+            "output_bytes": runs[0]["output_bytes"],
+        })
+    return results
+
+
+# ---------- 리포트 ----------
+
+def print_report(results: list):
+    columns = ["stage", "name", "format", "input_bytes", "cold_s", "warm_s", "wall_s",
+               "peak_rss_mb", "pages", "chunks", "output_bytes"]
+    columns = [c for c in columns if any(c in r for r in results)]
+    rows = [[str(r.get(c, "")) for c in columns] for r in results]
+    widths = [max(len(c), *(len(row[i]) for row in rows)) if rows else len(c) for i, c in enumerate(columns)]
+    print("  ".join(c.ljust(w) for c, w in zip(columns, widths)))
+    for row in rows:
+        print("  ".join(v.ljust(w) for v, w in zip(row, widths)))
+
+
+def check_regressions(results: list, baseline_path: str, tolerance: float) -> list:
+    with open(baseline_path) as f:
+        baseline = {(r["stage"], r["name"]): r for r in json.load(f)}
+
+    regressions = []
+    for r in results:
+        base = baseline.get((r["stage"], r["name"]))
+        if not base:
+            continue
+        for metric in ("warm_s", "wall_s", "peak_rss_mb"):
+            if r.get(metric) and base.get(metric) and r[metric] > base[metric] * (1 + tolerance):
+                regressions.append(f"{r['stage']}/{r['name']} {metric}: {base[metric]} → {r[metric]}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--stage", choices=["convert", "extract", "all"], default="all")
+    parser.add_argument("--iterations", type=int, default=3, help="warm 측정 반복 횟수")
+    parser.add_argument("--large-pages", type=int, default=200, help="생성 문서 페이지 수 (0이면 생성 안 함)")
+    parser.add_argument("--json", help="결과 JSON 저장 경로")
+    parser.add_argument("--baseline", help="비교할 이전 결과 JSON")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="허용 회귀 비율")
+    parser.add_argument("--extract-one", nargs=2, metavar=("PATH", "FORMAT"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.extract_one:
+        result = _extract_once(*args.extract_one)
+        print(json.dumps(result))
+        return
+
+    workdir = tempfile.mkdtemp(prefix="lexora-bench-")
+    try:
+        corpus = build_corpus(workdir, args.large_pages)
+        results = []
+        if args.stage in ("convert", "all"):
+            results += bench_convert(corpus, workdir, args.iterations)
+        if args.stage in ("extract", "all"):
+            results += bench_extract(corpus, workdir, args.iterations)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print_report(results)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+    if args.baseline:
+        regressions = check_regressions(results, args.baseline, args.tolerance)
+        for line in regressions:
+            print(f"[REGRESSION] {line}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
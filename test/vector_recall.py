@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+벡터 저장 형식(float / byte / fp16)별 검색 recall 비교
+
+float32 코사인 기준 정확한 top-k를 정답으로 두고, 색인(lexora_doc_embed)과 질의(lexora_query_handler)가
+쓰는 vector_quant.quantize로 양자화한 벡터의 top-k가 얼마나 겹치는지(recall@k) 계산한다.
+HNSW 근사 오차는 빼고 양자화에 의한 손실만 본다. 벡터당 저장 크기와 HNSW 메모리 추정치도 함께 출력.
+
+입력 벡터:
+- --vectors: JSONL (한 줄에 벡터 list 또는 {"embedding": [...]}), 예: float 인덱스에서 내보낸 벡터
+- --from-index: OPENSEARCH_ENDPOINT / OPENSEARCH_INDEX 환경 변수의 float 인덱스에서 scroll로 읽음
+- 둘 다 없으면 군집 형태의 합성 벡터 (실제 분포와 달라 참고용)
+
+사용법:
+    python3 test/vector_recall.py --vectors embeddings.jsonl --queries 100 --k 10
+    python3 test/vector_recall.py --synthetic 5000 --dim 512 --json recall.json
+    python3 test/vector_recall.py --vectors embeddings-1024.jsonl --coarse-dimensions 256   # 2단계 검색
+"""
+import argparse
+import importlib.util
+import json
+import math
+import operator
+import os
+import random
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+COMMON_DIR = os.path.join(ROOT, "lambdas", "common")
+
+HNSW_M = 16
+
+
+def _load_vector_quant():
+    spec = importlib.util.spec_from_file_location("vector_quant", os.path.join(COMMON_DIR, "vector_quant.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+vector_quant = _load_vector_quant()
+
+
+# ---------- 입력 벡터 ----------
+
+def load_jsonl(path: str) -> list:
+    vectors = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                item = json.loads(line)
+                vectors.append(item["embedding"] if isinstance(item, dict) else item)
+    return vectors
+
+
+def load_from_index(limit: int) -> list:
+    from opensearchpy import OpenSearch, RequestsHttpConnection, AWSV4SignerAuth
+    import boto3
+
+    region = os.environ.get("AWS_REGION", "ap-northeast-2")
+    client = OpenSearch(
+        hosts=[{"host": os.environ["OPENSEARCH_ENDPOINT"], "port": 443}],
+        http_auth=AWSV4SignerAuth(boto3.Session().get_credentials(), region, "es"),
+        use_ssl=True,
+        verify_certs=True,
+        connection_class=RequestsHttpConnection,
+    )
+    vectors = []
+    response = client.search(
+        index=os.environ["OPENSEARCH_INDEX"], scroll="2m", size=500,
+        body={"_source": ["embedding"], "query": {"match_all": {}}},
+    )
+    while response["hits"]["hits"] and len(vectors) < limit:
+        vectors.extend(h["_source"]["embedding"] for h in response["hits"]["hits"])
+        response = client.scroll(scroll_id=response["_scroll_id"], scroll="2m")
+    client.clear_scroll(scroll_id=response["_scroll_id"])
+    return vectors[:limit]
+
+
+def synthetic_vectors(count: int, dim: int, clusters: int = 50, spread: float = 0.6, seed: int = 7) -> list:
+    rng = random.Random(seed)
+    centers = [[rng.gauss(0, 1) for _ in range(dim)] for _ in range(clusters)]
+    return [[c + rng.gauss(0, spread) for c in rng.choice(centers)] for _ in range(count)]
+
+
+def normalize(vector: list) -> list:
+    norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+    return [v / norm for v in vector]
+
+
+# ---------- 유사도 / recall ----------
+
+def _dot(a: list, b: list) -> float:
+    return sum(map(operator.mul, a, b))
+
+
+def similarity(data_type: str, query: list, doc: list, doc_norm: float) -> float:
+    # 엔진별 순위 기준: byte는 lucene cosinesimil, float/fp16은 정규화 벡터의 내적
+    if data_type == "byte":
+        return _dot(query, doc) / doc_norm
+    return _dot(query, doc)
+
+
+def top_k(data_type: str, query: list, docs: list, norms: list, k: int) -> set:
+    scored = sorted(range(len(docs)), key=lambda i: similarity(data_type, query, docs[i], norms[i]), reverse=True)
+    return set(scored[:k])
+
+
+def evaluate(corpus: list, queries: list, k: int, data_types: list) -> dict:
+    truth = [top_k("float", q, corpus, [1.0] * len(corpus), k) for q in queries]
+    dim = len(corpus[0])
+    results = {}
+    for data_type in data_types:
+        started = time.time()
+        docs = [vector_quant.quantize(v, data_type) for v in corpus]
+        norms = [math.sqrt(sum(x * x for x in d)) or 1.0 for d in docs]
+        hits = 0
+        for query, expected in zip(queries, truth):
+            found = top_k(data_type, vector_quant.quantize(query, data_type), docs, norms, k)
+            hits += len(found & expected)
+        vector_bytes = dim * vector_quant.BYTES_PER_DIMENSION[data_type]
+        results[data_type] = {
+            "recall": round(hits / (len(queries) * k), 4),
+            "bytes_per_vector": vector_bytes,
+            # OpenSearch k-NN HNSW 메모리 추정식: 1.1 * (bytes * dim + 8 * m) * 문서 수
+            "hnsw_mib_per_million": round(1.1 * (vector_bytes + 8 * HNSW_M) * 1_000_000 / 2 ** 20),
+            "seconds": round(time.time() - started, 2),
+        }
+    return results
+
+
+def evaluate_coarse(corpus: list, queries: list, k: int, coarse_dimensions: int, factor: int) -> dict:
+    # 2단계 검색: 앞 coarse_dimensions 차원으로 자른 벡터만 쓴 top-k / top-(k*factor) 후보를 전체 차원으로 재정렬한 top-k
+    # (합성 벡터는 Matryoshka 구조가 없어 coarse recall이 낮게 나옴 - 실제 Titan 벡터로 확인)
+    truth = [top_k("float", q, corpus, [1.0] * len(corpus), k) for q in queries]
+    started = time.time()
+    docs = [vector_quant.coarse(v, coarse_dimensions) for v in corpus]
+    ones = [1.0] * len(docs)
+    coarse_hits = rescored_hits = 0
+    for query, expected in zip(queries, truth):
+        head = vector_quant.coarse(query, coarse_dimensions)
+        coarse_hits += len(top_k("float", head, docs, ones, k) & expected)
+        candidates = top_k("float", head, docs, ones, k * factor)
+        rescored = sorted(candidates, key=lambda i: _dot(query, corpus[i]), reverse=True)[:k]
+        rescored_hits += len(set(rescored) & expected)
+    total = len(queries) * k
+    vector_bytes = coarse_dimensions * 4
+    row = {
+        "bytes_per_vector": vector_bytes,
+        "hnsw_mib_per_million": round(1.1 * (vector_bytes + 8 * HNSW_M) * 1_000_000 / 2 ** 20),
+        "seconds": round(time.time() - started, 2),
+    }
+    return {
+        f"coarse{coarse_dimensions}": dict(row, recall=round(coarse_hits / total, 4)),
+        f"coarse{coarse_dimensions}+rescore": dict(row, recall=round(rescored_hits / total, 4)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--vectors", help="float 벡터 JSONL 경로")
+    parser.add_argument("--from-index", action="store_true", help="OPENSEARCH_INDEX에서 벡터 읽기")
+    parser.add_argument("--synthetic", type=int, default=3000, help="합성 벡터 수 (입력이 없을 때)")
+    parser.add_argument("--dim", type=int, default=512, help="합성 벡터 차원")
+    parser.add_argument("--limit", type=int, default=20000, help="사용할 최대 벡터 수")
+    parser.add_argument("--queries", type=int, default=50, help="질의로 떼어 낼 벡터 수")
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--types", default="float,fp16,byte", help="비교할 저장 형식")
+    parser.add_argument("--coarse-dimensions", type=int, default=0, help="2단계 검색 coarse 차원 (0이면 생략)")
+    parser.add_argument("--rescore-factor", type=int, default=4, help="재정렬 후보 배수 (RESCORE_CANDIDATE_FACTOR)")
+    parser.add_argument("--json", help="결과 JSON 저장 경로")
+    args = parser.parse_args()
+
+    if args.vectors:
+        vectors = load_jsonl(args.vectors)[:args.limit]
+    elif args.from_index:
+        vectors = load_from_index(args.limit)
+    else:
+        vectors = synthetic_vectors(min(args.synthetic, args.limit), args.dim)
+    vectors = [normalize([float(v) for v in vector]) for vector in vectors]
+
+    random.Random(13).shuffle(vectors)
+    queries, corpus = vectors[:args.queries], vectors[args.queries:]
+    if len(corpus) < args.k:
+        sys.exit(f"벡터가 부족합니다 - {len(vectors)}개")
+
+    data_types = [t for t in args.types.split(",") if t in vector_quant.VECTOR_DATA_TYPES]
+    print(f"문서 {len(corpus)}개, 질의 {len(queries)}개, 차원 {len(corpus[0])}, recall@{args.k}")
+    results = evaluate(corpus, queries, args.k, data_types)
+    if args.coarse_dimensions:
+        results.update(evaluate_coarse(corpus, queries, args.k, args.coarse_dimensions, args.rescore_factor))
+
+    print(f"{'type':<18} {'recall':>8} {'bytes/vec':>10} {'HNSW MiB/1M':>12} {'sec':>7}")
+    for data_type, r in results.items():
+        print(f"{data_type:<18} {r['recall']:>8.4f} {r['bytes_per_vector']:>10} {r['hnsw_mib_per_million']:>12} {r['seconds']:>7}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"k": args.k, "documents": len(corpus), "queries": len(queries), "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,4 @@
+"""
 [1] 문서 업로드 (PDF 또는 변환 필요 포맷)
      ↓
 [2] Lambda: lexora-doc-extract
@@ -13,4 +14,5 @@
      - ✅ embedding 결과 → SQS 또는 내부 처리로 lexora-doc-index로 전달
 
 [4] Lambda: lexora-doc-index
-     - OpenSearch 저장 (fileId 필터링 가능)
\ No newline at end of file
+     - OpenSearch 저장 (fileId 필터링 가능)
+"""
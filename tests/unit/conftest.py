@@ -0,0 +1,52 @@
+import importlib.util
+import os
+import sys
+from unittest import mock
+
+import pytest
+
+# 각 Lambda는 자기 디렉토리를 루트로 패키징되므로 테스트에서도 같은 방식으로 import
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+LAMBDA_DIRS = [
+    os.path.join(ROOT, "lambdas", "common"),
+    os.path.join(ROOT, "lambdas", "lexora_doc_extract"),
+    os.path.join(ROOT, "lambdas", "lexora_doc_embed"),
+]
+
+for path in LAMBDA_DIRS:
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+os.environ.setdefault("AWS_DEFAULT_REGION", "ap-northeast-2")
+
+
+def load_handler(lambda_name: str, module_name: str):
+    # Lambda마다 handler.py가 있으므로 모듈 이름을 바꿔서 로드
+    spec = importlib.util.spec_from_file_location(module_name, os.path.join(ROOT, "lambdas", lambda_name, "handler.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture(scope="session")
+def embed_handler():
+    # opensearch-py는 Lambda 이미지에만 설치되어 있음 → 클라이언트 생성만 가짜로
+    env = {"OPENSEARCH_ENDPOINT": "search.test", "FILES_TABLE": "lexora-files"}
+    sys.modules.setdefault("opensearchpy", mock.MagicMock())
+    with mock.patch.dict(os.environ, env):
+        return load_handler("lexora_doc_embed", "embed_handler")
+
+
+@pytest.fixture(scope="session")
+def extract_handler():
+    with mock.patch.dict(os.environ, {"FILES_TABLE": "lexora-files"}):
+        return load_handler("lexora_doc_extract", "extract_handler")
+
+
+@pytest.fixture
+def opensearch(embed_handler, monkeypatch):
+    # embed handler의 OpenSearch 클라이언트를 가짜로 교체, 재시도 대기는 생략
+    client = mock.MagicMock()
+    monkeypatch.setattr(embed_handler, "opensearch", client)
+    monkeypatch.setattr(embed_handler.time, "sleep", lambda _: None)
+    return client
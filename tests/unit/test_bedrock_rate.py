@@ -0,0 +1,56 @@
+from unittest import mock
+
+import pytest
+from botocore.exceptions import ClientError, EndpointConnectionError, ReadTimeoutError
+
+import bedrock_rate
+
+
+def _client_error(code: str, status: int) -> ClientError:
+    return ClientError({"Error": {"Code": code}, "ResponseMetadata": {"HTTPStatusCode": status}}, "InvokeModel")
+
+
+@pytest.fixture
+def limiter(monkeypatch):
+    monkeypatch.setattr(bedrock_rate.time, "sleep", lambda seconds: None)
+    limiter = bedrock_rate.AdaptiveRateLimiter("test-model", rate=10)
+    monkeypatch.setattr(bedrock_rate, "limiter_for", lambda model_id: limiter)
+    return limiter
+
+
+@pytest.mark.parametrize("error", [
+    EndpointConnectionError(endpoint_url="https://bedrock-runtime"),
+    ReadTimeoutError(endpoint_url="https://bedrock-runtime"),
+    _client_error("ServiceUnavailableException", 503),
+    _client_error("InternalServerException", 500),
+    _client_error("SomethingNew", 502),
+])
+def test_transient_errors_are_retried_without_slowing_down(limiter, error):
+    fn = mock.Mock(side_effect=[error, "ok"])
+
+    assert bedrock_rate.call_bedrock("test-model", fn) == "ok"
+    assert fn.call_count == 2
+    assert limiter.rate >= 10
+
+
+def test_throttling_slows_down_and_retries(limiter):
+    fn = mock.Mock(side_effect=[_client_error("ThrottlingException", 429), "ok"])
+
+    assert bedrock_rate.call_bedrock("test-model", fn) == "ok"
+    assert limiter.rate < 10
+
+
+def test_client_errors_are_not_retried(limiter):
+    fn = mock.Mock(side_effect=_client_error("ValidationException", 400))
+
+    with pytest.raises(ClientError):
+        bedrock_rate.call_bedrock("test-model", fn)
+    assert fn.call_count == 1
+
+
+def test_gives_up_after_max_attempts(limiter):
+    fn = mock.Mock(side_effect=_client_error("ServiceUnavailableException", 503))
+
+    with pytest.raises(ClientError):
+        bedrock_rate.call_bedrock("test-model", fn)
+    assert fn.call_count == bedrock_rate.BEDROCK_MAX_ATTEMPTS
@@ -0,0 +1,84 @@
+from boilerplate import detect_boilerplate, strip_boilerplate
+
+
+def _page(number: int, body: list, header: str = None, footer: str = None) -> dict:
+    lines = ([header] if header else []) + body + ([footer] if footer else [])
+    return {"page": number, "text": "\n".join(lines)}
+
+
+def _body(number: int, count: int = 10) -> list:
+    return [f"{number}장 본문 {i}번째 문장입니다." for i in range(count)]
+
+
+def test_strips_repeated_header_and_page_number_footer():
+    pages = [_page(n, _body(n), header="Lexora 사내 보고서", footer=f"- {n} -") for n in range(1, 11)]
+
+    stripped = list(strip_boilerplate(pages, sample_pages=30, min_ratio=0.5))
+
+    for n, page in enumerate(stripped, start=1):
+        assert page["text"] == "\n".join(_body(n))
+        assert page["page"] == n
+
+
+def test_keeps_short_pages_with_heading_and_numeric_rows():
+    # 표 위주의 짧은 페이지: 같은 제목과 숫자 행이 반복되어도 빈도 계산에서 제외
+    pages = [_page(n, ["매출 현황", "1 2 3", "10 20 30", "4 5 6"]) for n in range(1, 9)]
+
+    assert list(strip_boilerplate(pages)) == pages
+
+
+def test_never_empties_a_page():
+    pages = [{"page": n, "text": "대외비\n목차"} for n in range(1, 11)]
+    pages += [{"page": n, "text": "\n".join(["공통 문구"] * 8)} for n in range(11, 21)]
+
+    stripped = list(strip_boilerplate(pages))
+
+    assert all(page["text"].strip() for page in stripped)
+    assert stripped[:10] == pages[:10]
+
+
+def test_numeric_rows_are_not_folded_into_page_numbers():
+    # 표의 숫자 행은 쪽 번호처럼 '#'으로 합치지 않으므로 페이지마다 다른 값이면 반복 문구가 아님
+    pages = [_page(n, _body(n), header=f"{n * 7} {n * 11} {n * 13}") for n in range(1, 11)]
+
+    assert detect_boilerplate(pages, 0.5) == set()
+
+
+def test_same_line_in_body_is_kept():
+    # 머리글과 같은 문장이라도 가장자리 위치가 아니면 제거하지 않음
+    pages = []
+    for n in range(1, 11):
+        body = _body(n)
+        body[5] = "Lexora 사내 보고서"
+        pages.append(_page(n, body, header="Lexora 사내 보고서"))
+
+    for n, page in enumerate(strip_boilerplate(pages), start=1):
+        lines = page["text"].splitlines()
+        assert lines[0] == f"{n}장 본문 0번째 문장입니다."
+        assert "Lexora 사내 보고서" in lines
+
+
+def test_too_few_pages_are_left_alone():
+    pages = [_page(n, _body(n), header="Lexora 사내 보고서") for n in range(1, 4)]
+
+    assert list(strip_boilerplate(pages)) == pages
+
+
+def test_keeps_body_lines_that_only_differ_by_a_number():
+    # 가장자리 같은 위치의 본문 문장이 숫자만 다르더라도 쪽 번호 줄이 아니면 유지
+    pages = [
+        _page(n, _body(n), header=f"See page {n + 10} for the {n}th clause.", footer=f"Body text of page {n} continues 3/{n + 1}")
+        for n in range(1, 11)
+    ]
+
+    assert list(strip_boilerplate(pages)) == pages
+
+
+def test_strips_page_numbers_inside_header_and_footer_lines():
+    pages = [
+        _page(n, _body(n), header=f"Page {n} | Lexora 사내 보고서", footer=f"대외비 — {n} 페이지")
+        for n in range(1, 11)
+    ]
+
+    for n, page in enumerate(strip_boilerplate(pages), start=1):
+        assert page["text"] == "\n".join(_body(n))
@@ -0,0 +1,134 @@
+import random
+
+import pytest
+
+from chunker import PAGE_SEPARATOR, OffsetChunker, _normalize
+from token_estimate import estimate_tokens
+
+WORDS = ["계약", "조항", "payment", "terms", "delivery", "보증", "기간", "invoice", "2024년", "손해배상"]
+
+
+def _pages(count: int, paragraphs: int = 4, seed: int = 7) -> list:
+    rng = random.Random(seed)
+    pages = []
+    for n in range(1, count + 1):
+        paras = [" ".join(rng.choice(WORDS) for _ in range(rng.randint(5, 60))) + "." for _ in range(paragraphs)]
+        pages.append({"page": n, "text": "\n\n".join(paras)})
+    return pages
+
+
+def _document(pages: list) -> str:
+    return PAGE_SEPARATOR.join(t for t in (_normalize(p["text"]) for p in pages) if t)
+
+
+def _chunks(chunker: OffsetChunker, pages: list) -> list:
+    # text()는 다음 span을 만들기 전까지만 유효하므로 바로 꺼냄
+    return [(span, chunker.text(span)) for span in chunker.iter_spans(pages)]
+
+
+def test_spans_are_offsets_into_the_whole_document():
+    pages = _pages(12)
+    document = _document(pages)
+
+    chunks = _chunks(OffsetChunker(max_chars=300, overlap=60), pages)
+
+    assert chunks
+    for span, text in chunks:
+        assert text == document[span.start:span.end]
+        assert text == text.strip()
+        assert len(text) <= 300
+        assert span.token_count == estimate_tokens(text)
+
+
+def test_chunks_cover_the_document_with_overlap():
+    pages = _pages(8)
+    document = _document(pages)
+
+    spans = [span for span, _ in _chunks(OffsetChunker(max_chars=250, overlap=50), pages)]
+
+    assert spans[0].start == 0
+    assert spans[-1].end == len(document)
+    for prev, span in zip(spans, spans[1:]):
+        assert span.start < prev.end            # overlap
+        assert span.start > prev.start
+        assert not document[span.start - 1].isalnum()   # 단어 중간에서 시작하지 않음
+
+
+def test_chunk_crosses_page_boundary_with_page_range():
+    pages = [{"page": 3, "text": "첫 페이지 끝 문단"}, {"page": 4, "text": "다음 페이지로 이어지는 문단"}]
+
+    chunks = _chunks(OffsetChunker(max_chars=1000, overlap=0), pages)
+
+    assert [(s.page_start, s.page_end, text) for s, text in chunks] == [
+        (3, 4, "첫 페이지 끝 문단\n\n다음 페이지로 이어지는 문단"),
+    ]
+
+
+def test_page_of_each_chunk_matches_its_offsets():
+    pages = _pages(6)
+    document = _document(pages)
+    starts = [document.index(_normalize(p["text"])) for p in pages]
+
+    for span, _ in _chunks(OffsetChunker(max_chars=200, overlap=40), pages):
+        expected_start = max(i for i, s in enumerate(starts) if s <= span.start) + 1
+        expected_end = max(i for i, s in enumerate(starts) if s <= span.end - 1) + 1
+        assert (span.page_start, span.page_end) == (expected_start, expected_end)
+
+
+def test_blank_pages_are_skipped():
+    pages = [{"page": 1, "text": "  \n\n "}, {"page": 2, "text": "본문"}, {"page": 3, "text": ""}]
+
+    chunks = _chunks(OffsetChunker(), pages)
+
+    assert [(s.page_start, s.page_end, text) for s, text in chunks] == [(2, 2, "본문")]
+
+
+def test_prefers_paragraph_breaks():
+    para = "가" * 60
+    pages = [{"page": 1, "text": "\n\n".join([para] * 5)}]
+
+    for _, text in _chunks(OffsetChunker(max_chars=150, overlap=0), pages):
+        assert all(len(p) == 60 for p in text.split("\n\n"))
+
+
+@pytest.mark.parametrize("max_tokens", [64, 200])
+def test_token_budget(max_tokens):
+    pages = _pages(10)
+
+    chunks = _chunks(OffsetChunker(max_tokens=max_tokens, overlap_tokens=10), pages)
+
+    assert len(chunks) > 1
+    assert all(span.token_count <= max_tokens for span, _ in chunks)
+    assert chunks[-1][0].end == len(_document(pages))
+
+
+def test_long_word_without_breaks_is_cut_at_the_limit():
+    pages = [{"page": 1, "text": "x" * 1000}]
+
+    chunks = _chunks(OffsetChunker(max_chars=300, overlap=0), pages)
+
+    assert [len(text) for _, text in chunks] == [300, 300, 300, 100]
+
+
+@pytest.mark.parametrize("kwargs", [
+    {"max_chars": 100, "overlap": 49},
+    {"max_tokens": 50, "overlap_tokens": 20},   # 글자 수로 환산한 overlap이 chunk 절반을 넘을 수 있음
+    {"max_tokens": 50, "overlap_tokens": 24},
+])
+def test_large_overlap_does_not_repeat_chunks(kwargs):
+    chunks = _chunks(OffsetChunker(**kwargs), _pages(30))
+
+    ends = [span.end for span, _ in chunks]
+    assert all(b > a for a, b in zip(ends, ends[1:]))
+    assert all(b.start > a.start for (a, _), (b, _) in zip(chunks, chunks[1:]))
+
+
+@pytest.mark.parametrize("kwargs", [
+    {"max_chars": 100, "overlap": 200},
+    {"max_chars": 100, "overlap": 50},
+    {"max_tokens": 50, "overlap_tokens": 25},
+    {"max_chars": 100, "overlap": -1},
+])
+def test_overlap_of_half_the_limit_or_more_is_rejected(kwargs):
+    with pytest.raises(ValueError):
+        OffsetChunker(**kwargs)
@@ -0,0 +1,71 @@
+import json
+
+import pytest
+
+
+def _doc(i: int, content: str = "내용") -> dict:
+    return {"fileId": "file-1", "userId": "user-1", "chunkIndex": i, "content": content, "embedding": [0.1, 0.2]}
+
+
+def _response(statuses: list) -> dict:
+    items = [{"index": {"status": s, "error": None if s < 300 else {"type": "x"}}} for s in statuses]
+    return {"errors": any(s >= 300 for s in statuses), "items": items}
+
+
+def _bulk_ids(body: str) -> list:
+    return [json.loads(line)["index"]["_id"] for line in body.splitlines()[::2]]
+
+
+def test_requests_split_by_doc_count(embed_handler, monkeypatch):
+    monkeypatch.setattr(embed_handler, "BULK_MAX_DOCS", 3)
+
+    requests = list(embed_handler._iter_bulk_requests([_doc(i) for i in range(7)]))
+
+    assert [len(batch) for batch, _ in requests] == [3, 3, 1]
+    assert _bulk_ids(requests[2][1]) == ["user-1_file-1_6"]
+    assert all(body.endswith("\n") for _, body in requests)
+
+
+def test_requests_split_by_bytes(embed_handler, monkeypatch):
+    monkeypatch.setattr(embed_handler, "BULK_MAX_BYTES", 600)
+
+    requests = list(embed_handler._iter_bulk_requests([_doc(i, "가" * 100) for i in range(4)]))
+
+    assert [len(batch) for batch, _ in requests] == [1, 1, 1, 1]
+    # 한도보다 큰 문서 하나도 단독 요청으로 보냄
+    assert all(len(body.encode("utf-8")) > 300 for _, body in requests)
+
+
+def test_only_failed_items_are_retried(embed_handler, opensearch):
+    opensearch.bulk.side_effect = [_response([201, 429, 201, 503]), _response([201, 201])]
+
+    embed_handler.bulk_index_to_opensearch([_doc(i) for i in range(4)])
+
+    assert opensearch.bulk.call_count == 2
+    retried = opensearch.bulk.call_args_list[1].kwargs["body"]
+    assert _bulk_ids(retried) == ["user-1_file-1_1", "user-1_file-1_3"]
+
+
+def test_request_error_retries_whole_batch(embed_handler, opensearch):
+    opensearch.bulk.side_effect = [ConnectionError("timeout"), _response([201, 201])]
+
+    embed_handler.bulk_index_to_opensearch([_doc(0), _doc(1)])
+
+    assert _bulk_ids(opensearch.bulk.call_args_list[1].kwargs["body"]) == ["user-1_file-1_0", "user-1_file-1_1"]
+
+
+def test_mapping_error_fails_without_retry(embed_handler, opensearch):
+    opensearch.bulk.return_value = _response([201, 400])
+
+    with pytest.raises(Exception, match="id=user-1_file-1_1, status=400"):
+        embed_handler.bulk_index_to_opensearch([_doc(0), _doc(1)])
+    assert opensearch.bulk.call_count == 1
+
+
+def test_gives_up_after_max_retries(embed_handler, opensearch, monkeypatch):
+    monkeypatch.setattr(embed_handler, "BULK_MAX_RETRIES", 2)
+    opensearch.bulk.return_value = _response([429])
+
+    with pytest.raises(Exception, match="재시도 후 1건 남음"):
+        embed_handler.bulk_index_to_opensearch([_doc(0)])
+    assert opensearch.bulk.call_count == 3
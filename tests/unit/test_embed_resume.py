@@ -0,0 +1,86 @@
+import pytest
+
+
+def _chunk(i: int, page: int = 1) -> dict:
+    return {"chunkIndex": i, "content": f"내용 {i}", "contentHash": f"h{i}", "page": page}
+
+
+def _found(chunk: dict) -> dict:
+    return {"found": True, "_source": {"contentHash": chunk["contentHash"], "page": chunk["page"]}}
+
+
+def test_indexed_chunks_with_same_content_and_page_are_done(embed_handler, opensearch):
+    chunks = [_chunk(0), _chunk(1), _chunk(2), _chunk(3)]
+    opensearch.mget.return_value = {"docs": [
+        _found(chunks[0]),
+        {"found": True, "_source": {"contentHash": "old", "page": 1}},   # 이전 버전 내용
+        {"found": True, "_source": {"contentHash": "h2", "page": 5}},    # 페이지가 바뀜
+        {"found": False},
+    ]}
+
+    done = embed_handler.find_indexed_chunks("file-1", "user-1", chunks)
+
+    assert done == {0}
+    assert opensearch.mget.call_args.kwargs["body"] == {"ids": [f"user-1_file-1_{i}" for i in range(4)]}
+
+
+def test_chunks_without_hash_are_not_checked(embed_handler, opensearch):
+    assert embed_handler.find_indexed_chunks("file-1", "user-1", [{"chunkIndex": 0, "content": "x"}]) == set()
+    opensearch.mget.assert_not_called()
+
+
+def test_lookup_failure_restarts_from_the_beginning(embed_handler, opensearch):
+    opensearch.mget.side_effect = ConnectionError("timeout")
+
+    assert embed_handler.find_indexed_chunks("file-1", "user-1", [_chunk(0)]) == set()
+
+
+def test_mget_uses_user_routing(embed_handler, opensearch, monkeypatch):
+    monkeypatch.setattr(embed_handler, "OPENSEARCH_ROUTING", True)
+    opensearch.mget.return_value = {"docs": [{"found": False}]}
+
+    embed_handler.find_indexed_chunks("file-1", "user-1", [_chunk(0)])
+
+    assert opensearch.mget.call_args.kwargs["routing"] == "user-1"
+
+
+class _Context:
+    def __init__(self, remaining: list):
+        self.remaining = remaining
+
+    def get_remaining_time_in_millis(self):
+        return self.remaining.pop(0)
+
+
+def test_resume_embeds_only_remaining_chunks_and_stops_before_timeout(embed_handler, opensearch, monkeypatch):
+    chunks = [_chunk(i) for i in range(5)]
+    opensearch.mget.return_value = {"docs": [_found(chunks[0]), _found(chunks[1])] + [{"found": False}] * 3}
+    monkeypatch.setattr(embed_handler, "EMBED_STEP_CHUNKS", 2)
+    monkeypatch.setattr(embed_handler, "lookup_existing_embeddings", lambda *args: {})
+    embedded = []
+    monkeypatch.setattr(embed_handler, "embed_texts_cached", lambda texts: embedded.extend(texts) or [[0.1]] * len(texts))
+    indexed = []
+    monkeypatch.setattr(embed_handler, "bulk_index_to_opensearch", lambda docs: indexed.extend(d["chunkIndex"] for d in docs))
+    safety = embed_handler.EMBED_TIME_SAFETY_MS
+
+    # 첫 step은 시간 충분, 두 번째 step 전에 시간 부족 → 색인된 chunk까지가 다음 재시도의 체크포인트
+    with pytest.raises(embed_handler.RemainingTimeExceeded, match="완료 4/5개"):
+        embed_handler.embed_and_index_chunks("file-1", "user-1", chunks, _Context([safety + 1, safety - 1]))
+
+    assert embedded == ["내용 2", "내용 3"]
+    assert indexed == [2, 3]
+
+
+def test_existing_embeddings_are_collapsed_per_content_hash(embed_handler, opensearch):
+    opensearch.search.return_value = {"hits": {"hits": [
+        {"_source": {"contentHash": "h1", "embedding": [1]}},
+        {"_source": {"contentHash": "h2", "embedding": [2]}},
+    ]}}
+
+    found = embed_handler.lookup_existing_embeddings("file-1", "user-1", ["h2", "h1", "h1", "h1"])
+
+    body = opensearch.search.call_args.kwargs["body"]
+    assert body["collapse"] == {"field": "contentHash"}
+    assert body["size"] == 2
+    assert body["query"]["bool"]["filter"][1] == {"terms": {"contentHash": ["h1", "h2"]}}
+    assert found == {"h1": [1], "h2": [2]}
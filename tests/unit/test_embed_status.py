@@ -0,0 +1,65 @@
+import json
+from unittest import mock
+
+import pytest
+
+
+@pytest.fixture
+def table(embed_handler, monkeypatch):
+    table = mock.MagicMock()
+    monkeypatch.setenv("FILES_TABLE", "lexora-files")
+    monkeypatch.setattr(embed_handler.boto3, "resource", lambda *args, **kwargs: mock.MagicMock(Table=lambda name: table))
+    monkeypatch.setattr(embed_handler, "load_chunks", lambda body: [{"chunkIndex": 0, "content": "본문"}])
+    monkeypatch.setattr(embed_handler, "embed_and_index_chunks", lambda *args: None)
+    monkeypatch.setattr(embed_handler.index_admin, "refresh", lambda *args: None)
+    return table
+
+
+def _record(**body) -> dict:
+    return {"messageId": "m-1", "body": json.dumps({"fileId": "file-1", "userId": "user-1", **body})}
+
+
+def test_batch_progress_update_failure_is_retried(embed_handler, table):
+    table.update_item.side_effect = Exception("ProvisionedThroughputExceededException")
+    failures = []
+
+    embed_handler.process_record(_record(batchIndex=2), None, failures)
+
+    assert failures == ["m-1"]
+
+
+def test_file_status_update_failure_is_retried(embed_handler, table):
+    table.update_item.side_effect = Exception("ProvisionedThroughputExceededException")
+    failures = []
+
+    embed_handler.process_record(_record(), None, failures)
+
+    assert failures == ["m-1"]
+
+
+def test_last_batch_promotes_pending_manifest(embed_handler, table):
+    table.update_item.side_effect = [
+        {"Attributes": {"batchCount": 2, "embeddedBatches": {0, 1}, "pendingManifest": "s3://chunks/m.json.gz"}},
+        {},
+    ]
+    failures = []
+
+    embed_handler.process_record(_record(batchIndex=1), None, failures)
+
+    assert failures == []
+    promoted = table.update_item.call_args.kwargs
+    assert promoted["ExpressionAttributeValues"][":m"] == "s3://chunks/m.json.gz"
+    assert promoted["ExpressionAttributeValues"][":s"] == "embedded"
+
+
+def test_promotion_deletes_the_superseded_manifest(embed_handler, table, monkeypatch):
+    s3 = mock.MagicMock()
+    monkeypatch.setattr(embed_handler, "s3", s3)
+    table.update_item.side_effect = [
+        {"Attributes": {"batchCount": 1, "embeddedBatches": {0}, "pendingManifest": "s3://bucket/chunks/f/manifest-2.json.gz"}},
+        {"Attributes": {"indexedManifest": "s3://bucket/chunks/f/manifest-1.json.gz"}},
+    ]
+
+    embed_handler.process_record(_record(batchIndex=0), None, [])
+
+    s3.delete_object.assert_called_once_with(Bucket="bucket", Key="chunks/f/manifest-1.json.gz")
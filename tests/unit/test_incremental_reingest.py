@@ -0,0 +1,96 @@
+from unittest import mock
+
+from chunker import OffsetChunker
+
+
+def _items(extract_handler, texts: list) -> list:
+    chunker = OffsetChunker(max_chars=1000, overlap=0)
+    pages = [{"page": n, "text": text} for n, text in enumerate(texts, start=1)]
+    # 페이지마다 chunk 하나가 되도록 페이지 내용을 한도 가까이 채움
+    return list(extract_handler.iter_chunk_items(chunker, chunker.iter_spans(pages)))
+
+
+def _filter(extract_handler, items: list, previous: dict = None):
+    manifest = []
+    sent = list(extract_handler.filter_changed_chunks(items, previous, manifest))
+    return sent, manifest
+
+
+def _page(label: str) -> str:
+    return (f"{label} 조항 " * 200).strip()
+
+
+def test_first_version_sends_every_chunk(extract_handler):
+    items = _items(extract_handler, [_page("가"), _page("나")])
+
+    sent, manifest = _filter(extract_handler, items)
+
+    assert sent == items
+    assert not any(item.get("reuse") for item in sent)
+    assert manifest == [[i["contentHash"], i["page"], i["pageEnd"]] for i in items]
+
+
+def test_unchanged_version_sends_nothing(extract_handler):
+    items = _items(extract_handler, [_page("가"), _page("나"), _page("다")])
+    _, manifest = _filter(extract_handler, items)
+
+    sent, new_manifest = _filter(extract_handler, _items(extract_handler, [_page("가"), _page("나"), _page("다")]),
+                                 {"chunks": manifest})
+
+    assert sent == []
+    assert new_manifest == manifest
+
+
+def test_edit_sends_only_changed_chunks(extract_handler):
+    _, manifest = _filter(extract_handler, _items(extract_handler, [_page("가"), _page("나"), _page("다")]))
+
+    sent, _ = _filter(extract_handler, _items(extract_handler, [_page("가"), _page("라"), _page("다")]),
+                      {"chunks": manifest})
+
+    assert [(i["chunkIndex"], i.get("reuse", False)) for i in sent] == [(1, False)]
+
+
+def test_shifted_chunks_are_marked_for_reuse(extract_handler):
+    # 앞에 페이지가 추가되면 뒤 chunk는 위치/페이지가 바뀌지만 내용은 같음 → 기존 벡터 재사용
+    _, manifest = _filter(extract_handler, _items(extract_handler, [_page("가"), _page("나")]))
+
+    sent, new_manifest = _filter(extract_handler, _items(extract_handler, [_page("새"), _page("가"), _page("나")]),
+                                 {"chunks": manifest})
+
+    assert [(i["chunkIndex"], i.get("reuse", False)) for i in sent] == [(0, False), (1, True), (2, True)]
+    assert len(new_manifest) == 3
+
+
+def test_same_content_on_another_page_is_not_skipped(extract_handler):
+    items = _items(extract_handler, [_page("가")])
+    _, manifest = _filter(extract_handler, items)
+    moved = [dict(items[0], page=2, pageEnd=2)]
+
+    sent, _ = _filter(extract_handler, moved, {"chunks": manifest})
+
+    assert [(i["page"], i.get("reuse")) for i in sent] == [(2, True)]
+
+
+def test_promotion_deletes_the_superseded_manifest(extract_handler, monkeypatch):
+    table = mock.MagicMock()
+    table.update_item.return_value = {"Attributes": {"indexedManifest": "s3://bucket/chunks/f/manifest-1.json.gz"}}
+    s3 = mock.MagicMock()
+    monkeypatch.setattr(extract_handler, "files_table", table)
+    monkeypatch.setattr(extract_handler, "s3", s3)
+
+    extract_handler.mark_file_embedded("f", "s3://bucket/chunks/f/manifest-2.json.gz")
+
+    deleted = s3.delete_objects.call_args.kwargs["Delete"]["Objects"]
+    assert deleted == [{"Key": "chunks/f/manifest-1.json.gz"}]
+
+
+def test_first_promotion_deletes_nothing(extract_handler, monkeypatch):
+    table = mock.MagicMock()
+    table.update_item.return_value = {"Attributes": {}}
+    s3 = mock.MagicMock()
+    monkeypatch.setattr(extract_handler, "files_table", table)
+    monkeypatch.setattr(extract_handler, "s3", s3)
+
+    extract_handler.mark_file_embedded("f", "s3://bucket/chunks/f/manifest-2.json.gz")
+
+    s3.delete_objects.assert_not_called()
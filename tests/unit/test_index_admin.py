@@ -0,0 +1,49 @@
+from unittest import mock
+
+import pytest
+
+import index_admin
+
+
+def _client(mappings: dict) -> mock.MagicMock:
+    client = mock.MagicMock()
+    client.indices.get_mapping.return_value = {"lexora-doc-embed-v1": {"mappings": mappings}}
+    client.indices.get_settings.return_value = {}
+    return client
+
+
+@pytest.mark.parametrize("data_type", ["float", "byte", "fp16"])
+def test_new_index_validates_for_every_data_type(data_type):
+    body = index_admin.index_body(512, model_id="amazon.titan-embed-text-v2:0", data_type=data_type)
+
+    assert body["mappings"]["_meta"]["vectorDataType"] == data_type
+    assert index_admin.stored_data_type(body["mappings"]["properties"]["embedding"]) == data_type
+    assert index_admin.validate_index(_client(body["mappings"]), "lexora-doc-embed", 512) == []
+
+
+def test_data_type_mismatch_is_reported():
+    body = index_admin.index_body(512, model_id="amazon.titan-embed-text-v2:0", data_type="byte")
+    body["mappings"]["_meta"]["vectorDataType"] = "fp16"
+
+    problems = index_admin.validate_index(_client(body["mappings"]), "lexora-doc-embed", 512)
+
+    assert problems == ["lexora-doc-embed-v1: embedding 저장 형식 byte (기대값 fp16)"]
+
+
+def test_meta_without_data_type_is_backfilled_from_mapping():
+    body = index_admin.index_body(512, model_id="amazon.titan-embed-text-v2:0", data_type="fp16")
+    del body["mappings"]["_meta"]["vectorDataType"]
+    client = _client(body["mappings"])
+
+    assert index_admin.validate_index(client, "lexora-doc-embed", 512) == []
+    client.indices.put_mapping.assert_called_once_with(
+        index="lexora-doc-embed-v1",
+        body={"_meta": {"embedModelId": "amazon.titan-embed-text-v2:0", "embedDimensions": 512, "vectorDataType": "fp16"}},
+    )
+
+
+def test_coarse_index_validates_against_coarse_dimensions():
+    body = index_admin.index_body(1024, model_id="amazon.titan-embed-text-v2:0", coarse_dimensions=256)
+
+    assert body["mappings"]["properties"]["embedding"]["dimension"] == 256
+    assert index_admin.validate_index(_client(body["mappings"]), "lexora-doc-embed", 512) == []
@@ -0,0 +1,44 @@
+import json
+from unittest import mock
+
+import index_admin
+import migrate_index
+
+MODEL = "amazon.titan-embed-text-v2:0"
+
+
+def _client(mappings: dict) -> mock.MagicMock:
+    client = mock.MagicMock()
+    client.indices.get_mapping.return_value = {"lexora-doc-embed-v1": {"mappings": mappings}}
+    client.bulk.return_value = {"errors": False}
+    return client
+
+
+def test_routing_only_migration_copies_vectors():
+    mappings = index_admin.index_body(512, model_id=MODEL, data_type="byte")["mappings"]
+
+    assert migrate_index.same_vectors(_client(mappings), "lexora-doc-embed-v1", MODEL, 512, 0, "byte")
+    assert not migrate_index.same_vectors(_client(mappings), "lexora-doc-embed-v1", MODEL, 1024, 0, "byte")
+    assert not migrate_index.same_vectors(_client(mappings), "lexora-doc-embed-v1", MODEL, 512, 0, "fp16")
+    assert not migrate_index.same_vectors(_client(mappings), "lexora-doc-embed-v1", MODEL, 512, 256, "byte")
+
+
+def test_index_without_model_meta_is_reembedded():
+    mappings = index_admin.index_body(512, data_type="float")["mappings"]
+
+    assert not migrate_index.same_vectors(_client(mappings), "lexora-doc-embed-v1", MODEL, 512, 0, "float")
+
+
+def test_copy_mode_writes_source_vectors_with_user_routing():
+    client = _client({})
+    bedrock = mock.MagicMock()
+    migration = migrate_index.Migration(client, bedrock, MODEL, 512, "lexora-doc-embed-v2", routing=True,
+                                        copy_vectors=True)
+    source = {"userId": "user-1", "fileId": "file-1", "chunkIndex": 0, "content": "본문", "embedding": [3, -7]}
+
+    migration.migrate_page([{"_id": "user-1_file-1_0", "_source": source}])
+
+    bedrock.invoke_model.assert_not_called()
+    action, doc = client.bulk.call_args.kwargs["body"].splitlines()
+    assert json.loads(action) == {"index": {"_index": "lexora-doc-embed-v2", "_id": "user-1_file-1_0", "routing": "user-1"}}
+    assert json.loads(doc) == source
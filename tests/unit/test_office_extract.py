@@ -0,0 +1,105 @@
+import io
+import zipfile
+
+from office_extract import extract_office_pages
+
+W_NS = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+S_NS = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+P_NS = "http://schemas.openxmlformats.org/presentationml/2006/main"
+A_NS = "http://schemas.openxmlformats.org/drawingml/2006/main"
+R_NS = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+REL_NS = "http://schemas.openxmlformats.org/package/2006/relationships"
+
+
+def _zip(parts: dict) -> bytes:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as zf:
+        for name, xml in parts.items():
+            zf.writestr(name, xml)
+    return buffer.getvalue()
+
+
+def _rels(targets: dict) -> str:
+    rels = "".join(f'<Relationship Id="{rid}" Target="{target}"/>' for rid, target in targets.items())
+    return f'<Relationships xmlns="{REL_NS}">{rels}</Relationships>'
+
+
+def _docx(body: str) -> bytes:
+    return _zip({"word/document.xml": f'<w:document xmlns:w="{W_NS}"><w:body>{body}</w:body></w:document>'})
+
+
+def _p(text: str, page_break: bool = False) -> str:
+    br = '<w:r><w:br w:type="page"/></w:r>' if page_break else ""
+    return f"<w:p>{br}<w:r><w:t>{text}</w:t></w:r></w:p>"
+
+
+def test_docx_splits_pages_on_explicit_breaks():
+    pages = extract_office_pages(_docx(_p("첫 문단") + _p("둘째 문단") + _p("다음 쪽", page_break=True)), "docx")
+
+    assert pages == [
+        {"page": 1, "text": "첫 문단\n\n둘째 문단"},
+        {"page": 2, "text": "다음 쪽"},
+    ]
+
+
+def test_docx_reads_content_controls_and_custom_xml():
+    body = (
+        _p("머리말")
+        + f"<w:sdt><w:sdtPr/><w:sdtContent>{_p('내용 컨트롤 문단')}</w:sdtContent></w:sdt>"
+        + f"<w:customXml><w:sdt><w:sdtContent>{_p('중첩된 문단')}</w:sdtContent></w:sdt></w:customXml>"
+        + "<w:tbl><w:tr>"
+        + f"<w:tc>{_p('A1')}</w:tc>"
+        + f"<w:sdt><w:sdtContent><w:tc>{_p('B1')}</w:tc></w:sdtContent></w:sdt>"
+        + "</w:tr></w:tbl>"
+    )
+
+    pages = extract_office_pages(_docx(body), "docx")
+
+    assert pages == [{"page": 1, "text": "머리말\n\n내용 컨트롤 문단\n\n중첩된 문단\n\nA1 | B1"}]
+
+
+def test_xlsx_one_page_per_sheet():
+    data = _zip({
+        "xl/workbook.xml": (
+            f'<workbook xmlns="{S_NS}" xmlns:r="{R_NS}"><sheets>'
+            '<sheet name="매출" r:id="rId1"/><sheet name="빈 시트" r:id="rId2"/>'
+            "</sheets></workbook>"
+        ),
+        "xl/_rels/workbook.xml.rels": _rels({"rId1": "worksheets/sheet1.xml", "rId2": "worksheets/sheet2.xml"}),
+        "xl/sharedStrings.xml": f'<sst xmlns="{S_NS}"><si><t>분기</t></si><si><t>금액</t></si></sst>',
+        "xl/worksheets/sheet1.xml": (
+            f'<worksheet xmlns="{S_NS}"><sheetData>'
+            '<row><c r="A1" t="s"><v>0</v></c><c r="B1" t="s"><v>1</v></c></row>'
+            '<row><c r="A2" t="inlineStr"><is><t>1Q</t></is></c><c r="C2"><v>120</v></c></row>'
+            "</sheetData></worksheet>"
+        ),
+        "xl/worksheets/sheet2.xml": f'<worksheet xmlns="{S_NS}"><sheetData/></worksheet>',
+    })
+
+    pages = extract_office_pages(data, "xlsx")
+
+    assert [p["page"] for p in pages] == [1]
+    assert pages[0]["text"].startswith("[매출]\n")
+    assert "분기" in pages[0]["text"] and "120" in pages[0]["text"]
+
+
+def test_pptx_one_page_per_slide():
+    def slide(*texts):
+        paragraphs = "".join(f"<a:p><a:r><a:t>{t}</a:t></a:r></a:p>" for t in texts)
+        return f'<p:sld xmlns:p="{P_NS}" xmlns:a="{A_NS}"><p:cSld><p:spTree>{paragraphs}</p:spTree></p:cSld></p:sld>'
+
+    data = _zip({
+        "ppt/presentation.xml": (
+            f'<p:presentation xmlns:p="{P_NS}" xmlns:r="{R_NS}"><p:sldIdLst>'
+            '<p:sldId id="256" r:id="rId2"/><p:sldId id="257" r:id="rId1"/>'
+            "</p:sldIdLst></p:presentation>"
+        ),
+        "ppt/_rels/presentation.xml.rels": _rels({"rId1": "slides/slide2.xml", "rId2": "slides/slide1.xml"}),
+        "ppt/slides/slide1.xml": slide("제목", "요약"),
+        "ppt/slides/slide2.xml": slide("결론"),
+    })
+
+    assert extract_office_pages(data, "pptx") == [
+        {"page": 1, "text": "제목\n\n요약"},
+        {"page": 2, "text": "결론"},
+    ]
@@ -0,0 +1,44 @@
+import text_extract
+from text_extract import csv_to_text, decode_text, extract_text_pages, html_to_text
+
+
+def test_decode_text_falls_back_to_cp949():
+    assert decode_text("계약서".encode("utf-8")) == "계약서"
+    assert decode_text("﻿계약서".encode("utf-8")) == "계약서"
+    assert decode_text("계약서".encode("cp949")) == "계약서"
+
+
+def test_html_to_text_keeps_blocks_and_drops_scripts():
+    html = (
+        "<html><head><title>제목</title><style>p { color: red }</style></head>"
+        "<body><script>var x = 1;</script><p>첫 문단</p><p>둘째<br>줄</p>"
+        "<table><tr><th>이름</th><th>값</th></tr><tr><td>a</td><td>1</td></tr></table></body></html>"
+    )
+
+    text = html_to_text(html)
+
+    assert "var x" not in text and "color" not in text
+    assert text.split("\n\n")[:3] == ["제목", "첫 문단", "둘째\n줄"]
+    assert "이름 | 값" in text and "a | 1" in text
+
+
+def test_csv_repeats_header_for_each_row_group(monkeypatch):
+    monkeypatch.setattr(text_extract, "CSV_ROWS_PER_PARAGRAPH", 2)
+
+    text = csv_to_text("이름,값\n a ,1\nb,2\n,\nc,3\n")
+
+    assert text == "이름 | 값\na | 1\nb | 2\n\n이름 | 값\nc | 3"
+
+
+def test_form_feed_splits_pages_and_skips_empty_ones():
+    data = "1쪽\r\n내용\f\f3쪽".encode("utf-8")
+
+    assert extract_text_pages(data, "txt") == [
+        {"page": 1, "text": "1쪽\n내용"},
+        {"page": 3, "text": "3쪽"},
+    ]
+
+
+def test_empty_document_has_no_pages():
+    assert extract_text_pages(b"  \n ", "md") == []
+    assert extract_text_pages(b"<script>x</script>", "html") == []
@@ -0,0 +1,44 @@
+import random
+
+import pytest
+
+from token_estimate import estimate_tokens, token_limit_offset
+
+
+@pytest.mark.parametrize("text, tokens", [
+    ("", 0),
+    ("abcd", 1),
+    ("abcde", 2),
+    ("한국어", 3),
+    ("계약 payment 조항", 4 + 2),   # 한글 4글자 + ASCII 7글자(올림 2), 공백 0
+    ("line\nnext\tend", 3),
+])
+def test_estimate_tokens(text, tokens):
+    assert estimate_tokens(text) == tokens
+
+
+def test_estimate_tokens_on_slice():
+    text = "앞부분 abcdefgh 뒷부분"
+    assert estimate_tokens(text, 4, 12) == estimate_tokens(text[4:12]) == 2
+
+
+def _text(length: int, seed: int) -> str:
+    rng = random.Random(seed)
+    return "".join(rng.choice("가나다라마 abcdefg.\n") for _ in range(length))
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_token_limit_offset_is_the_furthest_position_within_budget(seed):
+    text = _text(3000, seed)
+    start = 17
+    end = token_limit_offset(text, start, 100)
+
+    assert end is not None
+    assert estimate_tokens(text, start, end) <= 100
+    assert estimate_tokens(text, start, end + 1) > 100
+
+
+def test_token_limit_offset_none_when_rest_fits():
+    text = _text(200, 9)
+    assert token_limit_offset(text, 0, estimate_tokens(text)) is None
+    assert token_limit_offset(text, 0, estimate_tokens(text) - 1) is not None
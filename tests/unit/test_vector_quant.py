@@ -0,0 +1,56 @@
+import math
+import random
+
+import pytest
+
+from vector_quant import coarse, cosine, decode_full, encode_full, quantize, similarity_score, to_fp16, to_int8
+
+
+def _unit(dim: int, seed: int) -> list:
+    rng = random.Random(seed)
+    vector = [rng.gauss(0, 1) for _ in range(dim)]
+    norm = math.sqrt(sum(v * v for v in vector))
+    return [v / norm for v in vector]
+
+
+def test_int8_scales_peak_to_127():
+    assert to_int8([0.5, -0.25, 0.0]) == [127, -64, 0]
+    assert to_int8([0.0, 0.0]) == [0, 0]
+
+
+@pytest.mark.parametrize("data_type", ["float", "byte", "fp16"])
+def test_quantize_is_idempotent(data_type):
+    vector = _unit(64, 1)
+    once = quantize(vector, data_type)
+    assert quantize(once, data_type) == once
+
+
+@pytest.mark.parametrize("data_type", ["byte", "fp16"])
+def test_quantized_vectors_keep_cosine(data_type):
+    a, b = _unit(256, 2), _unit(256, 3)
+    assert abs(cosine(quantize(a, data_type), quantize(b, data_type)) - cosine(a, b)) < 0.02
+
+
+def test_fp16_rounds_to_half_precision():
+    assert to_fp16([1 / 3]) == [0.333251953125]
+
+
+@pytest.mark.parametrize("cos", [-0.5, 0.0, 0.3, 0.9])
+def test_fp16_innerproduct_score_maps_to_cosinesimil_range(cos):
+    # faiss innerproduct 점수: 내적 >= 0 이면 1 + 내적, 음수면 1 / (1 - 내적)
+    score = 1 + cos if cos >= 0 else 1 / (1 - cos)
+    assert similarity_score(score, "fp16") == pytest.approx((1 + cos) / 2)
+    assert similarity_score(0.7, "byte") == 0.7
+
+
+def test_coarse_is_normalized_prefix():
+    vector = _unit(128, 4)
+    head = coarse(vector, 32)
+    assert len(head) == 32
+    assert math.sqrt(sum(v * v for v in head)) == pytest.approx(1.0)
+    assert cosine(head, vector[:32]) == pytest.approx(1.0)
+
+
+def test_full_vector_round_trip():
+    vector = _unit(16, 5)
+    assert decode_full(encode_full(vector)) == to_fp16(vector)